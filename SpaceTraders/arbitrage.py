@@ -0,0 +1,124 @@
+import numpy as np
+
+
+class ArbitrageEngine ():
+    def __init__(self, markets):
+        """Every trade between a set of marketplaces worked out at once.
+        The prices are held as locations x goods arrays so the profit of buying each good at every location and selling it at
+        every other is one from x to x good array operation.
+
+        Args:
+            markets (dict): Location symbol -> its marketplace as returned by game/locations/{symbol}/marketplace
+        """
+        self.locations = tuple(markets)
+        self.location_index = {symbol: i for i, symbol in enumerate(self.locations)}
+        goods = {}
+        for marketplace in markets.values():
+            for good in marketplace:
+                goods.setdefault(good['symbol'], len(goods))
+        # Goods are in the order they're first seen - put the market of most interest first to break ties the way it lists them
+        self.goods = tuple(goods)
+        self.good_index = goods
+        shape = (len(self.locations), len(self.goods))
+        # NaN where a location doesn't trade a good
+        self.purchase = np.full(shape, np.nan)
+        self.sell = np.full(shape, np.nan)
+        self.volume = np.full(shape, np.nan)
+        self.quantity = np.zeros(shape, dtype=np.int64)
+        for i, marketplace in enumerate(markets.values()):
+            for good in marketplace:
+                j = goods[good['symbol']]
+                self.purchase[i, j] = good['purchasePricePerUnit']
+                self.sell[i, j] = good['sellPricePerUnit']
+                self.volume[i, j] = good['volumePerUnit']
+                self.quantity[i, j] = good.get('quantityAvailable', 0)
+        self._profit = None
+        self._profit_per_volume = None
+
+    def __repr__(self):
+        return f"<ArbitrageEngine Object> Locations: {len(self.locations)}, Goods: {len(self.goods)}"
+
+    @property
+    def profit(self):
+        """from x to x good array of the profit per unit of buying a good at 'from' and selling it at 'to'. NaN where either doesn't trade it"""
+        if self._profit is None:
+            self._profit = self.sell[None, :, :] - self.purchase[:, None, :]
+        return self._profit
+
+    @property
+    def profit_per_volume(self):
+        """from x to x good array of the profit per unit of cargo volume - the volume is the one at 'from' like Market.market_compare"""
+        if self._profit_per_volume is None:
+            self._profit_per_volume = self.profit / self.volume[:, None, :]
+        return self._profit_per_volume
+
+    def _opportunity(self, f, t, g):
+        return {"from": self.locations[f],
+                "to": self.locations[t],
+                "symbol": self.goods[g],
+                "cost": int(self.purchase[f, g]),
+                "sell": int(self.sell[t, g]),
+                "quantity": int(self.quantity[f, g]),
+                "sell_quantity": int(self.quantity[t, g]),
+                "volume": int(self.volume[f, g]),
+                "profit": int(self.profit[f, t, g]),
+                "profit_per_volume": float(self.profit_per_volume[f, t, g])}
+
+    def _scores(self, by, origin, destinations):
+        scores = np.where(np.isnan(self.profit_per_volume), -np.inf, self.profit if by == "profit" else self.profit_per_volume)
+        # Flying nowhere isn't a trade
+        scores[np.arange(len(self.locations)), np.arange(len(self.locations)), :] = -np.inf
+        if origin is not None:
+            keep = np.zeros(len(self.locations), dtype=bool)
+            keep[self.location_index[origin]] = True
+            scores[~keep, :, :] = -np.inf
+        if destinations is not None:
+            keep = np.zeros(len(self.locations), dtype=bool)
+            keep[[self.location_index[d] for d in destinations if d in self.location_index]] = True
+            scores[:, ~keep, :] = -np.inf
+        return scores
+
+    def top(self, k=10, by="profit_per_volume", origin=None, destinations=None):
+        """Returns the k most profitable trades across every pair of markets
+
+        Args:
+            k (int, optional): How many trades to return. Defaults to 10.
+            by (str, optional): "profit_per_volume" or "profit". Defaults to "profit_per_volume".
+            origin (str, optional): Only trades buying at this location. Defaults to any.
+            destinations (list, optional): Only trades selling at these locations. Defaults to any.
+
+        Returns:
+            list: Dicts of from, to, symbol, cost, sell, quantity (at from), sell_quantity (at to), volume, profit & profit_per_volume - the best first
+        """
+        scores = self._scores(by, origin, destinations).ravel()
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [self._opportunity(*np.unravel_index(i, self.profit.shape)) for i in best]
+
+    def best_buys(self, origin, destinations=None):
+        """Returns the best good to buy at origin for each destination - what Market.best_buy gives for one destination
+
+        Args:
+            origin (str): Symbol of the location buying
+            destinations (list, optional): Symbols of the locations to sell at. Defaults to every other location.
+
+        Returns:
+            dict: Destination -> dict of symbol, cost, sell, quantity, sell_quantity, volume, profit & profit_per_volume. Destinations sharing no goods with origin are left out
+        """
+        f = self.location_index[origin]
+        destinations = [d for d in (destinations if destinations is not None else self.locations) if d != origin and d in self.location_index]
+        ppv = self.profit_per_volume[f]
+        buys = {}
+        for destination in destinations:
+            t = self.location_index[destination]
+            row = ppv[t]
+            if np.all(np.isnan(row)):
+                continue
+            g = int(np.nanargmax(row))
+            opportunity = self._opportunity(f, t, g)
+            del opportunity["from"], opportunity["to"]
+            buys[destination] = opportunity
+        return buys
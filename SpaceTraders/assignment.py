@@ -0,0 +1,121 @@
+import numpy as np
+from .flights import FlightTimeModel
+from .impact import PriceImpactModel
+
+
+class FleetPlanner ():
+    def __init__(self, engine, world, flight_time=None, price_impact=None):
+        """Assigns every ship a trade - buy a good here, sell it there - in one go so ships don't all chase the same one.
+        Ships are assigned greedily, the trade making the most profit per hour first, and every trade assigned eats into
+        the stock and moves the prices of the markets it buys & sells at before the next ship is assigned. Each trade is
+        sized by the price impact model so it stops at the last order that still makes a profit.
+
+        Args:
+            engine (ArbitrageEngine): The markets the ships can trade at
+            world (World): The world the markets are in
+            flight_time (callable, optional): Seconds to fly an array of distances at a speed. Defaults to FlightTimeModel().
+            price_impact (PriceImpactModel, optional): How far each good's price moves with the share of stock traded. Defaults to PriceImpactModel().
+        """
+        self.engine = engine
+        self.world = world
+        self.flight_time = FlightTimeModel() if flight_time is None else flight_time
+        self.price_impact = PriceImpactModel() if price_impact is None else price_impact
+        self.impacts = self.price_impact.impact(engine.goods)
+        self.known = np.array([symbol in world.index for symbol in engine.locations])
+        rows = np.array([world.index.get(symbol, 0) for symbol in engine.locations], dtype=np.int64)
+        self.rows = np.ix_(rows, rows)
+        self.distance = world.distance[self.rows]
+        # Flights between systems go through wormholes so trades stay inside a system
+        self.reachable = world.same_system[self.rows] & ~np.eye(len(engine.locations), dtype=bool) & self.known[None, :]
+        # Prices & stock as left by the trades assigned so far
+        self.purchase = engine.purchase.copy()
+        self.sell = engine.sell.copy()
+        self.quantity = engine.quantity.astype(float)
+        self.depth = np.maximum(engine.quantity, 1).astype(float)
+
+    def __repr__(self):
+        return f"<FleetPlanner Object> Locations: {len(self.engine.locations)}, Goods: {len(self.engine.goods)}"
+
+    def reserve(self, trade):
+        """Takes a trade already planned out of the markets - its units leave the stock and move the prices of both markets
+
+        Args:
+            trade (dict): A trade with from, to, symbol & units eg. one returned by assign
+        """
+        g = self.engine.good_index[trade['symbol']]
+        f, t = self.engine.location_index[trade['from']], self.engine.location_index[trade['to']]
+        units = trade['units']
+        self.quantity[f, g] = max(self.quantity[f, g] - units, 0)
+        self.purchase[f, g] *= 1 + self.impacts[g] * units / self.depth[f, g]
+        self.sell[t, g] *= max(1 - self.impacts[g] * units / self.depth[t, g], 0)
+
+    def _options(self, ship, credits):
+        # Units, profit & cost of every (to, good) the ship could trade from where it is - sized as the prices move
+        f = self.engine.location_index[ship.location]
+        fuel = self.world.fuel_matrix(ship.kind)[self.rows][f]
+        held = ship.cargo_volume("FUEL")
+        # Goods still on board take up room - fuel on board goes towards the flight
+        cargo = ship.maxCargo - (ship.cargo_volume() - held) - np.maximum(fuel, held)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            units = np.minimum(np.floor(cargo[:, None] / self.engine.volume[f][None, :]),
+                               np.floor(credits / self.purchase[f])[None, :])
+            units = np.minimum(units, self.quantity[f][None, :])
+        units = np.clip(np.nan_to_num(units, nan=0.0, posinf=0.0), 0, None)
+        units[~self.reachable[f] | (cargo <= 0)] = 0
+        # Every (to, good) sized in one go - NaN where either market doesn't trade the good
+        shape = units.shape
+        sized = self.price_impact.size(self.engine.goods * shape[0], np.broadcast_to(self.purchase[f], shape).ravel(), self.sell.ravel(),
+                                       np.broadcast_to(self.depth[f], shape).ravel(), self.depth.ravel(), units.ravel(), credits=credits)
+        units = sized['units'].reshape(shape)
+        gain = sized['profit'].reshape(shape)
+        gain = np.where((units > 0) & ~np.isnan(gain), gain, -np.inf)
+        seconds = self.flight_time(self.distance[f], ship.speed)
+        return f, fuel, units, gain, sized['total_cost'].reshape(shape), gain / (seconds[:, None] / 3600), seconds
+
+    def assign(self, ships, credits=None):
+        """Assigns each ship the trade that's best for the fleet as a whole
+
+        Args:
+            ships (list): The ships to assign - ships in transit or away from the markets are given None
+            credits (int, optional): Credits shared by the whole fleet for buying goods. Defaults to unlimited.
+
+        Returns:
+            dict: Ship id -> the trade in the shape of Market.what_should_I_buy (plus seconds & profit_per_hour)
+                  or None if the ship has no profitable trade
+        """
+        credits = np.inf if credits is None else float(credits)
+        waiting = [ship for ship in ships if ship.location in self.engine.location_index and self.known[self.engine.location_index[ship.location]]]
+        assignments = {ship.id: None for ship in ships}
+        while waiting:
+            best = None
+            for ship in waiting:
+                f, fuel, units, gain, total_cost, score, seconds = self._options(ship, credits)
+                t, g = np.unravel_index(int(np.argmax(score)), score.shape)
+                if score[t, g] > 0 and (best is None or score[t, g] > best[0]):
+                    best = (score[t, g], ship, f, t, g, int(units[t, g]), float(gain[t, g]), float(total_cost[t, g]), int(fuel[t]), float(seconds[t]))
+            if best is None:
+                break
+            per_hour, ship, f, t, g, units, gain, total_cost, fuel, seconds = best
+            cost = float(self.purchase[f, g])
+            # Per unit at the listed prices like Market.trade_details - the totals are what the sized orders make
+            profit = float(self.sell[t, g]) - cost
+            volume = int(self.engine.volume[f, g])
+            trade = {"symbol": self.engine.goods[g],
+                     "units": units,
+                     "cost": cost,
+                     "total_cost": total_cost,
+                     "expected_profit": gain,
+                     "profit": profit,
+                     "profit_per_volume": profit / volume,
+                     "good_volume": volume,
+                     "total_volume": volume * units,
+                     "fuel_required": fuel,
+                     "from": self.engine.locations[f],
+                     "to": self.engine.locations[t],
+                     "seconds": seconds,
+                     "profit_per_hour": float(per_hour)}
+            assignments[ship.id] = trade
+            self.reserve(trade)
+            credits -= trade['total_cost']
+            waiting.remove(ship)
+        return assignments
@@ -0,0 +1,300 @@
+import time
+import asyncio
+import logging
+import httpx
+from .transport import URL, request_key
+from .ratelimit import DEFAULT_LIMITER
+from .retry import DEFAULT_RETRY, THROTTLE_CODE, error_code
+from .cache import DEFAULT_CACHE, cache_key
+from .scheduler import DEFAULT_SCHEDULER, PriorityScheduler, current_priority
+from .metrics import DEFAULT_METRICS, body_size, request_size
+from .orders import async_bulk_order
+from . import client
+
+
+class AsyncTransport ():
+    def __init__(self, base_url=URL, session=None, max_connections=100, limiter=None, retry=None, coalesce=True, scheduler=None, metrics=None):
+        """The asyncio counterpart of Transport. Owns one pooled httpx.AsyncClient shared by every AsyncClient of an AsyncApi.
+
+        Args:
+            base_url (str, optional): Root URL of the API. Point this at a local stand-in server for offline use. Defaults to URL.
+            session (httpx.AsyncClient, optional): An existing async client to use. Defaults to a new pooled client.
+            max_connections (int, optional): Max connections kept open at once. Defaults to 100.
+            limiter (RateLimiter, optional): Paces the requests before they are sent. Defaults to the process wide DEFAULT_LIMITER.
+            retry (RetryPolicy, optional): Decides when failed requests are sent again. Defaults to the process wide DEFAULT_RETRY.
+            coalesce (bool, optional): Share one network call between identical GETs that are in flight at the same time. Defaults to True.
+            scheduler (PriorityScheduler, optional): Decides which waiting request gets the next token from the limiter.
+                Defaults to the process wide DEFAULT_SCHEDULER, or a new one if a limiter is given.
+            metrics (Metrics, optional): Records the latency, size, retries & waits of every request. Defaults to the process wide DEFAULT_METRICS.
+        """
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.retry = retry if retry is not None else DEFAULT_RETRY
+        if scheduler is None:
+            limiter = limiter if limiter is not None else DEFAULT_LIMITER
+            scheduler = DEFAULT_SCHEDULER if limiter is DEFAULT_LIMITER else PriorityScheduler(limiter)
+        self.scheduler = scheduler
+        self.limiter = scheduler.limiter
+        self.metrics = metrics if metrics is not None else DEFAULT_METRICS
+        self.coalesce = coalesce
+        self.inflight = {}
+        self.shared = 0
+        self.session = session if session is not None else httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections))
+        self.methods = ("POST", "GET", "PUT", "DELETE")
+
+    def url(self, endpoint):
+        """Builds the full URL for an endpoint
+
+        Args:
+            endpoint (str): The API endpoint eg. game/status
+
+        Returns:
+            str: The full URL
+        """
+        return self.base_url + endpoint.lstrip("/")
+
+    async def request(self, method, endpoint, headers=None, params=None):
+        """Sends a request to the Space Traders API over the pooled async client.
+        Waits its turn in the priority scheduler and retries with the retry policy without blocking the event loop.
+        The number of attempts made is stored on the response as 'attempts'.
+        Identical GETs made at the same time (same endpoint, params and token) share one network call and one response.
+
+        Args:
+            method (str): The HTTP method to use. GET, POST, PUT or DELETE
+            endpoint (str): The API endpoint
+            headers (dict, optional): the request headers holding the Auth. Defaults to None.
+            params (dict, optional): parameters of the request. Defaults to None.
+
+        Returns:
+            httpx.Response: The final response returned by the API
+
+        Exceptions:
+            KeyError: Invalid method - must be GET, POST, PUT or DELETE
+        """
+        if method not in self.methods:
+            logging.exception(f'Invalid method provided: {method}')
+            raise KeyError(method)
+        level = current_priority(method)
+        if method != "GET" or not self.coalesce:
+            return await self._send(method, endpoint, headers, params, level)
+        key = request_key(endpoint, headers, params)
+        task = self.inflight.get(key)
+        if task is None:
+            task = self.inflight[key] = asyncio.ensure_future(self._send(method, endpoint, headers, params, level))
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        else:
+            self.shared += 1
+        # Shield so one caller being cancelled doesn't cancel the call for everyone else
+        return await asyncio.shield(task)
+
+    async def _send(self, method, endpoint, headers, params, level):
+        # httpx rejects None values in params so drop them like requests does
+        params = {k: v for k, v in params.items() if v is not None} if params else None
+        url = self.url(endpoint)
+        started = self.retry.clock()
+        attempt = throttled = sent_bytes = received = 0
+        latency = sleep = 0.0
+        while True:
+            attempt += 1
+            sleep += await self.scheduler.acquire_async(level)
+            sent = time.perf_counter()
+            r = await self.session.request(method, url, headers=headers, params=params)
+            latency += time.perf_counter() - sent
+            sent_bytes += request_size(r)
+            received += body_size(r.content)
+            code = error_code(r)
+            delay = self.retry.next_delay(code, attempt, started, r.headers)
+            if delay is None:
+                self.retry.record(attempt, code)
+                self.metrics.observe(method, endpoint, latency, bytes_sent=sent_bytes, bytes_received=received, attempts=attempt,
+                                     throttled=throttled + (code == THROTTLE_CODE), sleep=sleep, error=code is not None)
+                r.attempts = attempt
+                return r
+            logging.warning(f"Error {code} from {method} {endpoint}. Attempt {attempt} failed, retrying in {delay:.2f} seconds")
+            if code == THROTTLE_CODE:
+                throttled += 1
+                self.limiter.pause(delay)
+            else:
+                sleep += delay
+                await asyncio.sleep(delay)
+
+    async def aclose(self):
+        """Closes all the pooled connections"""
+        await self.session.aclose()
+
+class AsyncClient (client.Client):
+    def __init__(self, username, token=None, transport=None):
+        """The asyncio version of Client. Every API method of the sub-clients returns an awaitable.
+
+        Args:
+            username (str): Username of the user
+            token (str, optional): The personal auth token for the user. Defaults to None.
+            transport (AsyncTransport, optional): The transport used to send requests. Defaults to a new AsyncTransport.
+        """
+        super().__init__(username, token, transport if transport is not None else AsyncTransport())
+
+    async def generic_api_call(self, method, endpoint, params=None, token=None, warning_log=None):
+        """Makes an API call to the Space Traders API.
+        Throttling and server errors are retried by the transport, anything else is logged like Client.generic_api_call.
+
+        Args:
+            method (str): The HTTP method to use. GET, POST, PUT or DELETE
+            endpoint (str): The API endpoint
+            params (dict, optional): Any params required for the endpoint. Defaults to None.
+            token (str, optional): The token of the user. Defaults to None.
+
+        Returns:
+            httpx.Response: The response if successful. False if the API returned an error
+        """
+        headers = {'Authorization': 'Bearer ' + token}
+        try:
+            r = await self.transport.request(method, endpoint, headers, params)
+            # If an error returned from api
+            if 'error' in r.json():
+                error = r.json()
+                code = error['error']['code']
+                message = error['error']['message']
+                logging.warning(f"An error has occurred when hitting: {r.request.method} {r.url} with parameters: {params}. Error: " + str(error))
+                logging.warning(warning_log)
+                logging.exception(f"Something broke the script. Code: {code} Error Message: {message} ")
+                return False
+            return r
+        except Exception as e:
+            return e
+
+    async def call(self, method, endpoint, params=None, warning_log=None, as_json=True):
+        """Makes an API call with the client's token and unpacks the result
+
+        Args:
+            method (str): The HTTP method to use. GET, POST, PUT or DELETE
+            endpoint (str): The API endpoint
+            params (dict, optional): Any params required for the endpoint. Defaults to None.
+            warning_log (str, optional): Message to log if the call fails. Defaults to None.
+            as_json (bool, optional): Return the decoded JSON rather than the response. Defaults to True.
+
+        Returns:
+            Any: The JSON (or response) returned by the API. False if the call failed
+        """
+        res = await self.generic_api_call(method, endpoint, params=params, token=self.token, warning_log=warning_log)
+        if not as_json or res is False:
+            return res
+        return res.json()
+
+    async def cached_call(self, method, endpoint, params=None, warning_log=None):
+        """Makes an API call for static data through the on disk cache. The API is only hit on a cache miss
+
+        Args:
+            method (str): The HTTP method to use. Should be GET
+            endpoint (str): The API endpoint
+            params (dict, optional): Any params required for the endpoint. Defaults to None.
+            warning_log (str, optional): Message to log if the call fails. Defaults to None.
+
+        Returns:
+            Any: The JSON returned by the API. False if the call failed
+        """
+        key = cache_key(endpoint, params)
+        value = DEFAULT_CACHE.get(key)
+        if value is None:
+            value = await self.call(method, endpoint, params=params, warning_log=warning_log)
+            if value:
+                DEFAULT_CACHE.set(key, value)
+        return value
+
+# The sub-clients reuse the endpoint definitions of their sync versions - AsyncClient must come first so 'call' is awaited
+class AsyncFlightPlans (AsyncClient, client.FlightPlans):
+    pass
+
+class AsyncGame (AsyncClient, client.Game):
+    pass
+
+class AsyncLoans (AsyncClient, client.Loans):
+    pass
+
+class AsyncLocations (AsyncClient, client.Locations):
+    pass
+
+class AsyncMarketplace (AsyncClient, client.Marketplace):
+    pass
+
+class AsyncPurchaseOrders (AsyncClient, client.PurchaseOrders):
+    async def new_bulk_purchase_order(self, shipId, good, quantity):
+        """Makes a purchase order of any size by making back to back orders of at most 300 units.
+
+        Args:
+            shipId (str): ID of the ship to load the goods onto
+            good (str): Symbol of the good to purchase
+            quantity (int): How many units of the good to purchase
+
+        Returns:
+            dict: One order merged from every chunk - credits & ship after the last chunk, order with the total units & total cost.
+                None if there were no units to order
+        """
+        return await async_bulk_order(self.new_purchase_order, shipId, good, quantity)
+
+class AsyncSellOrders (AsyncClient, client.SellOrders):
+    async def new_bulk_sell_order(self, shipId, good, quantity):
+        """Makes a sell order of any size by making back to back orders of at most 300 units.
+
+        Args:
+            shipId (str): ID of the ship to offload the goods from
+            good (str): Symbol of the good to sell
+            quantity (int): How many units of the good to sell
+
+        Returns:
+            dict: One order merged from every chunk - credits & ship after the last chunk, order with the total units & total amount.
+                None if there were no units to order
+        """
+        return await async_bulk_order(self.new_sell_order, shipId, good, quantity)
+
+class AsyncShips (AsyncClient, client.Ships):
+    pass
+
+class AsyncStructures (AsyncClient, client.Structures):
+    pass
+
+class AsyncSystems (AsyncClient, client.Systems):
+    pass
+
+class AsyncUsers (AsyncClient, client.Users):
+    pass
+
+class AsyncApi ():
+    def __init__(self, username, token=None, base_url=URL, transport=None):
+        """The asyncio version of Api. One process can drive many ships concurrently over a single pooled connection.
+        All the sub-clients share one AsyncTransport and the process wide rate limiter.
+
+        Usage:
+            async with AsyncApi(username, token) as api:
+                markets = await asyncio.gather(*(api.marketplace.get_marketplace(s) for s in symbols))
+
+        Args:
+            username (str): Username of the user
+            token (str, optional): The personal auth token for the user. If None a new user will be created (blocking). Defaults to None.
+            base_url (str, optional): Root URL of the API - use to point at a local stand-in server. Defaults to URL.
+            transport (AsyncTransport, optional): An existing transport to use. Defaults to a new AsyncTransport for base_url.
+        """
+        self.username = username
+        self.transport = transport if transport is not None else AsyncTransport(base_url)
+        # Creating a user is a one off so the blocking call is acceptable here
+        self.token = token if token is not None else client.get_user_token(username, client.Transport(self.transport.base_url))
+        self.flightplans = AsyncFlightPlans(username, self.token, self.transport)
+        self.game = AsyncGame(username, self.token, self.transport)
+        self.loans = AsyncLoans(username, self.token, self.transport)
+        self.locations = AsyncLocations(username, self.token, self.transport)
+        self.marketplace = AsyncMarketplace(username, self.token, self.transport)
+        self.purchaseOrders = AsyncPurchaseOrders(username, self.token, self.transport)
+        self.sellOrders = AsyncSellOrders(username, self.token, self.transport)
+        self.ships = AsyncShips(username, self.token, self.transport)
+        self.structures = AsyncStructures(username, self.token, self.transport)
+        self.systems = AsyncSystems(username, self.token, self.transport)
+        self.users = AsyncUsers(username, self.token, self.transport)
+
+    async def aclose(self):
+        """Closes the pooled connections of the shared transport"""
+        await self.transport.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
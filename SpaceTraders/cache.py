@@ -0,0 +1,152 @@
+import os
+import re
+import time
+import pickle
+import logging
+import tempfile
+import threading
+from urllib.parse import urlencode
+
+
+CACHE_DIR = os.environ.get("SPACETRADERS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "spacetraders"))
+# Bump when the layout of cached data changes so old files are ignored
+CACHE_VERSION = 1
+# Static world data barely changes - refresh once a day
+TTL = 24 * 60 * 60
+
+def cache_key(endpoint, params=None):
+    """Builds the cache key for an endpoint and its params
+
+    Args:
+        endpoint (str): The API endpoint eg. game/ships
+        params (dict, optional): parameters of the request. Defaults to None.
+
+    Returns:
+        str: The key eg. game/ships?class=MK-I
+    """
+    params = sorted((k, v) for k, v in params.items() if v is not None) if params else []
+    return endpoint.strip("/") + ("?" + urlencode(params) if params else "")
+
+class StaticCache ():
+    def __init__(self, directory=CACHE_DIR, ttl=TTL, version=CACHE_VERSION, clock=time.time):
+        """A TTL and version aware cache of static world data (systems, locations & the ship catalogue).
+        Entries are pickled to disk so they survive restarts and are also kept in memory for the life of the process.
+
+        Args:
+            directory (str, optional): Folder the cache files are written to. Defaults to CACHE_DIR.
+            ttl (float, optional): Seconds an entry stays fresh. Defaults to TTL.
+            version (Any, optional): Entries written under a different version are treated as a miss. Defaults to CACHE_VERSION.
+            clock (callable, optional): Returns the current time in seconds. Defaults to time.time.
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.version = version
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.memory = {}
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key):
+        """Returns the file an entry is stored in"""
+        return os.path.join(self.directory, re.sub(r'[^A-Za-z0-9_.-]', '_', key) + ".pickle")
+
+    def _fresh(self, entry, ttl):
+        return entry['version'] == self.version and self.clock() - entry['stored'] < ttl
+
+    def get(self, key, ttl=None):
+        """Reads an entry from memory, falling back to disk
+
+        Args:
+            key (str): Key of the entry
+            ttl (float, optional): Override how many seconds the entry stays fresh. Defaults to the cache's ttl.
+
+        Returns:
+            Any: The cached value. None if missing, expired or from an older version
+        """
+        ttl = self.ttl if ttl is None else ttl
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is None:
+                try:
+                    with open(self.path(key), 'rb') as infile:
+                        entry = pickle.load(infile)
+                except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+                    entry = None
+            if entry is not None and self._fresh(entry, ttl):
+                self.memory[key] = entry
+                self.hits += 1
+                return entry['value']
+            self.memory.pop(key, None)
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        """Stores an entry in memory and on disk. The file is written atomically so readers never see half an entry
+
+        Args:
+            key (str): Key of the entry
+            value (Any): Any picklable value
+        """
+        entry = {"version": self.version, "stored": self.clock(), "value": value}
+        with self.lock:
+            self.memory[key] = entry
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+                with os.fdopen(fd, 'wb') as outfile:
+                    pickle.dump(entry, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, self.path(key))
+            except OSError as e:
+                logging.warning(f"Unable to write {key} to the cache at {self.directory}: {e}")
+
+    def get_or_fetch(self, key, fetch, ttl=None):
+        """Reads through the cache - only calls fetch on a miss and stores what it returns
+
+        Args:
+            key (str): Key of the entry
+            fetch (callable): Makes the API call. A falsy result (a failed call) is returned but not cached
+            ttl (float, optional): Override how many seconds the entry stays fresh. Defaults to the cache's ttl.
+
+        Returns:
+            Any: The cached or freshly fetched value
+        """
+        value = self.get(key, ttl)
+        if value is None:
+            value = fetch()
+            if value:
+                self.set(key, value)
+        return value
+
+    def invalidate(self, key=None):
+        """Removes an entry, or every entry if no key given, from memory and disk
+
+        Args:
+            key (str, optional): Key of the entry to remove. Defaults to None (everything).
+        """
+        with self.lock:
+            if key is None:
+                self.memory.clear()
+                paths = [os.path.join(self.directory, f) for f in os.listdir(self.directory) if f.endswith(".pickle")] \
+                    if os.path.isdir(self.directory) else []
+            else:
+                self.memory.pop(key, None)
+                paths = [self.path(key)]
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def stats(self):
+        """Returns the hit and miss counters of the cache
+
+        Returns:
+            dict: hits, misses & hit_rate
+        """
+        with self.lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+# The cache shared by Game, Systems & Ships
+DEFAULT_CACHE = StaticCache()
@@ -1,9 +1,11 @@
 import requests
 import logging
 import json
+from .transport import Transport, URL
+from .scheduler import DEFAULT_SCHEDULER, current_priority
+from .cache import DEFAULT_CACHE, cache_key
+from .orders import bulk_order
 
-
-URL = "https://api.spacetraders.io/"
 logging.basicConfig(format='%(asctime)s - %(levelname)s - %(message)s', level=logging.INFO)
 
 def make_request(method, url, headers, params):
@@ -21,32 +23,35 @@ def make_request(method, url, headers, params):
     Exceptions:
         Exception: Invalid method - must be GET, POST, PUT or DELETE
     """
-    # Define the different HTTP methods
+    # Define the different HTTP methods - only the one requested is called
     methods = {
-        "POST": requests.post(url, headers=headers, params=params),
-        "GET": requests.get(url, headers=headers, params=params),
-        "PUT": requests.put(url, headers=headers, params=params),
-        "DELETE": requests.delete(url, headers=headers, params=params)
+        "POST": requests.post,
+        "GET": requests.get,
+        "PUT": requests.put,
+        "DELETE": requests.delete
     }
 
     # If an Invalid method provided throw exception
     if method not in methods:
         logging.exception(f'Invalid method provided: {method}')
 
-    return methods[method]   
+    send = methods[method]
+    DEFAULT_SCHEDULER.acquire(current_priority(method))
+    return send(url, headers=headers, params=params)
 
-def get_user_token(username):
+def get_user_token(username, transport=None):
     """Trys to create a new user and return their token
 
     Args:
         username (str): Username to user
+        transport (Transport, optional): The transport to send the request over. Defaults to a new Transport.
 
     Returns:
         str: Token if user valid else None
     """
-    url = f"https://api.spacetraders.io/users/{username}/token"
+    transport = transport if transport is not None else Transport()
     try:
-        res = make_request("POST", url, None, None)
+        res = transport.request("POST", f"users/{username}/token")
         if res.ok:
             return res.json()['token']
         else:
@@ -56,7 +61,7 @@ def get_user_token(username):
         return e
 
 class Client ():
-    def __init__(self, username, token=None):
+    def __init__(self, username, token=None, transport=None):
         """The Client class handles all user interaction with the Space Traders API. 
         The class is initiated with the username and token of the user. 
         If the user does not provide a token the 'create_user' method will attempt to fire and create a user with the username provided. 
@@ -65,13 +70,15 @@ class Client ():
         Args:
             username (str): Username of the user
             token ([type]): The personal auth token for the user. If None will invoke the 'create_user' method
+            transport (Transport, optional): The transport used to send requests. Share one between clients to reuse connections. Defaults to a new Transport.
         """
         self.username = username
         self.token = token
+        self.transport = transport if transport is not None else Transport()
 
     def generic_api_call(self, method, endpoint, params=None, token=None, warning_log=None):
         """Function to make consolidate parameters to make an API call to the Space Traders API. 
-        Handles any throttling or error returned by the Space Traders API. 
+        Throttling and server errors are retried by the transport's retry policy, any other error is logged. 
 
         Args:
             method (str): The HTTP method to use. GET, POST, PUT or DELETE
@@ -85,7 +92,7 @@ class Client ():
         headers = {'Authorization': 'Bearer ' + token}
         # Make the request to the Space Traders API
         try:
-            r = make_request(method, URL + endpoint, headers, params) 
+            r = self.transport.request(method, endpoint, headers, params)
             # If an error returned from api 
             if 'error' in r.json():
                 error = r.json()
@@ -93,20 +100,7 @@ class Client ():
                 message = error['error']['message']
                 logging.warning(f"An error has occurred when hitting: {r.request.method} {r.url} with parameters: {params}. Error: " + str(error))
                 
-                # If throttling error
-                if code == 42901:
-                    logging.info("Throttle limit was reached. Pausing to wait for throttle")
-                    time.sleep(10)
-                    # Recall this method to make the request again. 
-                    return generic_api_call(method, endpoint, params, token, warning_log)
-                # Retry if server error
-                if code == 500 or code == 409:
-                    logging.info("Server errors. Pausing before trying again.")
-                    time.sleep(10)
-                    # Recall this method to make the request again. 
-                    return generic_api_call(method, endpoint, params, token, warning_log)
-                
-                # Unknown handling for error
+                # Retries have been exhausted or the error can't be retried
                 logging.warning(warning_log)
                 logging.exception(f"Something broke the script. Code: {code} Error Message: {message} ")
                 return False
@@ -115,6 +109,39 @@ class Client ():
         except Exception as e:
             return e
 
+    def call(self, method, endpoint, params=None, warning_log=None, as_json=True):
+        """Makes an API call with the client's token and unpacks the result
+
+        Args:
+            method (str): The HTTP method to use. GET, POST, PUT or DELETE
+            endpoint (str): The API endpoint
+            params (dict, optional): Any params required for the endpoint. Defaults to None.
+            warning_log (str, optional): Message to log if the call fails. Defaults to None.
+            as_json (bool, optional): Return the decoded JSON rather than the response. Defaults to True.
+
+        Returns:
+            Any: The JSON (or response) returned by the API. False if the call failed
+        """
+        res = self.generic_api_call(method, endpoint, params=params, token=self.token, warning_log=warning_log)
+        if not as_json:
+            return res
+        return res.json() if res else False
+
+    def cached_call(self, method, endpoint, params=None, warning_log=None):
+        """Makes an API call for static data through the on disk cache. The API is only hit on a cache miss
+
+        Args:
+            method (str): The HTTP method to use. Should be GET
+            endpoint (str): The API endpoint
+            params (dict, optional): Any params required for the endpoint. Defaults to None.
+            warning_log (str, optional): Message to log if the call fails. Defaults to None.
+
+        Returns:
+            Any: The JSON returned by the API. False if the call failed
+        """
+        key = cache_key(endpoint, params)
+        return DEFAULT_CACHE.get_or_fetch(key, lambda: self.call(method, endpoint, params=params, warning_log=warning_log))
+
 class FlightPlans(Client):
     # Get all active flights
     def get_active_flight_plans(self, symbol):
@@ -129,8 +156,7 @@ class FlightPlans(Client):
         endpoint = f"game/systems/{symbol}/flight-plans"
         warning_log = F"Unable to get flight plans for system: {symbol}."
         logging.info(f"Getting the flight plans in the {symbol} system")
-        res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("GET", endpoint, warning_log=warning_log)
 
     # Get Existing Flight
     def get_flight_plan(self, flightPlanId):
@@ -145,8 +171,7 @@ class FlightPlans(Client):
         endpoint = f"users/{self.username}/flight-plans/{flightPlanId}"
         warning_log = F"Unable to get flight plan: {flightPlanId}."
         logging.info(f"Getting flight plan: {flightPlanId}")
-        res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("GET", endpoint, warning_log=warning_log)
 
     # Create Flight Plan
     def new_flight_plan(self, shipId, destination):
@@ -160,8 +185,7 @@ class FlightPlans(Client):
         params = {"shipId": shipId, "destination": destination}
         warning_log = F"Unable to create Flight Plan for ship: {shipId}."
         logging.info(f"Creating flight plan for ship: {shipId} to destination: {destination}")
-        res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("POST", endpoint, params=params, warning_log=warning_log)
 
 class Game (Client):
     # Get game status
@@ -171,8 +195,7 @@ class Game (Client):
         endpoint = f"game/status"
         warning_log = F"Game is currently down"
         logging.info(f"Checking if game is up")
-        res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("GET", endpoint, warning_log=warning_log)
 
 class Loans (Client):
     # Get available loans
@@ -185,8 +208,7 @@ class Loans (Client):
         endpoint = f"game/loans"
         warning_log = F"Unable to retrieve the loans available"
         logging.info(f"Retrieving the loans currently available")
-        res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("GET", endpoint, warning_log=warning_log)
 
     # Get user's loans
     def get_user_loans(self):
@@ -198,8 +220,7 @@ class Loans (Client):
         endpoint = f"users/{self.username}/loans"
         warning_log = F"Unable to retrieve the loans of the user"
         logging.info(f"Retrieving the loans of the user: {self.username}")
-        res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("GET", endpoint, warning_log=warning_log)
 
     # Pay off loan
     def pay_off_loan(self, loanId):
@@ -214,8 +235,7 @@ class Loans (Client):
         endpoint = f"users/{self.username}/loans/{loanId}"
         warning_log = F"Unable to pay off loan: {loanId}"
         logging.info(f"Paying off loan")
-        res = self.generic_api_call("PUT", endpoint, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("PUT", endpoint, warning_log=warning_log)
 
     # Request new loan
     def request_loan(self, type):
@@ -231,8 +251,7 @@ class Loans (Client):
         warning_log = F"Unable to take loan of type: {type}"
         logging.info(f"Requesting {type} loan")
         params = {"type": type}
-        res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("POST", endpoint, params=params, warning_log=warning_log)
 
 class Locations (Client):
     # Get Location
@@ -248,8 +267,7 @@ class Locations (Client):
         endpoint = f"game/locations/{symbol}"
         warning_log = F"Unable to get info for the location: {symbol}"
         logging.info(f"Getting location info for {symbol}")
-        res = self.generic_api_call("GET", endpoint,token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("GET", endpoint, warning_log=warning_log)
 
     # Get Ships at Location
     def get_ships_at_location(self, symbol):
@@ -264,8 +282,7 @@ class Locations (Client):
         endpoint = f"game/locations/{symbol}/ships"
         warning_log = F"Unable to get ships docked at the location: {symbol}"
         logging.info(f"Getting the ships docked at: {symbol}")
-        res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log)
-        return res.json() if res else False    
+        return self.call("GET", endpoint, warning_log=warning_log)    
 
     # Get System's Locations
     def get_system_locations(self, symbol):
@@ -280,8 +297,7 @@ class Locations (Client):
         endpoint = f"game/systems/{symbol}/locations"
         warning_log = F"Unable to get the locations in the system: {symbol}"
         logging.info(f"Getting the locations in system: {symbol}")
-        res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log)
-        return res.json() if res else False  
+        return self.call("GET", endpoint, warning_log=warning_log)  
 
 class Marketplace (Client):
     # Get Location's marketplace
@@ -297,8 +313,7 @@ class Marketplace (Client):
         endpoint = f"game/locations/{symbol}/marketplace"
         warning_log = F"Unable to get the marketplace for the location: {symbol}"
         logging.info(f"Getting the marketplace for location: {symbol}")
-        res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log)
-        return res.json() if res else False  
+        return self.call("GET", endpoint, warning_log=warning_log)  
 
 class PurchaseOrders (Client):
     def new_purchase_order(self, shipId, good, quantity):
@@ -312,8 +327,20 @@ class PurchaseOrders (Client):
         endpoint = f"users/{self.username}/purchase-orders"
         params = {"shipId": shipId, "good": good, "quantity": quantity}
         warning_log = F"Unable to make purchase order for ship: {shipId}, good: {good} & quantity: {quantity}"
-        res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("POST", endpoint, params=params, warning_log=warning_log)
+
+    def new_bulk_purchase_order(self, shipId, good, quantity):
+        """Makes a purchase order of any size by making back to back orders of at most 300 units.
+
+        Args:
+            shipId (str): ID of the ship to load the goods onto
+            good (str): Symbol of the good to purchase
+            quantity (int): How many units of the good to purchase
+
+        Returns:
+            dict: One order merged from every chunk - credits & ship after the last chunk, order with the total units & total cost
+        """
+        return bulk_order(self.new_purchase_order, shipId, good, quantity)
 
 class SellOrders (Client):
     # Sell Orders
@@ -328,8 +355,20 @@ class SellOrders (Client):
         endpoint = f"users/{self.username}/sell-orders"
         params = {"shipId": shipId, "good": good, "quantity": quantity}
         warning_log = F"Unable to make sell order for ship: {shipId}, good: {good} & quantity: {quantity}"
-        res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("POST", endpoint, params=params, warning_log=warning_log)
+
+    def new_bulk_sell_order(self, shipId, good, quantity):
+        """Makes a sell order of any size by making back to back orders of at most 300 units.
+
+        Args:
+            shipId (str): ID of the ship to offload the goods from
+            good (str): Symbol of the good to sell
+            quantity (int): How many units of the good to sell
+
+        Returns:
+            dict: One order merged from every chunk - credits & ship after the last chunk, order with the total units & total amount
+        """
+        return bulk_order(self.new_sell_order, shipId, good, quantity)
 
 class Ships (Client):
     def buy_ship(self, location, type):
@@ -344,8 +383,7 @@ class Ships (Client):
         params = {"location": location, "type": type}
         warning_log = F"Unable to buy ship type: {type}, at location: {location}."
         logging.info(f"Buying ship of type: {type} at location: {location}")
-        res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("POST", endpoint, params=params, warning_log=warning_log)
 
     # Get available ships
     def get_available_ships(self, type=None):
@@ -363,8 +401,7 @@ class Ships (Client):
         params = {"class": type}
         warning_log = F"Unable to get available ships. Class Filter: {type}"
         logging.info(f"Getting available ships to purchase. Filter: {type}")
-        res = self.generic_api_call("GET", endpoint, params=params, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.cached_call("GET", endpoint, params=params, warning_log=warning_log)
 
     # Get Ship
     def get_ship(self, shipId):
@@ -381,8 +418,7 @@ class Ships (Client):
         endpoint = f"users/{self.username}/ships/{shipId}"
         warning_log = F"Unable to get info fo ship: {shipId}"
         logging.info(f"Getting info on ship: {shipId}")
-        res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("GET", endpoint, warning_log=warning_log)
 
     # Get Users ships
     def get_user_ships(self):
@@ -396,8 +432,7 @@ class Ships (Client):
         endpoint = f"users/{self.username}/ships"
         warning_log = F"Unable to get list of owned ships."
         logging.info(f"Getting a list of owned ships")
-        res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("GET", endpoint, warning_log=warning_log)
 
     # Jettison Cargo
     def jettinson_cargo(self, shipId, good, quantity):
@@ -417,8 +452,7 @@ class Ships (Client):
         warning_log = F"Unable to jettison cargo from ship. Params - shipId: {shipId}, good: {good}, quantity: {quantity}"
         logging.info(f"Jettison the following cargo from ship: {shipId}, good: {good}, quantity: {quantity}")
         params = {"good": good, "quantity": quantity}
-        res = self.generic_api_call("PUT", endpoint, params=params, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("PUT", endpoint, params=params, warning_log=warning_log)
 
     # Scrap Ship
     def scrap_ship(self, shipId):
@@ -439,8 +473,7 @@ class Ships (Client):
         endpoint = f"users/{self.username}/ships/{shipId}/"
         warning_log = f"Failed to scrap ship ({shipId})."
         logging.info(f"Scrapping ship: {shipId}")
-        res = self.generic_api_call("DELETE", endpoint, token=self.token, warning_log=warning_log)
-        return res
+        return self.call("DELETE", endpoint, warning_log=warning_log, as_json=False)
 
     # Transfer Cargo
     def transfer_cargo(self, fromShipId, toShipId, good, quantity):
@@ -461,8 +494,7 @@ class Ships (Client):
         warning_log = F"Unable to transfer {quantity} units of {good} from ship: {fromShipId} to ship: {toShipId}"
         logging.info(f"Transferring {quantity} units of {good} from ship: {fromShipId} to ship: {toShipId}")
         params = {"toShipId": toShipId, "good": good, "quantity": quantity}
-        res = self.generic_api_call("PUT", endpoint, params=params, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("PUT", endpoint, params=params, warning_log=warning_log)
 
 class Structures (Client):
     # Create a new structure
@@ -477,8 +509,7 @@ class Structures (Client):
         params = {"location": location, "type": type}
         warning_log = F"Unable to create structure type: {type}, at location: {location}."
         logging.info(f"Creating structure of type: {type} at location: {location}")
-        res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("POST", endpoint, params=params, warning_log=warning_log)
 
     # Deposit Goods
     def deposit_goods(self, structureId, shipId, good, quantity):
@@ -497,8 +528,7 @@ class Structures (Client):
         params = {"shipId": shipId, "good": good, "quantity": quantity}
         warning_log = F"Unable to deposit {quantity} units of {good} from ship: {shipId} into structure: {structureId}"
         logging.info(f"Depositing {quantity} units of {good} from ship: {shipId} into structure: {structureId}")
-        res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("POST", endpoint, params=params, warning_log=warning_log)
 
     # Get your structure info
     def get_structure(self, structureId):
@@ -513,8 +543,7 @@ class Structures (Client):
         endpoint = f"users/{self.username}/structures/{structureId}"
         warning_log = F"Unable to get the info for structure: {structureId}"
         logging.info(f"Getting info about structure: {structureId}")
-        res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("GET", endpoint, warning_log=warning_log)
 
     # Get your strucutres
     def get_users_structures(self):
@@ -526,8 +555,7 @@ class Structures (Client):
         endpoint = f"users/{self.username}/structures"
         warning_log = F"Unable to get the info about your structures"
         logging.info(f"Getting info about the user's structures")
-        res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("GET", endpoint, warning_log=warning_log)
 
     # Transfer goods
     def transfer_goods(self, structureId, shipId, good, quantity):
@@ -546,8 +574,7 @@ class Structures (Client):
         params = {"shipId": shipId, "good": good, "quantity": quantity}
         warning_log = F"Unable to transfer {quantity} units of {good} from structure: {structureId} into ship: {shipId}"
         logging.info(f"Transferring {quantity} units of {good} from structure: {structureId} into ship: {shipId}")
-        res = self.generic_api_call("POST", endpoint, params=params, token=self.token, warning_log=warning_log)
-        return res.json() if res else False
+        return self.call("POST", endpoint, params=params, warning_log=warning_log)
 
 class Systems (Client):
     # Get system info
@@ -561,8 +588,7 @@ class Systems (Client):
         endpoint = f"game/systems"
         warning_log = F"Unable to get systems"
         logging.info(f"Getting systems")
-        res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log)
-        return res.json() if res else False    
+        return self.cached_call("GET", endpoint, warning_log=warning_log)    
 
 class Users (Client):
 
@@ -576,25 +602,34 @@ class Users (Client):
         endpoint = f"users/{self.username}"
         warning_log = F"Unable to get {self.username} user info"
         logging.info(f"Getting user info for {self.username}")
-        res = self.generic_api_call("GET", endpoint, token=self.token, warning_log=warning_log)
-        return res.json() if res else False    
+        return self.call("GET", endpoint, warning_log=warning_log)    
 
 
 class Api ():
-    def __init__(self, username, token=None):
+    def __init__(self, username, token=None, base_url=URL, transport=None):
+        """Bundles a client for every section of the Space Traders API. 
+        All of the clients share a single Transport so requests reuse the same pooled connections.
+
+        Args:
+            username (str): Username of the user
+            token (str, optional): The personal auth token for the user. If None a new user will be created. Defaults to None.
+            base_url (str, optional): Root URL of the API - use to point at a local stand-in server. Defaults to URL.
+            transport (Transport, optional): An existing transport to use. Defaults to a new Transport for base_url.
+        """
         self.username = username
-        self.token = token if token is not None else get_user_token(username)
-        self.flightplans = FlightPlans(username, token)
-        self.game = Game(username, token)
-        self.loans = Loans(username, token)
-        self.locations = Locations(username, token)
-        self.marketplace = Marketplace(username, token)
-        self.purchaseOrders = PurchaseOrders(username, token)
-        self.sellOrders = SellOrders(username, token)
-        self.ships = Ships(username, token)
-        self.structures = Structures(username, token)
-        self.systems = Systems(username, token)
-        self.users = Users(username, token)
+        self.transport = transport if transport is not None else Transport(base_url)
+        self.token = token if token is not None else get_user_token(username, self.transport)
+        self.flightplans = FlightPlans(username, self.token, self.transport)
+        self.game = Game(username, self.token, self.transport)
+        self.loans = Loans(username, self.token, self.transport)
+        self.locations = Locations(username, self.token, self.transport)
+        self.marketplace = Marketplace(username, self.token, self.transport)
+        self.purchaseOrders = PurchaseOrders(username, self.token, self.transport)
+        self.sellOrders = SellOrders(username, self.token, self.transport)
+        self.ships = Ships(username, self.token, self.transport)
+        self.structures = Structures(username, self.token, self.transport)
+        self.systems = Systems(username, self.token, self.transport)
+        self.users = Users(username, self.token, self.transport)
 
 
 if __name__ == "__main__":
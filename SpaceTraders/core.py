@@ -1,12 +1,27 @@
 import requests
-import pandas as pd
 import math
 import time
 import json
-from rich.progress import Progress, track
 import logging
-
-URL = "https://api.spacetraders.io/"
+import numpy as np
+# pandas & rich are imported by the methods that use them so importing core stays cheap
+from .transport import Transport, URL
+from .cache import DEFAULT_CACHE, cache_key
+from .orders import bulk_order
+from .models import ShipModel, LocationModel, UserModel
+from .world import get_world, FUEL_PENALTIES
+from .snapshot import load_snapshot
+from .spatial import SpatialIndex, get_spatial_index, find_location, system_of
+from .fleet import Fleet
+from .arbitrage import ArbitrageEngine
+from .routes import RoutePlanner
+from .flights import FlightTimeModel
+from .impact import PriceImpactModel
+from .markets import MARKETS, MAX_AGE
+from . import reconcile
+
+# Shared by every thread so requests reuse connections and are paced by the shared rate limiter
+TRANSPORT = Transport()
 
 logging.basicConfig(format='%(asctime)s - %(thread)d - %(levelname)s - %(message)s', level=logging.INFO)
 
@@ -14,7 +29,7 @@ R  = '\033[31m' # red
 G  = '\033[32m' # green
 W  = '\033[0m'  # white (normal)
 
-class Ship(object):
+class Ship(ShipModel):
   '''
   Ship Object
 
@@ -35,70 +50,116 @@ class Ship(object):
   spaceAvailable : int
   cargo : List
   '''
+  __slots__ = ("token", "fleet", "_cargo", "_cargo_of")
+
   def __init__(self, token, *initial_data, **kwargs):
       self.token = token
-      self.cargo = initial_data[0]['cargo']
-      self.location = initial_data[0]['location'] if 'location' in initial_data[0] else "IN-TRANSIT"
-      self.x = initial_data[0]['x'] if 'location' in initial_data[0] else None
-      self.y = initial_data[0]['y'] if 'location' in initial_data[0] else None
-      self.kind = initial_data[0]['class']
-      for dictionary in initial_data:
-          for key in dictionary:
-              setattr(self, key, dictionary[key])
-      for key in kwargs:
-          setattr(self, key, kwargs[key])
-
-  def as_dict(self):
-    return {
-      "id": self.id,
-      "manufacturer": self.manufacturer,
-      "class": self.kind,
-      "type": self.type,
-      "location": self.location,
-      "x": self.x,
-      "y": self.y,
-      "speed": self.speed,
-      "plating": self.plating,
-      "weapons": self.weapons,
-      "maxCargo": self.maxCargo,
-      "spaceAvailable": self.spaceAvailable,
-      "cargo": self.cargo
-    }
-  
+      # The Fleet the ship belongs to - set by the fleet when the ship is added
+      self.fleet = None
+      self._cargo_of = None
+      # Usually one dict straight from the API - only merge when given more than that
+      if len(initial_data) == 1 and not kwargs:
+        data = initial_data[0]
+      else:
+        data = {}
+        for dictionary in initial_data:
+          data.update(dictionary)
+        data.update(kwargs)
+      self._load(data)
+
+  @property
+  def cargo_index(self):
+    '''
+    Returns a dict of the cargo on board keyed by good eg. {"FUEL": {"good": "FUEL", "quantity": 20, "totalVolume": 20}}
+
+    Built the first time it's needed and kept up to date by update_cargo & apply_order. Rebuilt if 'cargo' is replaced directly
+    '''
+    if self._cargo_of is not self.cargo:
+      self._cargo = {entry['good']: entry for entry in self.cargo}
+      self._cargo_of = self.cargo
+    return self._cargo
+
+  def cargo_quantity(self, good):
+    '''
+    Returns an 'int' of how many units of a good are on board
+    '''
+    entry = self.cargo_index.get(good)
+    return entry['quantity'] if entry is not None else 0
+
+  def cargo_volume(self, good=None):
+    '''
+    Returns an 'int' of the volume a good takes up on board. The volume of all the cargo if no good is given
+    '''
+    if good is None:
+      return self.maxCargo - self.spaceAvailable
+    entry = self.cargo_index.get(good)
+    return entry['totalVolume'] if entry is not None else 0
+
+  def free_space(self):
+    '''
+    Returns an 'int' of the cargo volume not in use
+    '''
+    return self.spaceAvailable
+
   # Get Good to sell
   def get_cargo_to_sell(self):
     '''
     Return a list of all the cargo on the ship execpt for FUEL
     '''
-    cargo_not_fuel = lambda x: x['good'] != "FUEL"
-    cargo_to_sell=list(filter(cargo_not_fuel,self.cargo))
-    return cargo_to_sell
+    return [entry for good, entry in self.cargo_index.items() if good != "FUEL"]
 
   def get_fuel_level(self):
     '''
     Returns an 'int' of the current FUEL onboard the ship
     '''
-    fuel = lambda x: x['good'] == "FUEL"
-    cargo_fuel=list(filter(fuel,self.cargo))
-    return cargo_fuel[0]['quantity'] if len(cargo_fuel) > 0 else 0
+    return self.cargo_quantity("FUEL")
 
   def update_cargo(self, new_cargo, new_spaceAvailable):
     '''
     Updates the cargo & spaceAvailable attributes of this Ship object.
 
     Enures that any downstream calls of this object have the correct information. Ensure to use this method after any orders.
+    The cargo index is kept in place and pointed at the new cargo's entries - goods no longer on board are dropped.
     '''
     logging.debug("Updating Cargo & Space Available of ship: {0}. Previous Cargo: {1}. New Cargo: {2}. Previous Space Available: {3}. New Space Available: {4}".format(self.id, self.cargo, new_cargo, self.spaceAvailable, new_spaceAvailable))
-    self.cargo = new_cargo
+    index = self.cargo_index
+    # Every entry comes from the new cargo so the index & the cargo list share the same dicts
+    for entry in new_cargo:
+      index[entry['good']] = entry
+    if len(index) != len(new_cargo):
+      goods = {entry['good'] for entry in new_cargo}
+      for good in index.keys() - goods:
+        del index[good]
+    self.cargo = self._cargo_of = new_cargo
     self.spaceAvailable = new_spaceAvailable
+    self.changed()
     return True
 
+  def apply_order(self, response):
+    '''
+    Updates the ship from the response of a purchase or sell order (including a merged bulk order).
+
+    The whole cargo & spaceAvailable of the response's ship are applied through update_cargo, not just the ordered good's entry,
+    so every index entry is repointed at the returned cargo - no need to fetch the ship again.
+    '''
+    ship = response['ship']
+    logging.debug("Applying order of {0} to ship: {1}. New Space Available: {2}".format(response.get('order', {}).get('good'), self.id, ship['spaceAvailable']))
+    return self.update_cargo(ship['cargo'], ship['spaceAvailable'])
+
+  def changed(self):
+    '''
+    Tells the ship's fleet the ship changed so its indexes stay in sync. Called by the update methods
+    '''
+    if self.fleet is not None:
+      self.fleet.refresh(self)
+
   def update_location(self, new_x, new_y, new_location):
     logging.debug("Updating location of ship. Previous Location: {0}. Previous X: {1}. Previous Y: {2}. New Location: {3}, New X: {4}, New Y: {5}".\
       format(self.location, self.x, self.y, new_location, new_x, new_y))
     self.location = new_location
     self.x = new_x
     self.y = new_y
+    self.changed()
     return True
 
   def calculate_fuel_usage(self, from_loc, distance=None, to_loc=None):
@@ -114,18 +175,12 @@ class Ship(object):
     '''
     calc_fuel = lambda d, p: round((d / 4) + 1 + p)
 
-    penalties = {
-      "MK-I": 2,
-      "MK-II": 3,
-      "MK-III": 4
-    }
-
     # Calc distance if not supplied
     if distance is None:
       distance = self.calculate_distance(to_loc.x, to_loc.y)
     
-    # Calc the penalty
-    penalty = penalties[self.kind] if from_loc.type == "PLANET" else 0
+    # Calc the penalty - the same penalties the World's fuel matrices are built from
+    penalty = FUEL_PENALTIES[self.kind] if from_loc.type == "PLANET" else 0
     
     return calc_fuel(distance, penalty)
 
@@ -135,21 +190,28 @@ class Ship(object):
   def calculate_distance(self, to_x, to_y):
     return round(math.sqrt(math.pow((to_x - self.x),2) + math.pow((to_y - self.y),2)))
 
-  def get_closest_location(self):
+  def get_closest_location(self, game=None, exclude_types=None):
     """
     Returns a tuple containing the clostest location to the ship
     
     [0]: A Location object of the closet location
     [1]: Distance to the location
+
+    :param game : Game - Search this game's locations. Defaults to the shared index of the cached systems
+    :param exclude_types : str or list - Location types to ignore eg. "WORMHOLE"
     """
-    locations = Game(self.token).locations
-    # Remove the ships current location
-    locations.pop(self.location)
-    # Remove all locations not in the same system as ship
-    locations_filtered = {k:v for k,v in locations.items() if self.location[:2] in k}
-    # Calculate the closet location
-    closet_location = min(locations_filtered.values(), key=lambda loc: self.calculate_distance(loc.x, loc.y))
-    return (closet_location, self.calculate_distance(closet_location.x, closet_location.y))
+    if game is not None:
+      index = game.spatial
+    else:
+      index = get_spatial_index(load_systems(self.token))
+    closest = index.nearest(self.x, self.y, system_of(self.location), exclude=self.location, exclude_types=exclude_types)
+    if closest is None:
+      return None
+    location, distance = closest
+    # The shared index holds bare models - give the caller a Location with the ship's token
+    if not isinstance(location, Location):
+      location = Location(self.token, location.as_dict())
+    return (location, distance)
   
   def __repr__(self):
     return """
@@ -184,26 +246,36 @@ class Ship(object):
       cargo : {12}
     """.format(self.id, self.manufacturer, "temp class", self.type, self.location, self.x, self.y, self.speed, self.plating, self.weapons, self.maxCargo, self.spaceAvailable, self.cargo)
 
-class User:
+class User(UserModel):
   '''User Object
   
   https://api.spacetraders.io/#api-users'''
+  __slots__ = ("token", "drift")
+
   def __init__(self, token, *args, **kwargs):
     # Handle if Token was incorrectly placed
     if isinstance(token, str):
       self.token = token
     else:
       raise TypeError("Incorrect data type for token")
+    # Every response that changes the user is applied to it - this catches anything that still drifts
+    self.drift = reconcile.DriftCheck()
     # Set user Params from the arguments if user dict provided
     if len(args) == 1:
-      self.username = args[0]['username']
-      self.credits = args[0]['credits']
-      self.ships = self.get_ships(ships=args[0]['ships'])
-      self.loans = args[0]['loans']
+      self._load(args[0])
     # set user params if key word labels used
     else:
+      self._load({})
       for key in kwargs:
-          setattr(self, key, kwargs[key])
+        self.set(key, kwargs[key])
+
+  def _load(self, data):
+    super()._load(data)
+    # Keep the ships in an indexed fleet rather than a plain list
+    self.ships = Fleet(self.ships)
+
+  def make_ship(self, data):
+    return Ship(self.token, data)
   
   def __repr__(self):
     return f"<User Object> "\
@@ -217,17 +289,42 @@ class User:
     API CALL: https://api.spacetraders.io/#api-loans-NewLoan
     '''
     # TODO: Return a loan object
-    return generic_post_call("users/{0}/loans".format(self.username), params={"type": type}, token=self.token)
+    response = generic_post_call("users/{0}/loans".format(self.username), params={"type": type}, token=self.token)
+    if response:
+      reconcile.apply_loan(self, response)
+    return response
+
+  def pay_loan(self, loanId):
+    '''
+    API CALL: https://api.spacetraders.io/#api-loans-PayLoan
+    '''
+    response = generic_api_call("PUT", "users/{0}/loans/{1}".format(self.username, loanId), token=self.token)
+    if response:
+      reconcile.apply_loan(self, response)
+    return response
 
   def buy_ship(self, location, type):
     '''
     API CALL: https://api.spacetraders.io/#api-ships-NewShip
     '''
     # TODO: return a ship object
+    response = generic_post_call("users/{0}/ships".format(self.username), 
+                                 params={"location": location, "type": type},
+                                 token=self.token)
+    # Update the 'ships' attribute & credits of the user
+    if response:
+      reconcile.apply_ship_purchase(self, response)
+    return response
+
+  def scrap_ship(self, shipId):
+    '''
+    API CALL: https://api.spacetraders.io/#api-ships-ScrapShip
+    '''
+    response = generic_api_call("DELETE", "users/{0}/ships/{1}".format(self.username, shipId), token=self.token)
     # Update the 'ships' attribute of the user
-    return generic_post_call("users/{0}/ships".format(self.username), 
-                             params={"location": location, "type": type},
-                             token=self.token)
+    if response:
+      self.ships.remove(shipId)
+    return response
   
   def get_ships(self, ships=None, as_df=False, fields=None, sort_by=None, filter_by=None):
     '''
@@ -236,20 +333,18 @@ class User:
     # Check if the list of ships contains original json data or Ship objects
     # If JSON convert into Ship objects and return
     if ships is not None:
-      return [Ship(self.token, ship) for ship in ships]
+      return [self.make_ship(ship) for ship in ships]
 
-    return_ships = self.ships
-    if filter_by is not None:
-      for f in filter_by:
-        return_ships = list(filter((lambda x: getattr(x, f[0]) == f[1]), return_ships))
-    if sort_by is not None:
-      return_ships.sort(key = lambda x: tuple(getattr(x, s) for s in sort_by))
+    # The DataFrame is built from the fleet's cached snapshot - already filtered & only holding the fields asked for
     if as_df:
-      return_ships = pd.DataFrame([ship.as_dict() for ship in return_ships])
-      if fields is not None:
-        return_ships = return_ships.loc[:,fields]
+      import pandas as pd
+      return pd.DataFrame(self.ships.snapshot(fields, filter_by or (), sort_by))
 
-    return return_ships
+    # A new list every time - the user's fleet is never filtered or sorted in place
+    query = self.ships.where(*(filter_by or ()))
+    if sort_by is not None:
+      query = query.sort_by(*sort_by)
+    return query.all()
   
   def get_ship(self, shipId):
     '''
@@ -258,7 +353,7 @@ class User:
     :Param shipId : str
     :Return ship : Ship 
     '''
-    return next((ship for ship in self.ships if ship.id == shipId), None)
+    return self.ships.get(shipId)
 
   def new_order(self, shipId, good, quantity):
     '''Makes a request to the API to make a buy order. User needs to have suffient funds and can only purchase a maximum of 300 goods at once.
@@ -299,6 +394,10 @@ class User:
               "quantity": quantity}
     # Make call
     order = generic_post_call(endpoint, params=params, token=self.token)
+    # Keep the user's credits & ship up to date
+    if order:
+      reconcile.apply_order(self, order)
+      MARKETS.apply_order(order, buying=True)
     # Log the result
     logging.info("Buying {0} units of {1} for {2} at {3}. Remaining credits: {4}. Loading Goods onto ship: {5}"\
       .format(order['order']['quantity'], order['order']['good'], 
@@ -328,6 +427,10 @@ class User:
     }
     # Make call
     order = generic_post_call(endpoint, params=params, token=self.token)
+    # Keep the user's credits & ship up to date
+    if order:
+      reconcile.apply_order(self, order)
+      MARKETS.apply_order(order, buying=False)
     # Log the result
     logging.info("Selling {0} units of {1} for {2} at {3}. Remaining credits: {4}. Offloading Goods from ship: {5}"\
       .format(order['order']['quantity'], order['order']['good'], 
@@ -335,13 +438,43 @@ class User:
               order['credits'], shipId))
     return order
 
-  def fly(self, shipId, destination, track=False):
+  def bulk_buy(self, shipId, good, quantity):
+    """Buys any number of units by making back to back buy orders of at most 300 units.
+    The orders are paced by the shared rate limiter.
+
+    Args:
+        shipId (str): id of the ship to load the goods onto
+        good (str): the symbol of the good to buy
+        quantity (int): how many units of the good to buy
+
+    Returns:
+        dict: One order merged from every chunk - credits & ship after the last chunk, order with the total units & total cost
+    """
+    return bulk_order(self.new_order, shipId, good, quantity)
+
+  def bulk_sell(self, shipId, good, quantity):
+    """Sells any number of units by making back to back sell orders of at most 300 units.
+    The orders are paced by the shared rate limiter.
+
+    Args:
+        shipId (str): id of the ship to sell the goods from
+        good (str): the symbol of the good to sell
+        quantity (int): how many units of the good to sell
+
+    Returns:
+        dict: One order merged from every chunk - credits & ship after the last chunk, order with the total units & total amount
+    """
+    return bulk_order(self.sell_order, shipId, good, quantity)
+
+  def fly(self, shipId, destination, track=False, game=None):
     endpoint = "users/{0}/flight-plans".format(self.username)
     flight = generic_post_call(endpoint, params={"shipId": shipId,
                                                    "destination": destination}, token=self.token)['flightPlan']
+    reconcile.apply_departure(self, flight)
     logging.info("Ship {0} has left {1} and is flying to {2}. It will take {3} seconds.".format(shipId, flight['departure'], destination, flight['timeRemainingInSeconds']))
     # Track the flights progress in the console
     if track:
+      from rich.progress import Progress
       # Create Progress Bar
       with Progress() as progress:
         flightTime = flight['timeRemainingInSeconds']
@@ -356,14 +489,43 @@ class User:
               progress.update(flight_progress, description="[red]Landing...")
             time.sleep(1)
         logging.info("Ship {0} has landed at {1}".format(shipId, destination))
+        self.land(flight, game)
         return flight
     # Don't wont the visual timer in the console
     else:
       # Wait for the length of the flight
       time.sleep(flight['timeRemainingInSeconds'] + 15)
       logging.info("Ship {0} has landed at {1}".format(shipId, destination))
+      self.land(flight, game)
       return flight
 
+  def land(self, flight, game=None):
+    '''
+    Lands the ship of a flight plan at its destination. No call to the API
+
+    :param flight : dict - The flightPlan the ship flew
+    :param game : Game - Takes the x & y of the destination from this game. Defaults to any spatial index already built
+    '''
+    destination = flight['destination']
+    location = game.locations.get(destination) if game is not None else find_location(destination)
+    reconcile.apply_arrival(self, flight, location)
+
+  def check_drift(self, force=False):
+    '''
+    Compares the user with users/{username} and repairs anything that drifted. Only calls the API when a check is due
+
+    :param force : bool - Check even if a check isn't due
+    :return : list - A description of each thing that drifted
+
+    **CALL TO API** - only when a check is due
+    '''
+    if not force and not self.drift.due():
+      return []
+    fetched = generic_get_call("users/" + self.username, token=self.token)
+    if not fetched:
+      return []
+    return self.drift.check(self, fetched['user'])
+
   def flight(self, flightPlanId):
     return generic_get_call("users/{0}/flight-plans/{1}".format(self.username, flightPlanId), token=self.token)
 
@@ -376,50 +538,64 @@ class Loan:
     self.type = type
   
 class Market:
-  def __init__(self, game):
+  def __init__(self, game, flight_time=None, price_impact=None):
+    '''
+    :param game : Game - the game the markets are in
+    :param flight_time : FlightTimeModel - how long flights tie ships up for. Defaults to the API's flight time plus docking eg. FlightTimeModel.from_history() fits it to the flights flown
+    :param price_impact : PriceImpactModel - how prices move as goods are bought & sold. Defaults to the same impact for every good eg. PriceImpactModel.from_history() fits it to the market readings
+    '''
     self.game = game
+    self.flight_time = FlightTimeModel() if flight_time is None else flight_time
+    self.price_impact = PriceImpactModel() if price_impact is None else price_impact
 
   # Expect DataFrames to be passed to it
-  def market_compare(self, from_market, to_market):
-    """Returns a DataFrame with matching Goods and the profit made/lost if sold from the 'from_market' to the 'to_market'"""
+  def market_compare(self, from_market, to_market, max_age=MAX_AGE):
+    """Returns a DataFrame with matching Goods and the profit made/lost if sold from the 'from_market' to the 'to_market'.
+    Markets given by symbol are read from the MarketStore if fetched no more than 'max_age' seconds ago"""
+    import pandas as pd
     # Convert to DataFrames if String value of Symbol provided
     if isinstance(from_market, str):
-      from_market = pd.DataFrame(self.game.location(from_market).marketplace())
+      from_market = pd.DataFrame(self.game.location(from_market).marketplace(max_age))
     if isinstance(to_market, str):
-      to_market = pd.DataFrame(self.game.location(to_market).marketplace())
+      to_market = pd.DataFrame(self.game.location(to_market).marketplace(max_age))
     # Do an Inner Join of the Markets on available goods (symbols)
     market_compare = from_market.join(to_market.set_index('symbol'), on="symbol", how="inner", lsuffix="_from", rsuffix="_to")
-    # Get the Profit Margins - factoring in volume of the good
-    profit_margin = lambda x: x.sellPricePerUnit_to - x.purchasePricePerUnit_from
-    profit_margin_per_volume = lambda x: profit_margin(x) / x.volumePerUnit_from
-    market_compare['profit'] = market_compare.apply(profit_margin, axis=1)
-    market_compare['profit_per_volume'] = market_compare.apply(profit_margin_per_volume, axis=1)
+    # Get the Profit Margins - factoring in volume of the good. Whole columns at once rather than row by row
+    market_compare['profit'] = market_compare['sellPricePerUnit_to'] - market_compare['purchasePricePerUnit_from']
+    market_compare['profit_per_volume'] = market_compare['profit'] / market_compare['volumePerUnit_from']
     return market_compare
   
-  def best_buy(self, from_market, to_market):
-    """Returns a JSON object with the best Good to buy at the 'from_destination' if wanting to sell goods at the 'to_destination'"""
+  def best_buy(self, from_market, to_market, max_age=MAX_AGE):
+    """Returns a JSON object with the best Good to buy at the 'from_destination' if wanting to sell goods at the 'to_destination'.
+    Markets given by symbol are read from the MarketStore if fetched no more than 'max_age' seconds ago"""
+    import pandas as pd
     # Convert to Location and get market if String value of Symbol provided
     if isinstance(from_market, str):
-      from_market = pd.DataFrame(self.game.location(from_market).marketplace())
+      from_market = pd.DataFrame(self.game.location(from_market).marketplace(max_age))
     if isinstance(to_market, str):
-      to_market = pd.DataFrame(self.game.location(to_market).marketplace())
+      to_market = pd.DataFrame(self.game.location(to_market).marketplace(max_age))
     # Get the market comparison
     market_comparison = self.market_compare(from_market, to_market)
     # Get the record for the best good - factor in the profit per unit volume
     best_good = market_comparison.loc[market_comparison['profit_per_volume'].idxmax()]
     return {"symbol": best_good['symbol'], 
             "cost": best_good['purchasePricePerUnit_from'],  
+            "sell": best_good['sellPricePerUnit_to'],
+            "quantity": best_good['quantityAvailable_from'],
+            "sell_quantity": best_good['quantityAvailable_to'],
             "volume": best_good['volumePerUnit_from'],
             "profit": best_good['profit'],
             "profit_per_volume": best_good['profit_per_volume']}
 
   # Returns the best good to buy, how many units to buy of it and the expected profit
-  def what_should_I_buy(self, ship, destination, ship_marketplace=None):
+  def what_should_I_buy(self, ship, destination, ship_marketplace=None, max_age=MAX_AGE):
     """
     Returns a JSON object with the best good to buy and how many units of it for a particular ship when travelling to a particular destination
     
     :param ship : Ship - a Ship class object
     :param destination : str - the symbol of the destination to travel too
+    :param ship_marketplace : list - the marketplace at the ship's location. Defaults to reading it from the MarketStore
+    :param max_age : float - oldest marketplace in seconds read from the MarketStore before calling the API
     :return JSON : best buy
         {
           "symbol": The symbol of the good, 
@@ -434,33 +610,127 @@ class Market:
           "fuel_required": The fuel required to make the trip
         }
     """
+    import pandas as pd
     loc = self.game.locations[destination]
     # Get the best good to buy
     if ship_marketplace is None:
       logging.debug("Getting the best goods to trade for from {0} to {1} - Ships Marketplace not supplied".format(ship.location, loc.symbol))
-      best_good = self.best_buy(ship.location, loc.symbol)
+      best_good = self.best_buy(ship.location, loc.symbol, max_age)
     else:
       logging.debug("Getting the best goods to trade for from {0} to {1} - Ships Marketplace supplied".format(ship.location, loc.symbol))
-      best_good = self.best_buy(pd.DataFrame(ship_marketplace), loc.symbol)
-    # How much fuel would be required
-    fuel_required = ship.calculate_fuel_usage(self.game.locations[ship.location], to_loc=loc)
-    logging.debug("Estimated fuel required from {0} to {1} is: {2}".format(ship.location, loc.symbol, fuel_required))
-    # Work out many units to buy
-    units_to_buy = math.trunc((ship.maxCargo - fuel_required) / best_good['volume'])
+      best_good = self.best_buy(pd.DataFrame(ship_marketplace), loc.symbol, max_age)
+    return self.trade_details(ship, loc.symbol, best_good)
+
+  def what_should_I_buy_everywhere(self, ship, markets, by_time=False):
+    '''
+    what_should_I_buy for every destination at once - the markets are compared in one go by an ArbitrageEngine rather than joined a pair at a time
+
+    :param ship : Ship - a Ship class object
+    :param markets : dict - location symbol -> marketplace, including the ship's location. The rest are the destinations
+    :param by_time : bool - rank the trades by profit per second of the ship's time - see rank_by_time
+    :return list : the trade details of what_should_I_buy for each destination. Destinations trading none of the ship's market's goods are left out
+    '''
+    # The ship's market goes first so ties are broken in the order it lists its goods, as best_buy does
+    markets = {ship.location: markets[ship.location], **markets}
+    best_goods = ArbitrageEngine(markets).best_buys(ship.location)
+    # Every destination's order is sized in one go
+    sizes = self.size_trades(ship, list(best_goods), list(best_goods.values()))
+    trades = [self.trade_details(ship, destination, best_good, size) for (destination, best_good), size in zip(best_goods.items(), sizes)]
+    return self.rank_by_time(ship, trades) if by_time else trades
+
+  def rank_by_time(self, ship, trades):
+    '''
+    Ranks trades by their expected profit per second of the ship's time - flying to the destination & docking there.
+    Every destination is timed in one go from the world's distances
+
+    :param ship : Ship - the ship making the trades
+    :param trades : list - trade details from the ship's location eg. from what_should_I_buy_everywhere
+    :return list : the trades with 'seconds' & 'profit_per_second' added, best first
+    '''
+    if not trades:
+      return []
+    world = self.game.world
+    distance = world.distance_from(ship.location)[[world.index[trade['to']] for trade in trades]]
+    seconds = self.flight_time(distance, ship.speed)
+    per_second = np.array([trade['expected_profit'] for trade in trades], dtype=float) / seconds
+    order = np.argsort(-per_second, kind="stable")
+    return [{**trades[i], "seconds": float(seconds[i]), "profit_per_second": float(per_second[i])} for i in order]
+
+  def plan_trade_cycle(self, ship, markets, credits=None, max_legs=4):
+    '''
+    Plans the trade cycle from the ship's location through the markets and back that makes the most profit per hour - see RoutePlanner.plan
+
+    :param ship : Ship - a Ship class object
+    :param markets : dict - location symbol -> marketplace of every location the ship could trade at
+    :param credits : int - credits the ship can spend on goods & fuel. Defaults to unlimited
+    :param max_legs : int - most flights in the cycle
+    :return JSON : the cycle - its locations, legs, profit, seconds & profit_per_hour. None if no cycle makes a profit
+    '''
+    return RoutePlanner(ArbitrageEngine(markets), self.game.world, self.flight_time).plan(ship, credits, max_legs=max_legs)
+
+  def size_trades(self, ship, destinations, best_goods):
+    '''
+    Works out how many units of each best good the ship should buy - no more than fits once the fuel's aboard or the market has,
+    cut back to the orders that still make a profit once buying & selling have moved the prices. Every trade is sized in one go
+
+    :param ship : Ship - a Ship class object
+    :param destinations : list - the symbol of each destination
+    :param best_goods : list - the best good to buy for each destination as returned by best_buy
+    :return list : for each destination its fuel_required, units, expected_profit, total_cost & profit_curve
+    '''
+    if not destinations:
+      return []
+    world = self.game.world
+    fuel = world.fuel_from(ship.location, ship.kind)[[world.index[destination] for destination in destinations]]
+    # A market that doesn't say how much it has is taken to have no end of it
+    column = lambda key, missing=np.inf: np.array([good.get(key, missing) for good in best_goods], dtype=float)
+    stock = column('quantity')
+    # Room for the good once the fuel is aboard
+    room = np.floor((ship.maxCargo - fuel) / column('volume'))
+    sell = np.array([good.get('sell', good['cost'] + good['profit']) for good in best_goods], dtype=float)
+    sized = self.price_impact.size([good['symbol'] for good in best_goods], column('cost'), sell, stock,
+                                   column('sell_quantity'), np.minimum(room, stock))
+    curves = sized['curves']
+    return [{"fuel_required": int(fuel[i]),
+             "units": int(sized['units'][i]),
+             "expected_profit": float(sized['profit'][i]),
+             "total_cost": float(sized['total_cost'][i]),
+             "profit_curve": {"units": np.cumsum(curves['units'][i]).astype(int).tolist(),
+                              "marginal": curves['marginal'][i].tolist(),
+                              "profit": curves['profit'][i].tolist()}} for i in range(len(destinations))]
+
+  def trade_details(self, ship, destination, best_good, size=None):
+    '''
+    Works out how many units of the best good the ship should buy to sell at the destination - see what_should_I_buy
+
+    :param ship : Ship - a Ship class object
+    :param destination : str - the symbol of the destination to travel too
+    :param best_good : dict - the best good to buy as returned by best_buy
+    :param size : dict - the order already sized by size_trades. Defaults to sizing it
+    :return JSON : trade details as returned by what_should_I_buy
+    '''
+    if size is None:
+      size = self.size_trades(ship, [destination], [best_good])[0]
+    # How much fuel would be required - a lookup in the world's fuel matrix
+    fuel_required = size['fuel_required']
+    logging.debug("Estimated fuel required from {0} to {1} is: {2}".format(ship.location, destination, fuel_required))
+    # How many units to buy - what fits, cut back to the orders still making a profit as the prices move
+    units_to_buy = size['units']
     logging.debug("Given fuel requirement of: {0}, max cargo of: {1}, good volume of: {2}, {3} units should be purchased.".format(fuel_required, ship.maxCargo, best_good['volume'], units_to_buy))
     trade_details = {"symbol": best_good['symbol'], 
                      "units": units_to_buy, 
                      "cost": best_good['cost'],
-                     "total_cost": best_good['cost'] * units_to_buy, 
-                     "expected_profit": best_good['profit'] * units_to_buy,
+                     "total_cost": size['total_cost'], 
+                     "expected_profit": size['expected_profit'],
                      "profit": best_good['profit'],
                      "profit_per_volume": best_good['profit_per_volume'], 
                      "good_volume": best_good['volume'],
                      "total_volume": best_good['volume'] * units_to_buy,
                      "fuel_required": fuel_required,
                      "from": ship.location,
-                     "to": loc.symbol}
-    logging.debug("Best good to buy when trading from {} to {} is {}. Trade Details: {}".format(ship.location, loc.symbol, trade_details['symbol'], trade_details))
+                     "to": destination,
+                     "profit_curve": size['profit_curve']}
+    logging.debug("Best good to buy when trading from {} to {} is {}. Trade Details: {}".format(ship.location, destination, trade_details['symbol'], trade_details))
     return trade_details
 
 class Game:
@@ -472,6 +742,40 @@ class Game:
     self.token = token
     self.systems = self.load_sytems() if systems is None else systems
     self.locations = self.load_locations()
+    self._world = None
+    self._spatial = None
+
+  @classmethod
+  def from_snapshot(cls, token, path):
+    '''
+    Makes a Game from a world snapshot (see SpaceTraders.snapshot) - no call to the API and the world's tables are mapped rather than read
+
+    :param token : str - The user's token
+    :param path : str - The snapshot file eg. written by python -m SpaceTraders.snapshot
+    :return : Game
+    '''
+    world = load_snapshot(path)
+    game = cls(token, world.source)
+    game._world = world
+    return game
+
+  @property
+  def world(self):
+    '''
+    The World of these systems - every distance & fuel cost between locations worked out once and shared by every Game
+    '''
+    if self._world is None:
+      self._world = get_world(self.systems)
+    return self._world
+
+  @property
+  def spatial(self):
+    '''
+    A SpatialIndex of this game's locations for nearest, k nearest & within radius queries
+    '''
+    if self._spatial is None:
+      self._spatial = SpatialIndex(self.locations.values())
+    return self._spatial
 
   def __repr__(self):
     return f"<Game Object> "\
@@ -495,16 +799,19 @@ class Game:
     :param : kind : str - Filter the list of ships to the class of ship provided eg. "MK-I"
     :return : list - List of ships available for purchase
 
-    **CALL TO API**
+    **CALL TO API** - only when the ship catalogue is not in the cache
     """
-    return generic_get_call("game/ships", params={"class":kind}, token=self.token)['ships']
+    params = {"class": kind}
+    key = cache_key("game/ships", params)
+    return DEFAULT_CACHE.get_or_fetch(key, lambda: generic_get_call("game/ships", params=params, token=self.token))['ships']
   
   def load_sytems(self):
     '''
     This will simply load the complete JSON file with no further transformations
+
+    Read through the static data cache so only the first Game ever made calls the API
     '''
-    # Path handling to account for non relative path usage
-    return generic_get_call("game/systems", token=self.token)['systems']
+    return load_systems(self.token)
   
   def load_locations(self):
     '''
@@ -514,27 +821,30 @@ class Game:
     return {loc['symbol']: Location(self.token, loc) for sys in self.systems for loc in sys['locations']}
 
 
-class Location:
+class Location(LocationModel):
+  __slots__ = ("token",)
+
   def __init__(self, token, *args, **kwargs):
       if isinstance(token, str):
         self.token = token
       else:
         raise TypeError("Incorrect data type for token")
       if len(args) == 1:
-        self.symbol = args[0]['symbol']
-        self.type = args[0]['type']
-        self.name = args[0]['name']
-        self.x = args[0]['x']
-        self.y = args[0]['y']
-        self.allowsConstruction = args[0]['allowsConstruction']
-        self.structures = args[0]['structures']
-      if len(args) > 1:
+        self._load(args[0])
+      else:
+        self._load({})
         for key in kwargs:
-          setattr(self, key, kwargs[key])
+          self.set(key, kwargs[key])
   
-  def marketplace(self):
+  def marketplace(self, max_age=0):
+    '''
+    Returns the location's marketplace. Every marketplace fetched is kept in the process wide MarketStore
+
+    :param max_age : float - accept a stored marketplace fetched up to this many seconds ago rather than calling the API. Defaults to always calling
+    :return list : the goods traded at the location
+    '''
     endpoint = "game/locations/{0}/marketplace".format(self.symbol)
-    return generic_get_call(endpoint, token=self.token)['location']['marketplace']
+    return MARKETS.get_or_fetch(self.symbol, lambda: generic_get_call(endpoint, token=self.token)['location']['marketplace'], max_age)
   
   def __repr__(self):
     return f"<Location Object> Symbol: {self.symbol}, Type: {self.type}, "\
@@ -545,6 +855,12 @@ class Location:
   def __str__(self):
     return "Symbol: " + self.symbol + ", Name: " + self.name
 
+def load_systems(token):
+  '''
+  Returns every system in the game. Read through the static data cache so only the first call ever made calls the API
+  '''
+  return DEFAULT_CACHE.get_or_fetch("game/systems", lambda: generic_get_call("game/systems", token=token))['systems']
+
 # Get New User 
 def post_create_user(username):
   endpoint = "users/{0}/".format(username)
@@ -554,28 +870,21 @@ def post_create_user(username):
 # Generic get call to API
 def generic_get_call(endpoint, params=None, token=None):
     headers = {'Authorization': 'Bearer ' + token}
-    r = requests.get(URL + endpoint, headers=headers, params=params)
+    r = TRANSPORT.request("GET", endpoint, headers=headers, params=params)
     if r.ok:
         return r.json()
     else:
         error = r.json()
         code = error['error']['code']
         message = error['error']['message']
-        logging.warning(f"Something went wrong when hitting: {r.request.method} {r.url} with parameters: {params}, Error: {str(error)}")     
-        if str(code) == '42901':
-          # Handle Throttling errors by pausing and trying again
-          logging.warning("Throttle limit was reached. Pausing to wait for throttle")
-          time.sleep(10)
-          # for n in track(range(10), description="Pausing..."):
-          #   time.sleep(1)
-          return generic_get_call(endpoint, params, token)
-        else:
-          logging.exception(f"Something broke the script. Code: {code} Error Message: {message} ")
+        logging.warning(f"Something went wrong when hitting: {r.request.method} {r.url} with parameters: {params}, Error: {str(error)}")
+        # Throttling & server errors have already been retried by the transport
+        logging.exception(f"Something broke the script after {r.attempts} attempts. Code: {code} Error Message: {message} ")
 
 # Generic call to API
 def generic_post_call(endpoint, params=None, token=None):
     headers = {'Authorization': 'Bearer ' + token}
-    r = requests.post(URL + endpoint, headers=headers, params=params)
+    r = TRANSPORT.request("POST", endpoint, headers=headers, params=params)
     if r.ok:
         return r.json()
     else:
@@ -583,20 +892,8 @@ def generic_post_call(endpoint, params=None, token=None):
         code = error['error']['code']
         message = error['error']['message']
         logging.warning(f"Something went wrong when hitting: {r.request.method} {r.url} with parameters: {params}, Error: {str(error)}")
-        if str(code) == '42901':
-          # Handle Throttling errors by pausing and trying again
-          logging.warning("Throttle limit was reached. Pausing to wait for throttle")
-          time.sleep(10)
-          # for n in track(range(10), description="Pausing..."):
-          #   time.sleep(1)
-          return generic_post_call(endpoint, params, token)
-        if code == 409 or code == 500:
-          # Handle duplicate server call error by pausing and trying again
-          logging.warning("Throttle limit was reached. Pausing to wait for throttle")
-          time.sleep(10)
-          return generic_post_call(endpoint, params, token)
-        else:
-          logging.exception(f"Something broke the script. Code: {code} Error Message: {message} ")
+        # Throttling & server errors have already been retried by the transport
+        logging.exception(f"Something broke the script after {r.attempts} attempts. Code: {code} Error Message: {message} ")
 
 def make_request(method, url, headers, params):
   """Checks which method to use and then makes the request to Space Traders API
@@ -625,7 +922,7 @@ def make_request(method, url, headers, params):
 def generic_api_call(method, endpoint, params=None, token=None):
   headers = {'Authorization': 'Bearer ' + token}
   # Make the request to the Space Traders API
-  r = make_request(method, URL + endpoint, headers, params)  
+  r = TRANSPORT.request(method, endpoint, headers, params)
   if r.ok:
       return r.json()
   else:
@@ -634,17 +931,8 @@ def generic_api_call(method, endpoint, params=None, token=None):
       code = error['error']['code']
       message = error['error']['message']
       logging.warning("Error: " + str(error))
-      # Check if the error was due to throttline
-      if str(code) == '42901':
-        # Handle Throttling errors by pausing and trying again
-        logging.info("Throttle limit was reached. Pausing to wait for throttle")
-        for n in track(range(10), description="Pausing..."):
-          time.sleep(1)
-        # Recall this method to make the request again. 
-        return generic_api_call(method, endpoint, params, token)
-      # If not due to throttling raise exception
-      else:
-        logging.exception(f"Something broke the script. Code: {code} Error Message: {message} ")
+      # Throttling & server errors have already been retried by the transport
+      logging.exception(f"Something broke the script after {r.attempts} attempts. Code: {code} Error Message: {message} ")
 
 def get_user(token, username):
   '''Get the user and return a User Object'''
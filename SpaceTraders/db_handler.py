@@ -1,15 +1,24 @@
 import sqlite3
-import sqlalchemy
 import logging
-import pandas as pd
+import threading
 
 DATABASE_LOCATION = 'sqlite:////Users/zachooper/Documents/Personal/Projects/SpaceTraders/spaceTraders/SpaceTraders_DB.sqlite'
 
 
 logging.basicConfig(format='%(asctime)s - %(levelname)s - %(message)s', level=logging.INFO)
 
-# Init engine, conn & cursor
-engine = sqlalchemy.create_engine(DATABASE_LOCATION)
+# The engine is made the first time the database is used - importing this module needs neither sqlalchemy nor the database
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+  global _engine
+  if _engine is None:
+    with _engine_lock:
+      if _engine is None:
+        import sqlalchemy
+        _engine = sqlalchemy.create_engine(DATABASE_LOCATION)
+  return _engine
 
 def write_to_db(df, table, create_table_sql):
   conn = sqlite3.connect('/Users/zachooper/Documents/Personal/Projects/SpaceTraders/spaceTraders/SpaceTraders_DB.sqlite')
@@ -22,7 +31,7 @@ def write_to_db(df, table, create_table_sql):
   # Add the data to the DB
   try:
     logging.info("Adding {0} records to table: {1}".format(len(df), table))
-    df.to_sql(table, engine, index=False, if_exists="append")
+    df.to_sql(table, get_engine(), index=False, if_exists="append")
   except Exception as e:
     logging.warning(e)
     logging.warning("Data already exists in the database. {0} records not added to Database".format(len(df)))
@@ -110,7 +119,8 @@ def write_flight_path_to_db(flightPath):
   write_to_db(flightPath, table, sql_query)
 
 def get_market_tracker():
-  market_tracker = pd.read_sql('marketplace_tracker', engine)
+  import pandas as pd
+  market_tracker = pd.read_sql('marketplace_tracker', get_engine())
   market_tracker['purchasePricePerUnit'] = market_tracker['purchasePricePerUnit'].astype(int)
   market_tracker['sellPricePerUnit'] = market_tracker['sellPricePerUnit'].astype(int)
   market_tracker['quantityAvailable'] = market_tracker['quantityAvailable'].astype(int)
@@ -120,13 +130,16 @@ def get_market_tracker():
   return market_tracker
 
 def get_flight_paths():
-  flight_paths = pd.read_sql('flight_paths', engine)
+  import pandas as pd
+  flight_paths = pd.read_sql('flight_paths', get_engine())
   return flight_paths
 
 def get_buy_orders():
-  buy_orders = pd.read_sql('buy_orders', engine)
+  import pandas as pd
+  buy_orders = pd.read_sql('buy_orders', get_engine())
   return buy_orders
 
 def get_sell_orders():
-  sell_orders = pd.read_sql('sell_orders', engine)
+  import pandas as pd
+  sell_orders = pd.read_sql('sell_orders', get_engine())
   return sell_orders
\ No newline at end of file
@@ -0,0 +1,253 @@
+import threading
+import numpy as np
+from .models import ShipModel
+
+
+def _link(ship, fleet):
+    # Sets the ship's back-reference to its fleet - plain ShipModels have no slot for one
+    try:
+        ship.fleet = fleet
+    except AttributeError:
+        pass
+
+class Fleet ():
+    # Attributes of a ship that are indexed - queries on any other attribute scan the matching ships
+    INDEXES = ("manufacturer", "type", "kind", "location")
+    # API names of attributes that are stored under another name on the ship
+    ALIASES = {"class": "kind"}
+
+    def __init__(self, ships=()):
+        """A registry of ships with a hash index on id and on each of INDEXES.
+        Reads the same as a list of the ships - iterate it, index it or take its len.
+
+        Ships in a fleet keep a back-reference to it (ship.fleet) and call refresh when they move so the indexes stay in sync.
+        Plain ShipModels have no room for one - call refresh after changing them.
+
+        Args:
+            ships (iterable, optional): Ship objects (or ShipModels) to add. Defaults to none.
+        """
+        self.ships = {}
+        # attribute -> value -> {id: ship} - dicts keep the order ships were added in
+        self.indexes = {field: {} for field in self.INDEXES}
+        # id -> the values the ship is indexed under
+        self.indexed = {}
+        # Goes up on every change - lets anything built from the fleet know it's out of date
+        self.version = 0
+        # (fields, criteria, sort_by) -> snapshot - emptied when the version moves on
+        self.snapshots = {}
+        self.snapshots_version = 0
+        self.lock = threading.RLock()
+        for ship in ships:
+            self.add(ship)
+
+    def __len__(self):
+        return len(self.ships)
+
+    def __iter__(self):
+        return iter(list(self.ships.values()))
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.ships[key]
+        return list(self.ships.values())[key]
+
+    def __contains__(self, ship):
+        return (ship if isinstance(ship, str) else ship.id) in self.ships
+
+    def __repr__(self):
+        return f"<Fleet Object> Ships: {len(self)}"
+
+    # Locks can't be pickled - a copy of the fleet gets a new one
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
+    def _index(self, ship):
+        values = tuple(getattr(ship, field) for field in self.INDEXES)
+        for field, value in zip(self.INDEXES, values):
+            self.indexes[field].setdefault(value, {})[ship.id] = ship
+        self.indexed[ship.id] = values
+
+    def _unindex(self, shipId):
+        for field, value in zip(self.INDEXES, self.indexed.pop(shipId)):
+            bucket = self.indexes[field][value]
+            del bucket[shipId]
+            if not bucket:
+                del self.indexes[field][value]
+
+    def add(self, ship):
+        """Adds a ship, eg. one just bought. A ship already in the fleet is replaced
+
+        Args:
+            ship (Ship): The ship to add
+        """
+        with self.lock:
+            if ship.id in self.ships:
+                self._unindex(ship.id)
+            self.ships[ship.id] = ship
+            self._index(ship)
+            _link(ship, self)
+            self.version += 1
+
+    # Lets the fleet stand in for the list of ships it replaced
+    append = add
+
+    def remove(self, shipId):
+        """Removes a ship, eg. one that was scrapped
+
+        Args:
+            shipId (str): id of the ship to remove
+
+        Returns:
+            Ship: The ship removed. None if it wasn't in the fleet
+        """
+        with self.lock:
+            ship = self.ships.pop(shipId, None)
+            if ship is not None:
+                self._unindex(shipId)
+                _link(ship, None)
+                self.version += 1
+            return ship
+
+    def refresh(self, ship):
+        """Re-indexes a ship after its attributes changed eg. it flew somewhere. Called by the ship itself
+
+        Args:
+            ship (Ship): The ship that changed
+        """
+        with self.lock:
+            if tuple(getattr(ship, field) for field in self.INDEXES) != self.indexed.get(ship.id):
+                self._unindex(ship.id)
+                self._index(ship)
+            self.version += 1
+
+    def get(self, shipId):
+        """Returns the ship with the id given. None if it isn't in the fleet"""
+        return self.ships.get(shipId)
+
+    def where(self, *filter_by, **criteria):
+        """Returns a FleetQuery of the ships matching every criteria. Doesn't change the fleet
+
+        Args:
+            filter_by (tuple): (attribute, value) pairs eg. ('manufacturer', 'Jackshaw')
+            criteria: attribute=value eg. kind="MK-II", location="OE-PM"
+
+        Returns:
+            FleetQuery: The matching ships - add more criteria with where or order them with sort_by
+        """
+        return FleetQuery(self).where(*filter_by, **criteria)
+
+    def select(self, criteria, sort_by=None):
+        # The ships matching every (attribute, value) in criteria - starts from the smallest index bucket
+        with self.lock:
+            indexed = [(field, value) for field, value in criteria if field in self.indexes]
+            scanned = [(field, value) for field, value in criteria if field not in self.indexes]
+            if indexed:
+                buckets = [self.indexes[field].get(value, {}) for field, value in indexed]
+                smallest = min(buckets, key=len)
+                ships = [ship for shipId, ship in smallest.items() if all(shipId in bucket for bucket in buckets)]
+            else:
+                ships = list(self.ships.values())
+        for field, value in scanned:
+            ships = [ship for ship in ships if getattr(ship, field) == value]
+        if sort_by:
+            ships.sort(key=lambda ship: tuple(getattr(ship, field) for field in sort_by))
+        return ships
+
+    def snapshot(self, fields=None, filter_by=(), sort_by=None):
+        """Returns the fleet as a NumPy structured array with a column for each field - one row per ship.
+        Only the ships matching filter_by and only the fields asked for are read from the ships.
+        The array is cached and handed out again until the fleet next changes, so it's read only.
+
+        Args:
+            fields (list, optional): API names of the columns eg. ['id', 'location', 'class']. Defaults to every field of a ship.
+            filter_by (list, optional): (attribute, value) pairs every ship must match eg. [('manufacturer', 'Jackshaw')]
+            sort_by (list, optional): Attributes to order the rows by
+
+        Returns:
+            np.ndarray: The structured array - pass it to pd.DataFrame for a DataFrame
+        """
+        fields = tuple(fields) if fields is not None else SNAPSHOT_FIELDS
+        query = self.where(*filter_by)
+        if sort_by:
+            query = query.sort_by(*sort_by)
+        key = (fields, query.criteria, query.order)
+        with self.lock:
+            if self.snapshots_version != self.version:
+                self.snapshots = {}
+                self.snapshots_version = self.version
+            snapshot = self.snapshots.get(key)
+            if snapshot is None:
+                snapshot = self.snapshots[key] = _columns(query.all(), fields)
+        return snapshot
+
+# Every field of a ship in the order of Ship.as_dict
+SNAPSHOT_FIELDS = ("id", "manufacturer", "class", "type", "location", "x", "y", "speed", "plating", "weapons", "maxCargo", "spaceAvailable", "cargo")
+
+def _column(values):
+    # Whole numbers stay whole unless a ship has no value (eg. x & y in transit), strings & lists are kept as objects
+    if values and all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+        return np.array(values, dtype=np.int64)
+    if values and all(v is None or (isinstance(v, (int, float)) and not isinstance(v, bool)) for v in values):
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+def _columns(ships, fields):
+    columns = [_column([getattr(ship, ShipModel.FIELDS.get(field, field)) for ship in ships]) for field in fields]
+    snapshot = np.empty(len(ships), dtype=[(field, column.dtype) for field, column in zip(fields, columns)])
+    for field, column in zip(fields, columns):
+        snapshot[field] = column
+    snapshot.flags.writeable = False
+    return snapshot
+
+class FleetQuery ():
+    __slots__ = ("fleet", "criteria", "order")
+
+    def __init__(self, fleet, criteria=(), order=None):
+        """A query on a Fleet. Each method returns a new query so queries can be built on without changing each other
+
+        Args:
+            fleet (Fleet): The fleet to query
+            criteria (tuple, optional): (attribute, value) pairs every ship must match
+            order (tuple, optional): Attributes to sort the ships by
+        """
+        self.fleet = fleet
+        self.criteria = tuple(criteria)
+        self.order = order
+
+    def where(self, *filter_by, **criteria):
+        """Returns a new query that also matches the criteria - see Fleet.where"""
+        added = tuple((Fleet.ALIASES.get(field, field), value) for field, value in (*filter_by, *criteria.items()))
+        return FleetQuery(self.fleet, self.criteria + added, self.order)
+
+    def sort_by(self, *fields):
+        """Returns a new query that orders the ships by the attributes given"""
+        return FleetQuery(self.fleet, self.criteria, tuple(Fleet.ALIASES.get(field, field) for field in fields))
+
+    def all(self):
+        """Returns a new list of the matching ships"""
+        return self.fleet.select(self.criteria, self.order)
+
+    def first(self):
+        """Returns the first matching ship. None if there are none"""
+        ships = self.all()
+        return ships[0] if ships else None
+
+    def count(self):
+        return len(self.all())
+
+    def __iter__(self):
+        return iter(self.all())
+
+    def __len__(self):
+        return self.count()
+
+    def __repr__(self):
+        return f"<FleetQuery Object> Criteria: {self.criteria}, Sort By: {self.order}"
@@ -0,0 +1,78 @@
+import logging
+import numpy as np
+
+
+# Flight time before any flights are fitted - FLIGHT_FIXED_SECONDS + SECONDS_PER_DISTANCE * distance / speed.
+# FlightTimeModel.fit replaces them with what recorded flights actually took
+FLIGHT_FIXED_SECONDS = 30
+SECONDS_PER_DISTANCE = 8
+# Seconds a ship sits after its flight plan lands before it trades again - User.fly waits this long
+DOCKING_OVERHEAD = 15
+# Fewer flights than this and the fit is left at the defaults
+MIN_FLIGHTS = 10
+
+class FlightTimeModel ():
+    def __init__(self, per_distance=SECONDS_PER_DISTANCE, fixed=FLIGHT_FIXED_SECONDS, overhead=DOCKING_OVERHEAD, flights=0):
+        """How long a ship is tied up flying between two locations - the flight time the API gives
+        (per_distance * distance / speed + fixed) plus the overhead of docking once landed.
+        Called with arrays of distances it works out every flight at once, so it can be handed to RoutePlanner & FleetPlanner.
+
+        Args:
+            per_distance (float, optional): Seconds per unit of distance at speed 1. Defaults to SECONDS_PER_DISTANCE.
+            fixed (float, optional): Seconds every flight takes however short. Defaults to FLIGHT_FIXED_SECONDS.
+            overhead (float, optional): Seconds spent docking after landing. Defaults to DOCKING_OVERHEAD.
+            flights (int, optional): How many flights the model was fitted on. Defaults to 0.
+        """
+        self.per_distance = float(per_distance)
+        self.fixed = float(fixed)
+        self.overhead = float(overhead)
+        self.flights = flights
+
+    def __repr__(self):
+        return f"<FlightTimeModel Object> Seconds: {self.per_distance:.2f} * distance / speed + {self.fixed:.1f} + {self.overhead:.1f} docking, Flights: {self.flights}"
+
+    @classmethod
+    def fit(cls, distance, speed, time_taken, overhead=DOCKING_OVERHEAD):
+        """Fits the flight time to flights already flown by least squares - time_taken = per_distance * distance / speed + fixed
+
+        Args:
+            distance (array): Distance of each flight
+            speed (array): Speed of the ship that flew it
+            time_taken (array): Seconds the flight took
+            overhead (float, optional): Seconds spent docking after landing. Defaults to DOCKING_OVERHEAD.
+
+        Returns:
+            FlightTimeModel: The fitted model. The defaults if there are too few usable flights to fit
+        """
+        distance, speed, time_taken = (np.asarray(column, dtype=float) for column in (distance, speed, time_taken))
+        usable = np.isfinite(distance) & np.isfinite(speed) & np.isfinite(time_taken) & (speed > 0) & (time_taken > 0)
+        x, y = distance[usable] / speed[usable], time_taken[usable]
+        if len(x) < MIN_FLIGHTS or np.ptp(x) == 0:
+            logging.info(f"Only {len(x)} usable flights to fit flight times on - using the defaults")
+            return cls(overhead=overhead, flights=len(x))
+        (per_distance, fixed), *_ = np.linalg.lstsq(np.column_stack([x, np.ones_like(x)]), y, rcond=None)
+        return cls(max(per_distance, 0.0), max(fixed, 0.0), overhead, len(x))
+
+    @classmethod
+    def from_history(cls, flight_paths=None, overhead=DOCKING_OVERHEAD):
+        """Fits the flight time to the flight_paths table
+
+        Args:
+            flight_paths (DataFrame, optional): Flights with distance, speed & time_taken columns. Defaults to db_handler.get_flight_paths().
+            overhead (float, optional): Seconds spent docking after landing. Defaults to DOCKING_OVERHEAD.
+
+        Returns:
+            FlightTimeModel: The fitted model
+        """
+        if flight_paths is None:
+            from . import db_handler
+            flight_paths = db_handler.get_flight_paths()
+        return cls.fit(flight_paths['distance'], flight_paths['speed'], flight_paths['time_taken'], overhead)
+
+    def flight_seconds(self, distance, speed):
+        """Seconds the API says flights of the distances given take at the speed given"""
+        return self.per_distance * np.asarray(distance, dtype=float) / speed + self.fixed
+
+    def __call__(self, distance, speed):
+        """Seconds a ship is tied up by flights of the distances given at the speed given - the flight plus docking"""
+        return self.flight_seconds(distance, speed) + self.overhead
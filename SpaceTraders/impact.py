@@ -0,0 +1,134 @@
+import logging
+import numpy as np
+from .orders import MAX_ORDER_UNITS
+
+
+# How far prices move as a trade eats into a market - buying 10% of the stock raises the price 10% * PRICE_IMPACT
+# and selling 10% of it lowers the price as much. Only used for goods without enough readings to fit, so it's a cautious
+# middle: no impact would size orders as if the whole stock could be bought at the listed price, while an impact of 1
+# doubles the price of a good bought out. Once a good has MIN_OBSERVATIONS price moves its fitted impact is used instead
+PRICE_IMPACT = 0.5
+# Fewer price moves than this for a good and it's left at the default impact
+MIN_OBSERVATIONS = 10
+
+class PriceImpactModel ():
+    def __init__(self, impacts=None, default=PRICE_IMPACT):
+        """How far the price of each good moves as its stock is bought or sold - price * (1 +/- impact * units / stock).
+        Orders are split into chunks of MAX_ORDER_UNITS and every chunk pays the price the chunks before it left, so the
+        profit of a trade bends as it gets bigger. Every candidate trade is sized in one array operation.
+
+        Args:
+            impacts (dict, optional): Good symbol -> its impact. Defaults to none.
+            default (float, optional): Impact of goods not in impacts. Defaults to PRICE_IMPACT.
+        """
+        self.impacts = dict(impacts or {})
+        self.default = float(default)
+
+    def __repr__(self):
+        return f"<PriceImpactModel Object> Goods: {len(self.impacts)}, Default Impact: {self.default}"
+
+    @classmethod
+    def fit(cls, history, default=PRICE_IMPACT):
+        """Fits the impact of each good to how its price moved with its stock between market readings.
+        For each good the relative price change is regressed on the relative stock change by least squares through the origin.
+
+        Args:
+            history (DataFrame): Market readings with location, symbol, time, pricePerUnit & quantityAvailable columns
+            default (float, optional): Impact of goods with too few readings to fit. Defaults to PRICE_IMPACT.
+
+        Returns:
+            PriceImpactModel: The fitted model
+        """
+        history = history.sort_values(['location', 'symbol', 'time'])
+        previous = history.groupby(['location', 'symbol'])[['pricePerUnit', 'quantityAvailable']].shift()
+        x = (history['quantityAvailable'] - previous['quantityAvailable']) / previous['quantityAvailable']
+        y = (history['pricePerUnit'] - previous['pricePerUnit']) / previous['pricePerUnit']
+        moves = history.assign(x=x, y=y).replace([np.inf, -np.inf], np.nan).dropna(subset=['x', 'y'])
+        moves = moves[moves['x'] != 0]
+        impacts = {}
+        for symbol, group in moves.groupby('symbol'):
+            if len(group) >= MIN_OBSERVATIONS:
+                # A fall in stock raises the price so the slope is negative
+                impacts[symbol] = max(-float((group['x'] * group['y']).sum() / (group['x'] ** 2).sum()), 0.0)
+        logging.info(f"Fitted the price impact of {len(impacts)} goods from {len(moves)} price moves")
+        return cls(impacts, default)
+
+    @classmethod
+    def from_history(cls, market_tracker=None, default=PRICE_IMPACT):
+        """Fits the impact of each good to the marketplace_tracker table
+
+        Args:
+            market_tracker (DataFrame, optional): Market readings. Defaults to db_handler.get_market_tracker().
+            default (float, optional): Impact of goods with too few readings to fit. Defaults to PRICE_IMPACT.
+
+        Returns:
+            PriceImpactModel: The fitted model
+        """
+        if market_tracker is None:
+            from . import db_handler
+            market_tracker = db_handler.get_market_tracker()
+        return cls.fit(market_tracker, default)
+
+    def impact(self, symbols):
+        """Returns the impact of each good as an array"""
+        return np.array([self.impacts.get(symbol, self.default) for symbol in symbols], dtype=float)
+
+    def curves(self, symbols, cost, sell, stock, sell_stock, max_units, chunk=MAX_ORDER_UNITS, credits=None):
+        """Works out the profit of buying up to max_units of each candidate trade a chunk at a time
+
+        Args:
+            symbols (list): Good of each trade
+            cost (array): Price per unit to buy each good before buying any
+            sell (array): Price per unit to sell each good at its destination before selling any
+            stock (array): Units of each good the market buying from has
+            sell_stock (array): Units of each good the market selling to has
+            max_units (array): Most units of each trade the ship can carry & afford
+            chunk (int, optional): Units per order. Defaults to MAX_ORDER_UNITS.
+            credits (float or array, optional): Most each trade can spend - chunks are cut back to what's left. Defaults to unlimited.
+
+        Returns:
+            dict: Arrays of trades x chunks
+                - units : units in each chunk
+                - marginal : profit per unit of each chunk - it falls chunk by chunk
+                - cost : price per unit paid for each chunk
+                - profit : profit of all the chunks up to & including each one
+        """
+        impact = self.impact(symbols)[:, None]
+        cost, sell = np.asarray(cost, dtype=float)[:, None], np.asarray(sell, dtype=float)[:, None]
+        stock = np.maximum(np.asarray(stock, dtype=float), 1)[:, None]
+        sell_stock = np.maximum(np.asarray(sell_stock, dtype=float), 1)[:, None]
+        max_units = np.maximum(np.asarray(max_units, dtype=float), 0)[:, None]
+        chunks = max(int(np.ceil(max_units.max() / chunk)) if max_units.size else 0, 1)
+        before = np.arange(chunks, dtype=float)[None, :] * chunk
+        units = np.clip(max_units - before, 0, chunk)
+        paid = cost * (1 + impact * before / stock)
+        if credits is not None:
+            # Credits spent on the chunks before each one - a chunk only buys what's left
+            spent = np.cumsum(units * paid, axis=1) - units * paid
+            with np.errstate(divide='ignore', invalid='ignore'):
+                affordable = np.floor((np.asarray(credits, dtype=float).reshape(-1, 1) - spent) / paid)
+            units = np.clip(np.fmin(units, affordable), 0, None)
+        marginal = sell * np.maximum(1 - impact * before / sell_stock, 0) - paid
+        return {"units": units, "marginal": marginal, "cost": paid, "profit": np.cumsum(units * marginal, axis=1)}
+
+    def size(self, symbols, cost, sell, stock, sell_stock, max_units, chunk=MAX_ORDER_UNITS, credits=None):
+        """Works out how many units of each candidate trade make the most profit - every chunk that still makes a profit is bought
+
+        Args:
+            See curves
+
+        Returns:
+            dict: Arrays with one entry per trade
+                - units : the units to buy
+                - profit : the profit they make
+                - total_cost : what they cost
+                - curves : the curves they were picked from
+        """
+        curves = self.curves(symbols, cost, sell, stock, sell_stock, max_units, chunk, credits)
+        # The marginal profit only falls so the chunks worth buying come first
+        worth = curves['marginal'] > 0
+        units = np.where(worth, curves['units'], 0)
+        return {"units": units.sum(axis=1).astype(np.int64),
+                "profit": (units * curves['marginal']).sum(axis=1),
+                "total_cost": (units * curves['cost']).sum(axis=1),
+                "curves": curves}
@@ -0,0 +1,133 @@
+import time
+import threading
+
+
+# Seconds a marketplace read by a planner is trusted for before it's fetched again
+MAX_AGE = 60
+
+class MarketStore ():
+    def __init__(self, clock=time.time):
+        """The last marketplace seen at each location and when it was fetched, shared by everything in the process.
+        Tracker polls, trader fetches & orders all feed it so planners can read markets rather than call the API.
+
+        Args:
+            clock (callable, optional): Returns the current time in seconds. Defaults to time.time.
+        """
+        self.clock = clock
+        self.lock = threading.Lock()
+        # symbol -> (fetched, marketplace). A stored marketplace is never changed in place - it's replaced
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, symbol):
+        return symbol in self.entries
+
+    def put(self, symbol, marketplace, fetched=None):
+        """Stores the marketplace of a location
+
+        Args:
+            symbol (str): Symbol of the location
+            marketplace (list): The marketplace as returned by game/locations/{symbol}/marketplace
+            fetched (float, optional): When it was fetched. Defaults to now.
+        """
+        fetched = self.clock() if fetched is None else fetched
+        with self.lock:
+            current = self.entries.get(symbol)
+            # An older read arriving late mustn't replace a newer one
+            if current is None or current[0] <= fetched:
+                self.entries[symbol] = (fetched, list(marketplace))
+
+    def age(self, symbol):
+        """Returns how many seconds ago the location's marketplace was fetched. None if it's never been seen"""
+        entry = self.entries.get(symbol)
+        return None if entry is None else self.clock() - entry[0]
+
+    def get(self, symbol, max_age=MAX_AGE):
+        """Returns the location's marketplace if it was fetched no more than max_age seconds ago
+
+        Args:
+            symbol (str): Symbol of the location
+            max_age (float, optional): Oldest acceptable marketplace in seconds. Defaults to MAX_AGE.
+
+        Returns:
+            list: The marketplace. None if missing or too old
+        """
+        with self.lock:
+            entry = self.entries.get(symbol)
+            if entry is not None and self.clock() - entry[0] <= max_age:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def get_or_fetch(self, symbol, fetch, max_age=MAX_AGE):
+        """Returns the location's marketplace, fetching & storing it if missing or older than max_age
+
+        Args:
+            symbol (str): Symbol of the location
+            fetch (callable): Called with no arguments to fetch the marketplace
+            max_age (float, optional): Oldest acceptable marketplace in seconds. 0 always fetches. Defaults to MAX_AGE.
+
+        Returns:
+            list: The marketplace
+        """
+        if max_age > 0:
+            marketplace = self.get(symbol, max_age)
+            if marketplace is not None:
+                return marketplace
+        fetched = self.clock()
+        marketplace = fetch()
+        if marketplace is not None:
+            self.put(symbol, marketplace, fetched)
+        return marketplace
+
+    def markets(self, symbols, max_age=MAX_AGE):
+        """Returns the marketplaces of the locations no older than max_age
+
+        Args:
+            symbols (list): Symbols of the locations
+            max_age (float, optional): Oldest acceptable marketplace in seconds. Defaults to MAX_AGE.
+
+        Returns:
+            dict: Symbol -> marketplace. Locations missing or too old are left out
+        """
+        found = {symbol: self.get(symbol, max_age) for symbol in symbols}
+        return {symbol: marketplace for symbol, marketplace in found.items() if marketplace is not None}
+
+    def apply_order(self, response, buying):
+        """Applies a purchase or sell order to the stored marketplace of the ship's location - the good's quantity
+        moves by the units ordered and its price becomes the one paid. The marketplace keeps its fetch time.
+
+        Args:
+            response (dict): The order response - credits, order & ship
+            buying (bool): True for a purchase order, False for a sell order
+        """
+        order, symbol = response['order'], response['ship'].get('location')
+        with self.lock:
+            entry = self.entries.get(symbol)
+            if entry is None:
+                return
+            fetched, marketplace = entry
+            updated = []
+            for good in marketplace:
+                if good['symbol'] == order['good']:
+                    good = dict(good)
+                    if buying:
+                        good['quantityAvailable'] = max(good.get('quantityAvailable', 0) - order['quantity'], 0)
+                        good['purchasePricePerUnit'] = order['pricePerUnit']
+                    else:
+                        good['quantityAvailable'] = good.get('quantityAvailable', 0) + order['quantity']
+                        good['sellPricePerUnit'] = order['pricePerUnit']
+                updated.append(good)
+            self.entries[symbol] = (fetched, updated)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+# The store shared by every Location, tracker & trader in the process
+MARKETS = MarketStore()
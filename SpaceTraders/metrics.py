@@ -0,0 +1,189 @@
+import json
+import bisect
+import threading
+
+
+# Upper bounds (seconds) of the latency histogram buckets - the last bucket is everything slower
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Path segments that are followed by an id, and the placeholder the id is replaced with
+PLACEHOLDERS = {
+    "users": "{u}",
+    "locations": "{location}",
+    "systems": "{system}",
+    "ships": "{ship}",
+    "flight-plans": "{flight}",
+    "loans": "{loan}",
+    "structures": "{structure}"
+}
+
+def endpoint_template(endpoint):
+    """Replaces the ids in an endpoint with placeholders so every call to the same endpoint is grouped together
+
+    Args:
+        endpoint (str): The API endpoint eg. users/JimHawkins/ships/ckn123/jettison
+
+    Returns:
+        str: The endpoint template eg. users/{u}/ships/{ship}/jettison
+    """
+    parts = endpoint.split("?")[0].strip("/").split("/")
+    # Only swap a segment that follows a collection - game/ships & users/{u}/ships are left alone
+    template = [parts[0]]
+    for previous, part in zip(parts, parts[1:]):
+        template.append(PLACEHOLDERS.get(previous, part))
+    return "/".join(template)
+
+def body_size(content):
+    """Returns the size in bytes of a request or response body, 0 if there isn't one"""
+    if content is None:
+        return 0
+    if isinstance(content, str):
+        return len(content.encode())
+    try:
+        return len(content)
+    except TypeError:
+        return 0
+
+def request_size(response):
+    """Returns the bytes sent for the request of a response - the URL (which carries the params) and the body"""
+    request = getattr(response, 'request', None)
+    if request is None:
+        return 0
+    try:
+        return body_size(str(request.url)) + body_size(getattr(request, 'body', None))
+    except Exception:
+        return 0
+
+class _EndpointStats ():
+    __slots__ = ("requests", "errors", "buckets", "latency_sum", "bytes_sent", "bytes_received", "retries", "throttled", "sleep")
+
+    def __init__(self, buckets):
+        self.requests = 0
+        self.errors = 0
+        self.buckets = [0] * (buckets + 1)
+        self.latency_sum = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = 0
+        self.throttled = 0
+        self.sleep = 0.0
+
+class Metrics ():
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        """Collects per endpoint metrics of every request sent by a transport.
+        Recording is one dict lookup and a few additions under a lock so it can be left on in production.
+
+        Args:
+            buckets (tuple, optional): Upper bounds (seconds) of the latency histogram buckets. Defaults to LATENCY_BUCKETS.
+        """
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def observe(self, method, endpoint, latency, bytes_sent=0, bytes_received=0, attempts=1, throttled=0, sleep=0.0, error=False):
+        """Records one request - called by the transport once the request is finished, including its retries
+
+        Args:
+            method (str): The HTTP method used
+            endpoint (str): The API endpoint - grouped by its template
+            latency (float): Seconds spent waiting on the network across every attempt
+            bytes_sent (int, optional): Bytes in the request URLs and bodies. Defaults to 0.
+            bytes_received (int, optional): Bytes in the response bodies. Defaults to 0.
+            attempts (int, optional): How many times the request was sent. Defaults to 1.
+            throttled (int, optional): How many attempts were throttled (error 42901). Defaults to 0.
+            sleep (float, optional): Seconds spent waiting on the rate limiter and retry backoff. Defaults to 0.0.
+            error (bool, optional): Whether the final response was an error. Defaults to False.
+        """
+        key = (method, endpoint_template(endpoint))
+        bucket = bisect.bisect_left(self.buckets, latency)
+        with self.lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = _EndpointStats(len(self.buckets))
+            stats.requests += 1
+            stats.errors += bool(error)
+            stats.buckets[bucket] += 1
+            stats.latency_sum += latency
+            stats.bytes_sent += bytes_sent
+            stats.bytes_received += bytes_received
+            stats.retries += attempts - 1
+            stats.throttled += throttled
+            stats.sleep += sleep
+
+    def snapshot(self):
+        """Returns the metrics of every endpoint as plain data
+
+        Returns:
+            dict: keyed by "METHOD template" - requests, errors, latency (buckets, sum & average), bytes_sent, bytes_received, retries, throttled & sleep
+        """
+        with self.lock:
+            result = {}
+            for (method, template), stats in sorted(self.endpoints.items()):
+                result[f"{method} {template}"] = {
+                    "method": method,
+                    "endpoint": template,
+                    "requests": stats.requests,
+                    "errors": stats.errors,
+                    "latency": {
+                        "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], stats.buckets)),
+                        "sum": stats.latency_sum,
+                        "average": stats.latency_sum / stats.requests if stats.requests else 0.0
+                    },
+                    "bytes_sent": stats.bytes_sent,
+                    "bytes_received": stats.bytes_received,
+                    "retries": stats.retries,
+                    "throttled": stats.throttled,
+                    "sleep": stats.sleep
+                }
+            return result
+
+    def to_json(self, **kwargs):
+        """Returns the snapshot as a JSON string. Any kwargs are passed to json.dumps"""
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def to_prometheus(self, prefix="spacetraders"):
+        """Returns the metrics in the Prometheus text exposition format
+
+        Args:
+            prefix (str, optional): Prefix of every metric name. Defaults to "spacetraders".
+
+        Returns:
+            str: The metrics, ready to be served from a /metrics endpoint
+        """
+        counters = [
+            ("requests_total", "Requests sent, including their retries as one request", "requests"),
+            ("errors_total", "Requests that finished with an error", "errors"),
+            ("bytes_sent_total", "Bytes in request URLs and bodies", "bytes_sent"),
+            ("bytes_received_total", "Bytes in response bodies", "bytes_received"),
+            ("retries_total", "Attempts that were retried", "retries"),
+            ("throttled_total", "Attempts rejected with error 42901", "throttled"),
+            ("sleep_seconds_total", "Seconds spent waiting on the rate limiter and retry backoff", "sleep")
+        ]
+        with self.lock:
+            items = sorted(self.endpoints.items())
+            lines = []
+            for name, help, field in counters:
+                lines.append(f"# HELP {prefix}_{name} {help}")
+                lines.append(f"# TYPE {prefix}_{name} counter")
+                for (method, template), stats in items:
+                    lines.append(f'{prefix}_{name}{{method="{method}",endpoint="{template}"}} {getattr(stats, field)}')
+            name = f"{prefix}_request_latency_seconds"
+            lines.append(f"# HELP {name} Seconds spent waiting on the network per request")
+            lines.append(f"# TYPE {name} histogram")
+            for (method, template), stats in items:
+                labels = f'method="{method}",endpoint="{template}"'
+                cumulative = 0
+                for bound, count in zip([str(b) for b in self.buckets] + ["+Inf"], stats.buckets):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {stats.latency_sum}")
+                lines.append(f"{name}_count{{{labels}}} {stats.requests}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Clears every metric"""
+        with self.lock:
+            self.endpoints.clear()
+
+# The metrics shared by every transport in the process
+DEFAULT_METRICS = Metrics()
@@ -0,0 +1,231 @@
+from abc import ABC, abstractmethod
+from operator import itemgetter
+
+
+class Model (ABC):
+    """Base of the slotted models. Fields the model doesn't know about are kept in 'extra' - read them with get"""
+    __slots__ = ("extra",)
+    # API key -> attribute name of every field the model stores in a slot
+    FIELDS = {}
+
+    # There's deliberately no __getattr__ - defining one slows down every attribute read on the model
+    def get(self, key, default=None):
+        """Reads a field by its API key, including keys the model doesn't know about
+
+        Args:
+            key (str): API key of the field eg. class
+            default (Any, optional): Returned if the field isn't there. Defaults to None.
+
+        Returns:
+            Any: The value of the field
+        """
+        field = self.FIELDS.get(key)
+        if field is not None:
+            return getattr(self, field)
+        return self.extra.get(key, default) if self.extra else default
+
+    def set(self, key, value):
+        """Sets a field by its API key. Keys the model doesn't know about are stored in 'extra'
+
+        Args:
+            key (str): API key of the field eg. class
+            value (Any): The new value
+        """
+        field = self.FIELDS.get(key)
+        if field is not None:
+            setattr(self, field, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    @classmethod
+    def _extra(cls, data):
+        return {k: v for k, v in data.items() if k not in cls.FIELDS} or None
+
+    @classmethod
+    def from_json(cls, data):
+        """Builds the model from API JSON in one pass
+
+        Args:
+            data (dict): The JSON object returned by the API
+
+        Returns:
+            Model: The model
+        """
+        model = cls.__new__(cls)
+        model._load(data)
+        return model
+
+    @abstractmethod
+    def _load(self, data):
+        """Reads the model's fields from API JSON. Each model reads every field with one C level itemgetter call when the JSON
+        has them all (the usual case) and falls back to defaults when it doesn't"""
+
+class ShipModel (Model):
+    """A ship
+
+    Attributes:
+        id (str): ID of the ship
+        manufacturer (str): eg. Gravager
+        kind (str): The class of the ship eg. MK-I. Also readable as getattr(ship, 'class')
+        type (str): eg. GR-MK-I
+        location (str): Symbol of the location the ship is docked at. "IN-TRANSIT" while flying
+        x (int): x coordinate of the ship. None while flying
+        y (int): y coordinate of the ship. None while flying
+        speed (int): Speed of the ship
+        plating (int): Plating of the ship
+        weapons (int): Weapons of the ship
+        maxCargo (int): Total cargo volume of the ship
+        spaceAvailable (int): Cargo volume not in use
+        cargo (list): The goods on board - dicts of good, quantity & totalVolume
+        extra (dict): Any other keys returned by the API. None if there were none
+    """
+    __slots__ = ("id", "manufacturer", "kind", "type", "location", "x", "y", "speed", "plating", "weapons", "maxCargo", "spaceAvailable", "cargo")
+    FIELDS = {"id": "id", "manufacturer": "manufacturer", "class": "kind", "kind": "kind", "type": "type", "location": "location",
+              "x": "x", "y": "y", "speed": "speed", "plating": "plating", "weapons": "weapons", "maxCargo": "maxCargo",
+              "spaceAvailable": "spaceAvailable", "cargo": "cargo"}
+
+    _READ = itemgetter("id", "manufacturer", "class", "type", "location", "x", "y", "speed", "plating", "weapons", "maxCargo", "spaceAvailable", "cargo")
+
+    def _load(self, data):
+        try:
+            (self.id, self.manufacturer, self.kind, self.type, self.location, self.x, self.y, self.speed, self.plating,
+             self.weapons, self.maxCargo, self.spaceAvailable, self.cargo) = self._READ(data)
+        except KeyError:
+            # Ships in transit have no location
+            self._load_partial(data)
+            # A missing key can hide an unknown one in the count so always look
+            self.extra = self._extra(data)
+        else:
+            self.extra = None if len(data) == 13 else self._extra(data)
+
+    def _load_partial(self, data):
+        get = data.get
+        self.id = get('id')
+        self.manufacturer = get('manufacturer')
+        kind = get('class')
+        self.kind = kind if kind is not None else get('kind')
+        self.type = get('type')
+        location = get('location')
+        if location is None:
+            self.location, self.x, self.y = "IN-TRANSIT", None, None
+        else:
+            self.location, self.x, self.y = location, get('x'), get('y')
+        self.speed = get('speed')
+        self.plating = get('plating')
+        self.weapons = get('weapons')
+        self.maxCargo = get('maxCargo')
+        self.spaceAvailable = get('spaceAvailable')
+        cargo = get('cargo')
+        self.cargo = cargo if cargo is not None else []
+
+    def as_dict(self):
+        return {
+            "id": self.id,
+            "manufacturer": self.manufacturer,
+            "class": self.kind,
+            "type": self.type,
+            "location": self.location,
+            "x": self.x,
+            "y": self.y,
+            "speed": self.speed,
+            "plating": self.plating,
+            "weapons": self.weapons,
+            "maxCargo": self.maxCargo,
+            "spaceAvailable": self.spaceAvailable,
+            "cargo": self.cargo
+        }
+
+# 'class' is a keyword so the API name of 'kind' can only be added once the class exists - lets getattr(ship, 'class') keep working
+setattr(ShipModel, "class", property(lambda self: self.kind, lambda self, value: setattr(self, "kind", value)))
+
+class LocationModel (Model):
+    """A location
+
+    Attributes:
+        symbol (str): eg. OE-PM
+        type (str): eg. PLANET
+        name (str): eg. Prime
+        x (int): x coordinate
+        y (int): y coordinate
+        allowsConstruction (bool): Whether structures can be built here
+        structures (list): The structures at the location
+        extra (dict): Any other keys returned by the API. None if there were none
+    """
+    __slots__ = ("symbol", "type", "name", "x", "y", "allowsConstruction", "structures")
+    FIELDS = {"symbol": "symbol", "type": "type", "name": "name", "x": "x", "y": "y",
+              "allowsConstruction": "allowsConstruction", "structures": "structures"}
+
+    _READ = itemgetter("symbol", "type", "name", "x", "y", "allowsConstruction", "structures")
+
+    def _load(self, data):
+        try:
+            self.symbol, self.type, self.name, self.x, self.y, self.allowsConstruction, self.structures = self._READ(data)
+        except KeyError:
+            self._load_partial(data)
+            self.extra = self._extra(data)
+        else:
+            self.extra = None if len(data) == 7 else self._extra(data)
+
+    def _load_partial(self, data):
+        get = data.get
+        self.symbol = get('symbol')
+        self.type = get('type')
+        self.name = get('name')
+        self.x = get('x')
+        self.y = get('y')
+        self.allowsConstruction = get('allowsConstruction', False)
+        structures = get('structures')
+        self.structures = structures if structures is not None else []
+
+    def as_dict(self):
+        return {
+            "symbol": self.symbol,
+            "type": self.type,
+            "name": self.name,
+            "x": self.x,
+            "y": self.y,
+            "allowsConstruction": self.allowsConstruction,
+            "structures": self.structures
+        }
+
+class UserModel (Model):
+    """A user
+
+    Attributes:
+        username (str): Username of the user
+        credits (int): Credits the user has
+        ships (list): The user's ships as ship models
+        loans (list): The user's loans
+        extra (dict): Any other keys returned by the API. None if there were none
+    """
+    __slots__ = ("username", "credits", "ships", "loans")
+    FIELDS = {"username": "username", "credits": "credits", "ships": "ships", "loans": "loans"}
+    # The model the user's ships are built as
+    SHIP = ShipModel
+
+    _READ = itemgetter("username", "credits", "ships", "loans")
+
+    def _load(self, data):
+        try:
+            self.username, self.credits, ships, self.loans = self._READ(data)
+        except KeyError:
+            get = data.get
+            self.username, self.credits, ships, self.loans = get('username'), get('credits'), get('ships') or [], get('loans') or []
+            self.extra = self._extra(data)
+        else:
+            self.extra = None if len(data) == 4 else self._extra(data)
+        self.ships = [self.make_ship(ship) for ship in ships]
+
+    def make_ship(self, data):
+        """Builds one of the user's ships from API JSON"""
+        return self.SHIP.from_json(data)
+
+    def as_dict(self):
+        return {
+            "username": self.username,
+            "credits": self.credits,
+            "ships": [ship.as_dict() for ship in self.ships],
+            "loans": self.loans
+        }
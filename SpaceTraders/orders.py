@@ -0,0 +1,105 @@
+import logging
+
+
+# The API rejects orders of more than 300 units
+MAX_ORDER_UNITS = 300
+
+def split_quantity(quantity, max_units=MAX_ORDER_UNITS):
+    """Splits a quantity into chunks the API will accept
+
+    Args:
+        quantity (int): Total units to order
+        max_units (int, optional): Largest single order. Defaults to MAX_ORDER_UNITS.
+
+    Returns:
+        list: The size of each order eg. 650 -> [300, 300, 50]
+    """
+    full, rest = divmod(quantity, max_units)
+    return [max_units] * full + ([rest] if rest else [])
+
+def merge_orders(orders):
+    """Merges the responses of a chunked order into one response shaped like a single order
+
+    Args:
+        orders (list): The JSON responses of each chunk in the order they were made
+
+    Returns:
+        dict:
+            - credits : the user's credits after the last chunk
+            - order : good, quantity (total units), pricePerUnit (average) & total (total cost) across every chunk
+            - ship : the ship after the last chunk
+            - orders : the order of each chunk
+    """
+    quantity = sum(o['order']['quantity'] for o in orders)
+    total = sum(o['order']['total'] for o in orders)
+    return {
+        "credits": orders[-1]['credits'],
+        "order": {
+            "good": orders[-1]['order']['good'],
+            "quantity": quantity,
+            "pricePerUnit": total / quantity if quantity else 0,
+            "total": total
+        },
+        "ship": orders[-1]['ship'],
+        "orders": [o['order'] for o in orders]
+    }
+
+def _stopped(shipId, good, quantity, orders):
+    logging.warning(f"Bulk order of {quantity} units of {good} for ship {shipId} stopped after {sum(o['order']['quantity'] for o in orders)} units")
+
+def bulk_order(place_order, shipId, good, quantity, max_units=MAX_ORDER_UNITS):
+    """Makes an order of any size by placing chunks of at most 300 units back to back.
+    Stops at the first chunk that fails and returns what was achieved up to then.
+
+    Args:
+        place_order (callable): Makes a single order - called as place_order(shipId, good, quantity)
+        shipId (str): ID of the ship the goods are loaded onto or taken from
+        good (str): Symbol of the good
+        quantity (int): Total units to order
+        max_units (int, optional): Largest single order. Defaults to MAX_ORDER_UNITS.
+
+    Returns:
+        dict: The merged order (see merge_orders). The failed result of the first chunk if nothing was ordered
+              and None if there were no units to order
+    """
+    chunks = split_quantity(quantity, max_units)
+    if not chunks:
+        return None
+    orders = []
+    for units in chunks:
+        order = place_order(shipId, good, units)
+        if not order:
+            _stopped(shipId, good, quantity, orders)
+            if not orders:
+                return order
+            break
+        orders.append(order)
+    return merge_orders(orders)
+
+async def async_bulk_order(place_order, shipId, good, quantity, max_units=MAX_ORDER_UNITS):
+    """The asyncio version of bulk_order. The chunks are awaited one after the other as each depends on the cargo left by the last
+
+    Args:
+        place_order (callable): Coroutine function making a single order - called as place_order(shipId, good, quantity)
+        shipId (str): ID of the ship the goods are loaded onto or taken from
+        good (str): Symbol of the good
+        quantity (int): Total units to order
+        max_units (int, optional): Largest single order. Defaults to MAX_ORDER_UNITS.
+
+    Returns:
+        dict: The merged order (see merge_orders). The failed result of the first chunk if nothing was ordered
+              and None if there were no units to order
+    """
+    chunks = split_quantity(quantity, max_units)
+    if not chunks:
+        return None
+    orders = []
+    for units in chunks:
+        order = await place_order(shipId, good, units)
+        if not order:
+            _stopped(shipId, good, quantity, orders)
+            if not orders:
+                return order
+            break
+        orders.append(order)
+    return merge_orders(orders)
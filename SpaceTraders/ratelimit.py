@@ -0,0 +1,134 @@
+import threading
+import time
+import logging
+
+
+# Space Traders allows 2 requests per second per token
+RATE = 2
+BURST = 2
+
+class RateLimiter ():
+    def __init__(self, rate=RATE, burst=BURST, clock=time.monotonic, sleep=time.sleep):
+        """A thread-safe token bucket that paces requests before they are sent to the API.
+        One limiter is shared by every thread and every Client so the whole process stays under the throttle.
+
+        Args:
+            rate (float, optional): Requests per second that are allowed. Defaults to RATE.
+            burst (int, optional): How many requests can be sent back to back when the bucket is full. Defaults to BURST.
+            clock (callable, optional): Monotonic clock returning seconds. Defaults to time.monotonic.
+            sleep (callable, optional): Function used to block while waiting. Defaults to time.sleep.
+        """
+        self.lock = threading.Lock()
+        self.clock = clock
+        self.sleep = sleep
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = clock()
+        self.requests = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def configure(self, rate=None, burst=None):
+        """Changes the rate and/or burst of the limiter in place so everyone sharing it picks up the change
+
+        Args:
+            rate (float, optional): Requests per second that are allowed. Defaults to None (unchanged).
+            burst (int, optional): Size of the bucket. Defaults to None (unchanged).
+        """
+        with self.lock:
+            self._refill()
+            if rate is not None:
+                self.rate = rate
+            if burst is not None:
+                self.burst = burst
+                self.tokens = min(self.tokens, burst)
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, tokens=1):
+        """Takes tokens from the bucket without blocking.
+        The bucket is allowed to go into debt so callers are queued in the order they reserved.
+
+        Args:
+            tokens (int, optional): How many requests to reserve. Defaults to 1.
+
+        Returns:
+            float: Seconds the caller must wait before sending
+        """
+        with self.lock:
+            self._refill()
+            self.tokens -= tokens
+            wait = max(0.0, -self.tokens / self.rate)
+            self.requests += tokens
+            if wait > 0:
+                self.waits += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+        return wait
+
+    def try_acquire(self, tokens=1):
+        """Takes tokens from the bucket only if they are available now
+
+        Args:
+            tokens (int, optional): How many requests to acquire. Defaults to 1.
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise the seconds until they will be available
+        """
+        with self.lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                self.requests += tokens
+                return 0
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens=1):
+        """Blocks until the caller is allowed to send a request
+
+        Args:
+            tokens (int, optional): How many requests to acquire. Defaults to 1.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            logging.debug(f"Rate limiter pausing for {wait:.3f} seconds")
+            self.sleep(wait)
+        return wait
+
+    def pause(self, seconds):
+        """Holds back every caller for the given time - used when the server says we have been throttled
+
+        Args:
+            seconds (float): How long no requests should be sent for
+        """
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+    def stats(self):
+        """Returns the wait-time metrics of the limiter
+
+        Returns:
+            dict: requests, waits, total_wait, max_wait & average_wait (seconds)
+        """
+        with self.lock:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "requests": self.requests,
+                "waits": self.waits,
+                "total_wait": self.total_wait,
+                "max_wait": self.max_wait,
+                "average_wait": self.total_wait / self.requests if self.requests else 0.0
+            }
+
+# The limiter shared by every entry point in the process
+DEFAULT_LIMITER = RateLimiter()
@@ -0,0 +1,138 @@
+import time
+import logging
+
+
+# The API's volume of one unit of fuel
+FUEL_VOLUME = 1
+
+def apply_credits(user, response):
+    """Sets the user's credits from any response that carries them"""
+    credits = response.get('credits')
+    if credits is not None:
+        user.credits = credits
+
+def apply_order(user, response):
+    """Applies a purchase or sell order response (or a merged bulk order) to the user & the ship ordered for
+
+    Args:
+        user (User): The user who placed the order
+        response (dict): The order response - credits, order & ship
+    """
+    apply_credits(user, response)
+    ship = user.ships.get(response['ship']['id'])
+    if ship is not None:
+        ship.apply_order(response)
+
+def _with_fuel(ship, fuel):
+    # The ship's cargo with its fuel set to 'fuel' units
+    cargo = [entry for entry in ship.cargo if entry['good'] != "FUEL"]
+    if fuel > 0:
+        cargo.append({"good": "FUEL", "quantity": fuel, "totalVolume": fuel * FUEL_VOLUME})
+    return cargo
+
+def apply_departure(user, flight):
+    """Applies a new flight plan to the ship flying - it burns its fuel and is in transit until apply_arrival
+
+    Args:
+        user (User): The user who owns the ship
+        flight (dict): The flightPlan of the response
+    """
+    ship = user.ships.get(flight['shipId'])
+    if ship is None:
+        return
+    ship.update_cargo(_with_fuel(ship, flight['fuelRemaining']), ship.spaceAvailable + flight['fuelConsumed'] * FUEL_VOLUME)
+    ship.update_location(None, None, "IN-TRANSIT")
+
+def apply_arrival(user, flight, location=None):
+    """Lands a ship at the destination of its flight plan
+
+    Args:
+        user (User): The user who owns the ship
+        flight (dict): The flightPlan the ship flew
+        location (Location, optional): The destination - gives the ship its x & y. Defaults to leaving them unknown.
+    """
+    ship = user.ships.get(flight['shipId'])
+    if ship is None:
+        return
+    x, y = (location.x, location.y) if location is not None else (None, None)
+    ship.update_location(x, y, flight['destination'])
+
+def apply_ship_purchase(user, response):
+    """Adds a ship just bought to the user's fleet and charges its price
+
+    Args:
+        user (User): The user who bought the ship
+        response (dict): The response of buying the ship - credits & ship
+    """
+    apply_credits(user, response)
+    user.ships.add(user.make_ship(response['ship']))
+
+def apply_loan(user, response):
+    """Applies a loan taken out (credits & loan) or paid off (user holding credits & loans) to the user"""
+    # PayLoan returns the whole user - its credits & loans are nested under 'user'
+    response = response.get('user', response)
+    apply_credits(user, response)
+    if 'loans' in response:
+        user.loans = response['loans']
+    elif 'loan' in response:
+        user.loans = [loan for loan in user.loans if loan.get('id') != response['loan'].get('id')] + [response['loan']]
+
+def _ship_state(ship):
+    # What's compared between the ship held & the ship returned by the API
+    if isinstance(ship, dict):
+        return (ship.get('location', "IN-TRANSIT"), ship['spaceAvailable'], sorted((c['good'], c['quantity']) for c in ship['cargo']))
+    return (ship.location, ship.spaceAvailable, sorted((c['good'], c['quantity']) for c in ship.cargo))
+
+class DriftCheck ():
+    def __init__(self, interval=300, clock=time.monotonic):
+        """Compares the state held for a user with users/{username} every so often and repairs any drift
+
+        Args:
+            interval (float, optional): Seconds between checks. Defaults to 300.
+            clock (callable, optional): Returns the time in seconds. Defaults to time.monotonic.
+        """
+        self.interval = interval
+        self.clock = clock
+        self.last = clock()
+        self.drifted = 0
+
+    def due(self):
+        """Returns whether a check is due"""
+        return self.clock() - self.last >= self.interval
+
+    def check(self, user, fetched):
+        """Compares the user with the user returned by the API and repairs anything that drifted
+
+        Args:
+            user (User): The user held in memory
+            fetched (dict): The user returned by users/{username}
+
+        Returns:
+            list: A description of each thing that drifted. Empty if nothing did
+        """
+        self.last = self.clock()
+        drift = []
+        if user.credits != fetched['credits']:
+            drift.append(f"credits {user.credits} != {fetched['credits']}")
+            user.credits = fetched['credits']
+        if user.loans != fetched['loans']:
+            drift.append("loans")
+            user.loans = fetched['loans']
+        ships = {ship['id']: ship for ship in fetched['ships']}
+        for ship in list(user.ships):
+            if ship.id not in ships:
+                drift.append(f"ship {ship.id} no longer owned")
+                user.ships.remove(ship.id)
+        for shipId, data in ships.items():
+            ship = user.ships.get(shipId)
+            if ship is None:
+                drift.append(f"ship {shipId} missing")
+                user.ships.add(user.make_ship(data))
+            elif _ship_state(ship) != _ship_state(data):
+                drift.append(f"ship {shipId}")
+                ship._load(data)
+                ship.changed()
+        if drift:
+            self.drifted += 1
+            logging.warning(f"State of user {user.username} drifted from the API - repaired: {', '.join(drift)}")
+        return drift
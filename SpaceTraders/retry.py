@@ -0,0 +1,163 @@
+import random
+import threading
+import time
+import logging
+import email.utils
+from datetime import datetime
+
+
+# Error codes returned by the API that are worth retrying
+THROTTLE_CODE = 42901
+RETRYABLE_CODES = (THROTTLE_CODE, 409, 500)
+
+def error_code(response):
+    """Gets the Space Traders error code from a response
+
+    Args:
+        response (Response): A requests or httpx response
+
+    Returns:
+        int: The error code of the response. The HTTP status if the body has no error code. None if the response was successful
+    """
+    if response.status_code < 400:
+        return None
+    try:
+        return response.json()['error']['code']
+    except (ValueError, KeyError, TypeError):
+        return response.status_code
+
+def retry_after(headers, now=time.time):
+    """Reads how long the server asked us to wait from the rate limit headers of a response
+
+    Handles 'Retry-After' as seconds or a HTTP date and 'X-RateLimit-Reset' as seconds, an epoch or an ISO timestamp.
+
+    Args:
+        headers (Mapping): Headers of the response
+
+    Returns:
+        float: Seconds to wait. None if the server didn't say
+    """
+    if not headers:
+        return None
+    value = headers.get('Retry-After')
+    if value is not None:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - now())
+            except (TypeError, ValueError):
+                pass
+    value = headers.get('X-RateLimit-Reset')
+    if value is not None:
+        try:
+            reset = float(value)
+            # Small values are a number of seconds, large values an epoch
+            return max(0.0, reset - now()) if reset > 1e9 else max(0.0, reset)
+        except ValueError:
+            try:
+                return max(0.0, datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp() - now())
+            except ValueError:
+                pass
+    return None
+
+class RetryPolicy ():
+    def __init__(self, max_attempts=5, deadline=60, base_delay=0.5, max_delay=10, retryable_codes=RETRYABLE_CODES,
+                 rand=random.random, clock=time.monotonic, sleep=time.sleep):
+        """Decides whether and when a failed request should be tried again.
+        Uses exponential backoff with full jitter unless the server says how long to wait.
+
+        Args:
+            max_attempts (int, optional): Most times a request will be sent, including the first. Defaults to 5.
+            deadline (float, optional): Seconds after the first attempt that retrying stops. Defaults to 60.
+            base_delay (float, optional): Backoff cap of the first retry in seconds. Doubles each attempt. Defaults to 0.5.
+            max_delay (float, optional): Largest backoff in seconds. Defaults to 10.
+            retryable_codes (tuple, optional): Error codes that are retried. Everything else is fatal. Defaults to RETRYABLE_CODES.
+            rand (callable, optional): Returns a float in [0, 1) for the jitter. Defaults to random.random.
+            clock (callable, optional): Monotonic clock returning seconds. Defaults to time.monotonic.
+            sleep (callable, optional): Function used to block between attempts. Defaults to time.sleep.
+        """
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable_codes = retryable_codes
+        self.rand = rand
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.gave_up = 0
+        self.attempts = {}
+
+    def is_retryable(self, code):
+        """Returns True if the error code is worth retrying"""
+        return code in self.retryable_codes
+
+    def backoff(self, attempt):
+        """Full jitter backoff - a random delay between 0 and the exponential cap
+
+        Args:
+            attempt (int): The attempt that just failed, starting at 1
+
+        Returns:
+            float: Seconds to wait
+        """
+        return self.rand() * min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+
+    def next_delay(self, code, attempt, started, headers=None):
+        """Works out how long to wait before the next attempt
+
+        Args:
+            code (int): Error code of the last attempt. None if it succeeded
+            attempt (int): How many attempts have been made
+            started (float): Clock time of the first attempt
+            headers (Mapping, optional): Headers of the last response. Defaults to None.
+
+        Returns:
+            float: Seconds to wait before trying again. None if the request should not be retried
+        """
+        if code is None or not self.is_retryable(code):
+            return None
+        if attempt >= self.max_attempts:
+            logging.warning(f"Giving up after {attempt} attempts. Last error code: {code}")
+            return None
+        delay = retry_after(headers)
+        if delay is None:
+            delay = self.backoff(attempt)
+        if self.clock() - started + delay > self.deadline:
+            logging.warning(f"Giving up after {attempt} attempts - retrying would pass the {self.deadline} second deadline. Last error code: {code}")
+            return None
+        return delay
+
+    def record(self, attempts, code):
+        """Records the outcome of a call so attempt counts can be reported
+
+        Args:
+            attempts (int): How many attempts the call took
+            code (int): Error code of the final attempt. None if it succeeded
+        """
+        with self.lock:
+            self.calls += 1
+            self.retries += attempts - 1
+            self.attempts[attempts] = self.attempts.get(attempts, 0) + 1
+            if code is not None and self.is_retryable(code):
+                self.gave_up += 1
+
+    def stats(self):
+        """Returns the attempt counts of every call made under this policy
+
+        Returns:
+            dict: calls, retries, gave_up & attempts (a count of calls per number of attempts)
+        """
+        with self.lock:
+            return {
+                "calls": self.calls,
+                "retries": self.retries,
+                "gave_up": self.gave_up,
+                "attempts": dict(self.attempts)
+            }
+
+# The policy shared by every transport in the process
+DEFAULT_RETRY = RetryPolicy()
@@ -0,0 +1,132 @@
+import numpy as np
+from .flights import FlightTimeModel
+
+
+# How many partial routes are carried from one leg to the next
+BEAM_WIDTH = 64
+
+class RoutePlanner ():
+    def __init__(self, engine, world, flight_time=None):
+        """Plans trade cycles - fly from a location through others and back, trading at every stop - by beam search
+        over the profit of every trade (an ArbitrageEngine) and the distance & fuel of every flight (a World).
+
+        Args:
+            engine (ArbitrageEngine): The markets the ship can trade at
+            world (World): The world the markets are in
+            flight_time (callable, optional): Seconds to fly an array of distances at a speed. Defaults to FlightTimeModel().
+        """
+        self.engine = engine
+        self.world = world
+        self.flight_time = FlightTimeModel() if flight_time is None else flight_time
+        # Markets the world doesn't know can't be flown to
+        self.columns = np.array([i for i, symbol in enumerate(engine.locations) if symbol in world.index], dtype=np.int64)
+        self.locations = tuple(engine.locations[i] for i in self.columns)
+        self.index = {symbol: i for i, symbol in enumerate(self.locations)}
+        rows = np.array([world.index[symbol] for symbol in self.locations], dtype=np.int64)
+        self.rows = np.ix_(rows, rows)
+        self.distance = world.distance[self.rows]
+        # Flights between systems go through wormholes so trades stay inside a system
+        self.reachable = world.same_system[self.rows] & ~np.eye(len(self.locations), dtype=bool)
+        self.purchase = np.nan_to_num(engine.purchase[self.columns], nan=np.inf)
+        self.volume = np.nan_to_num(engine.volume[self.columns], nan=np.inf)
+        self.quantity = engine.quantity[self.columns]
+        self.profit = np.nan_to_num(engine.profit[np.ix_(self.columns, self.columns)], nan=0.0)
+        fuel = engine.good_index.get("FUEL")
+        # Locations not selling fuel are treated as free to refuel at rather than unreachable
+        self.fuel_price = np.zeros(len(self.locations)) if fuel is None else np.nan_to_num(self.purchase[:, fuel], posinf=0.0)
+
+    def __repr__(self):
+        return f"<RoutePlanner Object> Locations: {len(self.locations)}, Goods: {len(self.engine.goods)}"
+
+    def _legs(self, at, credits, max_cargo, fuel):
+        # The best trade of each partial route (row) flying on to each location (column) - net profit, good & units
+        cargo = (max_cargo - fuel[at]).astype(float)
+        spend = credits[:, None] - fuel[at] * self.fuel_price[at][:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            units = np.minimum(np.floor(cargo[:, :, None] / self.volume[at][:, None, :]),
+                               np.floor(spend[:, :, None] / self.purchase[at][:, None, :]))
+        # Unlimited credits over a good that isn't traded is inf / inf
+        units = np.clip(np.minimum(np.nan_to_num(units, nan=0.0), self.quantity[at][:, None, :]), 0, None)
+        gains = units * self.profit[at]
+        good = np.argmax(gains, axis=2)
+        gain = np.take_along_axis(gains, good[..., None], axis=2)[..., 0]
+        # Flying empty beats a trade that loses money
+        units = np.where(gain > 0, np.take_along_axis(units, good[..., None], axis=2)[..., 0], 0)
+        net = np.maximum(gain, 0) - fuel[at] * self.fuel_price[at][:, None]
+        legal = self.reachable[at] & (cargo > 0) & (spend >= 0)
+        return net, good, units.astype(np.int64), legal
+
+    def plan(self, ship, credits=None, start=None, max_legs=4, beam_width=BEAM_WIDTH):
+        """Returns the trade cycle from start back to start that makes the most profit per hour
+
+        Args:
+            ship (Ship): The ship flying - its maxCargo, speed & class are used
+            credits (int, optional): Credits the ship can spend on goods & fuel. Defaults to unlimited.
+            start (str, optional): Symbol of the location the cycle starts & ends at. Defaults to the ship's location.
+            max_legs (int, optional): Most flights in the cycle. Defaults to 4.
+            beam_width (int, optional): Partial routes kept after each leg. Defaults to BEAM_WIDTH.
+
+        Returns:
+            dict: The cycle or None if there's no profitable cycle
+                - locations : symbols visited, starting & ending at start
+                - legs : from, to, symbol (None flying empty), units, cost, profit (after fuel), fuel_required & seconds of each flight
+                - profit : total profit after fuel
+                - seconds : total flight time
+                - profit_per_hour : profit / hours
+        """
+        start = self.index[ship.location if start is None else start]
+        fuel = self.world.fuel_matrix(ship.kind)[self.rows]
+        seconds = self.flight_time(self.distance, ship.speed)
+        n = len(self.locations)
+        # The beam - one entry per partial route
+        at = np.array([start])
+        money = np.array([np.inf if credits is None else float(credits)])
+        profit = np.zeros(1)
+        elapsed = np.zeros(1)
+        visited = np.zeros((1, n), dtype=bool)
+        history = [()]
+        best, best_score = None, 0.0
+        for depth in range(1, max_legs + 1):
+            net, good, units, legal = self._legs(at, money, ship.maxCargo, fuel)
+            total = profit[:, None] + net
+            arrival = elapsed[:, None] + seconds[at]
+            closing = np.zeros(n, dtype=bool)
+            closing[start] = True
+            if depth > 1:
+                score = np.where(legal[:, start], total[:, start] / (arrival[:, start] / 3600), -np.inf)
+                b = int(np.argmax(score))
+                if score[b] > best_score:
+                    best_score = float(score[b])
+                    best = history[b] + ((int(at[b]), start, int(good[b, start]), int(units[b, start]), float(net[b, start])),)
+                    best_time, best_profit = float(arrival[b, start]), float(total[b, start])
+            # Carry on to locations not yet visited - ranked by profit per hour if the ship flew home from there
+            legal = legal & ~visited & ~closing
+            if depth == max_legs or not legal.any():
+                break
+            rank = np.where(legal, total / ((arrival + seconds[:, start]) / 3600), -np.inf).ravel()
+            keep = min(beam_width, int(legal.sum()))
+            chosen = np.argpartition(-rank, keep - 1)[:keep]
+            b, j = np.unravel_index(chosen, legal.shape)
+            history = [history[bi] + ((int(at[bi]), int(ji), int(good[bi, ji]), int(units[bi, ji]), float(net[bi, ji])),) for bi, ji in zip(b, j)]
+            money = money[b] + net[b, j]
+            profit, elapsed = total[b, j], arrival[b, j]
+            visited = visited[b].copy()
+            visited[np.arange(len(j)), j] = True
+            at = j
+        if best is None:
+            return None
+        legs = []
+        for i, j, g, count, leg_profit in best:
+            legs.append({"from": self.locations[i],
+                         "to": self.locations[j],
+                         "symbol": self.engine.goods[g] if count else None,
+                         "units": count,
+                         "cost": float(self.purchase[i, g]) if count else 0.0,
+                         "profit": leg_profit,
+                         "fuel_required": int(fuel[i, j]),
+                         "seconds": float(seconds[i, j])})
+        return {"locations": [leg["from"] for leg in legs] + [legs[-1]["to"]],
+                "legs": legs,
+                "profit": best_profit,
+                "seconds": best_time,
+                "profit_per_hour": best_score}
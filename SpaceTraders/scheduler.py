@@ -0,0 +1,170 @@
+import asyncio
+import threading
+import itertools
+import contextvars
+from contextlib import contextmanager
+from .ratelimit import DEFAULT_LIMITER
+
+
+# Priority classes - lower goes first
+CRITICAL = 0    # Orders & flights - ships are waiting on these
+NORMAL = 1      # Trade planning reads
+BACKGROUND = 2  # Tracker polls & dashboard reads
+PRIORITY_NAMES = {CRITICAL: "critical", NORMAL: "normal", BACKGROUND: "background"}
+
+# Seconds of waiting that promote a request by one class so background work is never starved
+AGING = 5.0
+
+_priority = contextvars.ContextVar("spacetraders_priority", default=None)
+
+@contextmanager
+def priority(level):
+    """Runs every API call made inside the block at the given priority class. Works per thread and per asyncio task
+
+    Usage:
+        with priority(BACKGROUND):
+            location.marketplace()
+
+    Args:
+        level (int): CRITICAL, NORMAL or BACKGROUND
+    """
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority(method):
+    """Works out the priority class of a request. Uses the enclosing 'priority' block if there is one,
+    otherwise anything that changes state (orders, flights) is CRITICAL and reads are NORMAL
+
+    Args:
+        method (str): The HTTP method of the request
+
+    Returns:
+        int: The priority class
+    """
+    level = _priority.get()
+    if level is not None:
+        return level
+    return NORMAL if method == "GET" else CRITICAL
+
+class PriorityScheduler ():
+    def __init__(self, limiter=DEFAULT_LIMITER, aging=AGING, clock=None):
+        """Hands out the shared rate budget to waiting requests in priority order.
+        Requests that have waited longer than 'aging' seconds are promoted a class for each period waited so low classes can't starve.
+
+        Args:
+            limiter (RateLimiter, optional): The rate budget being shared. Defaults to DEFAULT_LIMITER.
+            aging (float, optional): Seconds waited that promote a request by one class. Defaults to AGING.
+            clock (callable, optional): Monotonic clock returning seconds. Defaults to the limiter's clock.
+        """
+        self.limiter = limiter
+        self.aging = aging
+        self.clock = clock if clock is not None else limiter.clock
+        self.cond = threading.Condition()
+        self.sequence = itertools.count()
+        self.waiting = []
+        self.max_depth = {level: 0 for level in PRIORITY_NAMES}
+        self.latency = {level: {"requests": 0, "total_wait": 0.0, "max_wait": 0.0} for level in PRIORITY_NAMES}
+
+    def _rank(self, waiter, now):
+        level, enqueued, seq = waiter
+        return (level - (now - enqueued) / self.aging, seq)
+
+    def _enqueue(self, level):
+        waiter = (level, self.clock(), next(self.sequence))
+        self.waiting.append(waiter)
+        depth = sum(1 for w in self.waiting if w[0] == level)
+        self.max_depth[level] = max(self.max_depth.get(level, 0), depth)
+        return waiter
+
+    def _try(self, waiter):
+        # Must hold self.cond. Returns (0, True) if the waiter was granted a token,
+        # otherwise the seconds to wait before checking again and whether the waiter is at the head of the queue
+        now = self.clock()
+        head = min(self.waiting, key=lambda w: self._rank(w, now))
+        if head is not waiter:
+            return max(self.limiter.try_acquire(0), 1.0 / self.limiter.rate), False
+        wait = self.limiter.try_acquire()
+        if wait == 0:
+            self.waiting.remove(waiter)
+            waited = now - waiter[1]
+            stats = self.latency.setdefault(waiter[0], {"requests": 0, "total_wait": 0.0, "max_wait": 0.0})
+            stats["requests"] += 1
+            stats["total_wait"] += waited
+            stats["max_wait"] = max(stats["max_wait"], waited)
+            # Let the next in line check the bucket
+            self.cond.notify_all()
+        return wait, True
+
+    def acquire(self, level=NORMAL):
+        """Blocks until it is this request's turn and a token is available
+
+        Args:
+            level (int, optional): The priority class of the request. Defaults to NORMAL.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        with self.cond:
+            waiter = self._enqueue(level)
+        while True:
+            with self.cond:
+                wait, head = self._try(waiter)
+                if wait == 0:
+                    return self.clock() - waiter[1]
+                if not head:
+                    # Woken early by notify_all when the head is served
+                    self.cond.wait(wait)
+                    continue
+            # The head waits for the bucket to refill without holding up the queue
+            self.limiter.sleep(wait)
+
+    async def acquire_async(self, level=NORMAL):
+        """The asyncio version of acquire - waits without blocking the event loop
+
+        Args:
+            level (int, optional): The priority class of the request. Defaults to NORMAL.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        with self.cond:
+            waiter = self._enqueue(level)
+        try:
+            while True:
+                with self.cond:
+                    wait, head = self._try(waiter)
+                if wait == 0:
+                    return self.clock() - waiter[1]
+                await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            with self.cond:
+                if waiter in self.waiting:
+                    self.waiting.remove(waiter)
+                    self.cond.notify_all()
+            raise
+
+    def stats(self):
+        """Returns the queue depth and wait time of each priority class
+
+        Returns:
+            dict: keyed by class name - depth (waiting now), max_depth, requests, total_wait, max_wait & average_wait (seconds)
+        """
+        with self.cond:
+            result = {}
+            for level, stats in self.latency.items():
+                name = PRIORITY_NAMES.get(level, str(level))
+                result[name] = {
+                    "depth": sum(1 for w in self.waiting if w[0] == level),
+                    "max_depth": self.max_depth.get(level, 0),
+                    "requests": stats["requests"],
+                    "total_wait": stats["total_wait"],
+                    "max_wait": stats["max_wait"],
+                    "average_wait": stats["total_wait"] / stats["requests"] if stats["requests"] else 0.0
+                }
+            return result
+
+# The scheduler in front of the process wide rate limiter
+DEFAULT_SCHEDULER = PriorityScheduler()
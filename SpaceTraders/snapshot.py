@@ -0,0 +1,121 @@
+"""A versioned binary snapshot of the world - the systems plus every table worked out from them (World.TABLES, distance & fuel)
+
+Layout (little endian):
+    magic       8 bytes  b"STWORLD\\0"
+    version     uint32   SNAPSHOT_VERSION
+    header size uint32   bytes of the JSON header that follows
+    header      JSON     {"systems": [...], "arrays": {name: {"dtype", "shape", "offset"}}}
+    arrays      raw      each array starts on an ALIGNMENT boundary
+
+Loading maps the file and points NumPy at the tables without reading or copying them,
+so every worker process that loads the same snapshot shares one copy in the page cache. Only the symbols
+of the locations are worked out again - nothing of size locations x locations is.
+
+Usage:
+    python -m SpaceTraders.snapshot [systems.json] [world.snapshot]
+"""
+import os
+import sys
+import json
+import mmap
+import struct
+import tempfile
+import numpy as np
+from .world import World, FUEL_PENALTIES, share_world
+
+
+MAGIC = b"STWORLD\0"
+# Bump when the layout changes - snapshots written under another version are refused
+SNAPSHOT_VERSION = 2
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<8sII")
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def write_snapshot(path, systems):
+    """Writes a snapshot of the systems with their distance & fuel tables. The file is written atomically
+
+    Args:
+        path (str): Where to write the snapshot
+        systems (list): The systems as returned by game/systems (Game.systems)
+
+    Returns:
+        World: The world the snapshot was written from
+    """
+    world = World(systems)
+    arrays = {name: getattr(world, name) for name in World.TABLES}
+    arrays["distance"] = world.distance
+    for kind in FUEL_PENALTIES:
+        arrays["fuel/" + kind] = world.fuel_matrix(kind)
+    # Offsets are from the start of the file so lay the arrays out once the header's size is known
+    layout = {name: {"dtype": np.dtype(array.dtype).newbyteorder("<").str, "shape": list(array.shape), "offset": 0} for name, array in arrays.items()}
+    while True:
+        header = json.dumps({"systems": systems, "arrays": layout}, separators=(",", ":")).encode()
+        offset = _aligned(_PREAMBLE.size + len(header))
+        moved = False
+        for name, array in arrays.items():
+            if layout[name]["offset"] != offset:
+                layout[name]["offset"], moved = offset, True
+            offset = _aligned(offset + array.nbytes)
+        if not moved:
+            break
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as outfile:
+            outfile.write(_PREAMBLE.pack(MAGIC, SNAPSHOT_VERSION, len(header)))
+            outfile.write(header)
+            for name, array in arrays.items():
+                outfile.seek(layout[name]["offset"])
+                outfile.write(np.ascontiguousarray(array, dtype=layout[name]["dtype"]).tobytes())
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return world
+
+def load_snapshot(path):
+    """Maps a snapshot into memory and returns its World. The tables are views of the mapped file - nothing is copied.
+    The world is also shared so get_world returns it for the same systems.
+
+    Args:
+        path (str): The snapshot to load
+
+    Returns:
+        World: The world of the snapshot
+
+    Raises:
+        ValueError: If the file isn't a snapshot or was written under another SNAPSHOT_VERSION
+    """
+    with open(path, 'rb') as infile:
+        mapped = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mapped) < _PREAMBLE.size:
+        raise ValueError(f"{path} is not a world snapshot")
+    magic, version, size = _PREAMBLE.unpack_from(mapped)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a world snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"{path} is a version {version} snapshot - version {SNAPSHOT_VERSION} is needed")
+    header = json.loads(mapped[_PREAMBLE.size:_PREAMBLE.size + size])
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        arrays[name] = np.frombuffer(mapped, dtype=dtype, count=count, offset=spec["offset"]).reshape(spec["shape"])
+    fuel_matrices = {name.split("/", 1)[1]: array for name, array in arrays.items() if name.startswith("fuel/")}
+    tables = {name: arrays[name] for name in World.TABLES}
+    return share_world(World(header["systems"], distance=arrays["distance"], fuel_matrices=fuel_matrices, tables=tables))
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "constants", "systems.json")
+    target = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(source)[0] + ".snapshot"
+    with open(source, 'r') as infile:
+        systems = json.load(infile)
+    world = write_snapshot(target, systems)
+    print(f"Wrote {len(world)} locations to {target}")
+
+if __name__ == "__main__":
+    main()
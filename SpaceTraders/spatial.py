@@ -0,0 +1,183 @@
+import math
+import heapq
+import threading
+from .models import LocationModel
+from .world import systems_key
+
+
+def system_of(symbol):
+    """Returns the system a location symbol belongs to eg. OE for OE-PM-TR"""
+    return symbol.split("-", 1)[0]
+
+class _SystemGrid ():
+    """A uniform grid over the locations of one system - sized so each cell holds about one location"""
+    __slots__ = ("cell", "cells", "reach")
+
+    def __init__(self, locations, cell_size=None):
+        xs = [loc.x for loc in locations]
+        ys = [loc.y for loc in locations]
+        if cell_size is None:
+            extent = max(max(xs) - min(xs), max(ys) - min(ys))
+            cell_size = max(extent / math.sqrt(len(locations)), 1)
+        self.cell = cell_size
+        self.cells = {}
+        for loc in locations:
+            self.cells.setdefault(self._cell(loc.x, loc.y), []).append(loc)
+        keys = self.cells.keys()
+        # Corners of the occupied cells - bounds how many rings a search can need
+        self.reach = (min(cx for cx, _ in keys), min(cy for _, cy in keys), max(cx for cx, _ in keys), max(cy for _, cy in keys))
+
+    def _cell(self, x, y):
+        return (math.floor(x / self.cell), math.floor(y / self.cell))
+
+    def _ring(self, cx, cy, r):
+        if r == 0:
+            yield (cx, cy)
+            return
+        for dx in range(-r, r + 1):
+            yield (cx + dx, cy - r)
+            yield (cx + dx, cy + r)
+        for dy in range(-r + 1, r):
+            yield (cx - r, cy + dy)
+            yield (cx + r, cy + dy)
+
+    def search(self, x, y, k, radius, accept):
+        """Returns the k closest accepted locations within radius as (distance, symbol, location) - closest first"""
+        cx, cy = self._cell(x, y)
+        # Rings beyond the furthest occupied cell can't hold anything
+        low_x, low_y, high_x, high_y = self.reach
+        last = max(cx - low_x, high_x - cx, cy - low_y, high_y - cy)
+        if radius is not None:
+            last = min(last, math.ceil(radius / self.cell) + 1)
+        best = []  # max heap on distance of the k best so far
+        for r in range(last + 1):
+            for key in self._ring(cx, cy, r):
+                for loc in self.cells.get(key, ()):
+                    if not accept(loc):
+                        continue
+                    distance = math.hypot(loc.x - x, loc.y - y)
+                    if radius is not None and distance > radius:
+                        continue
+                    entry = (-distance, _Reversed(loc.symbol), loc)
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    elif entry > best[0]:
+                        heapq.heapreplace(best, entry)
+            # Every location in a ring further out is at least r cells away
+            if len(best) == k and -best[0][0] <= r * self.cell:
+                break
+        return sorted(((-d, symbol.value, loc) for d, symbol, loc in best), key=lambda e: (e[0], e[1]))
+
+class _Reversed ():
+    """Orders symbols in reverse so the heap drops the later symbol of two locations the same distance away"""
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return self.value > other.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+class SpatialIndex ():
+    def __init__(self, locations, cell_size=None):
+        """A grid per system over the x & y of the locations for nearest, k nearest & within radius queries
+
+        Args:
+            locations (iterable): Location objects - anything with symbol, type, x & y
+            cell_size (float, optional): Width of a grid cell. Defaults to one sized for about one location per cell.
+        """
+        systems = {}
+        for loc in locations:
+            systems.setdefault(system_of(loc.symbol), []).append(loc)
+        self.grids = {system: _SystemGrid(locs, cell_size) for system, locs in systems.items()}
+        self.locations = {loc.symbol: loc for locs in systems.values() for loc in locs}
+
+    def __len__(self):
+        return len(self.locations)
+
+    def __repr__(self):
+        return f"<SpatialIndex Object> Locations: {len(self)}, Systems: {len(self.grids)}"
+
+    @staticmethod
+    def _filter(exclude, types, exclude_types):
+        exclude = {exclude} if isinstance(exclude, str) else set(exclude or ())
+        types = {types} if isinstance(types, str) else (set(types) if types is not None else None)
+        exclude_types = {exclude_types} if isinstance(exclude_types, str) else set(exclude_types or ())
+        return lambda loc: loc.symbol not in exclude and loc.type not in exclude_types and (types is None or loc.type in types)
+
+    def query(self, x, y, system, k=1, radius=None, exclude=None, types=None, exclude_types=None):
+        """Returns the closest locations in a system to a point
+
+        Args:
+            x (int): x coordinate of the point eg. Ship.x
+            y (int): y coordinate of the point eg. Ship.y
+            system (str): The system to search eg. OE
+            k (int, optional): The most locations to return. Defaults to 1.
+            radius (float, optional): Only return locations within this distance. Defaults to None.
+            exclude (str or iterable, optional): Symbols of locations to leave out eg. the ship's current location
+            types (str or iterable, optional): Only return locations of these types eg. PLANET
+            exclude_types (str or iterable, optional): Leave out locations of these types eg. WORMHOLE
+
+        Returns:
+            list: Tuples of (location, distance) closest first. Distances are rounded like Ship.calculate_distance
+        """
+        grid = self.grids.get(system)
+        if grid is None or k < 1:
+            return []
+        found = grid.search(x, y, k, radius, self._filter(exclude, types, exclude_types))
+        return [(loc, round(distance)) for distance, _, loc in found]
+
+    def nearest(self, x, y, system, **filters):
+        """Returns the closest location in a system to a point as a tuple of (location, distance). None if there isn't one
+
+        Takes the same filters as query
+        """
+        found = self.query(x, y, system, k=1, **filters)
+        return found[0] if found else None
+
+    def k_nearest(self, x, y, system, k, **filters):
+        """Returns the k closest locations in a system to a point as tuples of (location, distance). Takes the same filters as query"""
+        return self.query(x, y, system, k=k, **filters)
+
+    def within(self, x, y, system, radius, **filters):
+        """Returns every location in a system within radius of a point as tuples of (location, distance). Takes the same filters as query"""
+        return self.query(x, y, system, k=len(self.locations), radius=radius, **filters)
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_spatial_index(systems):
+    """Returns the process wide SpatialIndex of the locations in the systems given, building it the first time
+
+    Args:
+        systems (list): The systems as returned by game/systems (Game.systems)
+
+    Returns:
+        SpatialIndex: The shared index. Its locations are LocationModel objects
+    """
+    key = systems_key(systems)
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = _indexes[key] = SpatialIndex(LocationModel.from_json(loc) for system in systems for loc in system['locations'])
+    return index
+
+def find_location(symbol):
+    """Returns a location from any index get_spatial_index has already built. Never builds one - None if no index holds it
+
+    Args:
+        symbol (str): Symbol of the location eg. OE-PM
+
+    Returns:
+        LocationModel: The location or None
+    """
+    for index in list(_indexes.values()):
+        location = index.locations.get(symbol)
+        if location is not None:
+            return location
+    return None
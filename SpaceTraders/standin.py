@@ -0,0 +1,640 @@
+import os
+import re
+import json
+import math
+import time
+import uuid
+import random
+import logging
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qsl
+from .orders import MAX_ORDER_UNITS
+
+
+SYSTEMS_FILE = os.path.join(os.path.dirname(__file__), "constants", "systems.json")
+
+# Volume of one unit of each good and the price it trades around
+GOODS = {
+    "FUEL": (1, 3),
+    "METALS": (1, 8),
+    "CHEMICALS": (1, 20),
+    "FOOD": (1, 12),
+    "TEXTILES": (1, 14),
+    "DRUGS": (1, 30),
+    "CONSTRUCTION_MATERIALS": (1, 60),
+    "ELECTRONICS": (1, 90),
+    "RESEARCH": (1, 120),
+    "SHIP_PARTS": (4, 180),
+    "MACHINERY": (4, 250),
+    "SHIP_PLATING": (2, 300)
+}
+
+# The ships that can be bought, where and for how much
+SHIP_TYPES = [
+    {"type": "JW-MK-I", "class": "MK-I", "maxCargo": 50, "speed": 1, "manufacturer": "Jackshaw", "plating": 5, "weapons": 5, "price": 21125},
+    {"type": "GR-MK-I", "class": "MK-I", "maxCargo": 100, "speed": 1, "manufacturer": "Gravager", "plating": 10, "weapons": 5, "price": 42650},
+    {"type": "GR-MK-II", "class": "MK-II", "maxCargo": 500, "speed": 2, "manufacturer": "Gravager", "plating": 10, "weapons": 5, "price": 184000},
+    {"type": "GR-MK-III", "class": "MK-III", "maxCargo": 1000, "speed": 3, "manufacturer": "Gravager", "plating": 10, "weapons": 10, "price": 430000},
+    {"type": "HM-MK-III", "class": "MK-III", "maxCargo": 300, "speed": 4, "manufacturer": "Hermes", "plating": 20, "weapons": 5, "price": 380000}
+]
+
+LOAN_TYPES = [{"amount": 200000, "collateralRequired": False, "rate": 40, "termInDays": 2, "type": "STARTUP"}]
+
+# Extra fuel burnt leaving a planet's gravity, by class of ship - the server's own rule, like its flight times & prices
+PLANET_PENALTIES = {"MK-I": 2, "MK-II": 3, "MK-III": 4}
+# How long the stand-in's flights take - FLIGHT_FIXED_SECONDS + SECONDS_PER_DISTANCE * distance / speed. Like PRICE_IMPACT
+# it's the simulated world's own rule, apart from the client's FlightTimeModel defaults, so fitting a model to its flights is a real test
+FLIGHT_FIXED_SECONDS = 30
+SECONDS_PER_DISTANCE = 8
+# How far the stand-in's prices move as stock is bought and sold - a 10% fall in stock raises the price 10% * PRICE_IMPACT.
+# The simulated world's own rule, kept apart from the client's default so fitting a PriceImpactModel to its markets is a real test
+PRICE_IMPACT = 0.5
+
+STATUS = "spacetraders is currently online and available to play"
+
+class ApiError (Exception):
+    def __init__(self, status, code, message):
+        """An error returned to the client in the same shape as the live API"""
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+def fuel_required(distance, kind, from_type):
+    """The fuel a ship of the class given burns to fly the distance given - the same sum as Ship.calculate_fuel_usage"""
+    penalty = PLANET_PENALTIES.get(kind, 0) if from_type == "PLANET" else 0
+    return round((distance / 4) + 1 + penalty)
+
+def flight_seconds(distance, speed):
+    """Seconds a flight takes at normal game speed"""
+    return round(FLIGHT_FIXED_SECONDS + SECONDS_PER_DISTANCE * distance / speed)
+
+def generate_systems(systems=2, locations=10, seed=0):
+    """Generates a synthetic world of systems joined in a ring by wormholes
+
+    Args:
+        systems (int, optional): How many systems. Defaults to 2.
+        locations (int, optional): Locations per system, not counting the wormholes. Defaults to 10.
+        seed (int, optional): Seed of the generator so the same world is made every time. Defaults to 0.
+
+    Returns:
+        list: Systems in the same shape as game/systems
+    """
+    rand = random.Random(seed)
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    symbols = []
+    while len(symbols) < systems:
+        symbol = rand.choice(letters) + rand.choice(letters)
+        if symbol not in symbols:
+            symbols.append(symbol)
+    kinds = ["PLANET", "PLANET", "MOON", "ASTEROID", "GAS_GIANT", "NEBULA"]
+    result = []
+    for i, system in enumerate(symbols):
+        locs, used = [], set()
+        while len(locs) < locations:
+            name = "".join(rand.choice(letters) for _ in range(2))
+            if name in used:
+                continue
+            used.add(name)
+            locs.append({"symbol": f"{system}-{name}", "type": rand.choice(kinds), "name": name.title(),
+                         "x": rand.randint(-100, 100), "y": rand.randint(-100, 100), "allowsConstruction": False, "structures": []})
+        if systems > 1:
+            for other in {symbols[i - 1], symbols[(i + 1) % systems]} - {system}:
+                locs.append({"symbol": f"{system}-{other}-W", "type": "WORMHOLE", "name": f"Wormhole to {other}",
+                             "x": rand.randint(-100, 100), "y": rand.randint(-100, 100), "allowsConstruction": False, "structures": []})
+        result.append({"symbol": system, "name": system, "locations": locs})
+    return result
+
+def iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec='milliseconds').replace("+00:00", "Z")
+
+class SimulatedWorld ():
+    def __init__(self, systems=None, seed=0, time_scale=1.0, clock=time.time):
+        """The game state behind the stand-in server - markets, users, ships, flights & loans.
+        Every method is called with the world's lock held by the server so the state is always consistent.
+
+        Args:
+            systems (list, optional): Systems in the shape of game/systems. Defaults to the systems in constants/systems.json.
+            seed (int, optional): Seed for the markets so the same prices are made every time. Defaults to 0.
+            time_scale (float, optional): How many times faster than the live game flights run. Defaults to 1.0.
+            clock (callable, optional): Returns the current time in seconds. Defaults to time.time.
+        """
+        if systems is None:
+            with open(SYSTEMS_FILE) as infile:
+                systems = json.load(infile)
+        self.rand = random.Random(seed)
+        self.time_scale = time_scale
+        self.clock = clock
+        self.lock = threading.RLock()
+        self.systems = [{**s, "locations": [{k: v for k, v in loc.items() if k != 'ships'} for loc in s['locations']]} for s in systems]
+        self.locations = {loc['symbol']: loc for s in self.systems for loc in s['locations']}
+        self.markets = {symbol: self._make_market() for symbol, loc in self.locations.items() if loc['type'] != "WORMHOLE"}
+        self.users = {}
+        self.tokens = {}
+        self.ships = {}
+        self.flights = {}
+
+    def _make_market(self):
+        goods = ["FUEL"] + self.rand.sample([g for g in GOODS if g != "FUEL"], self.rand.randint(5, len(GOODS) - 1))
+        market = {}
+        for good in goods:
+            volume, price = GOODS[good]
+            stock = self.rand.randint(500, 20000)
+            market[good] = {"volume": volume, "base": price * self.rand.uniform(0.6, 1.4), "stock": stock, "reference": stock}
+        return market
+
+    # Markets
+    def _prices(self, entry):
+        price = max(1, round(entry['base'] * (1 + PRICE_IMPACT * (entry['reference'] - entry['stock']) / entry['reference'])))
+        spread = max(1, round(price * 0.05))
+        return price, spread
+
+    def marketplace(self, symbol):
+        """Returns the marketplace of a location in the shape of game/locations/{symbol}/marketplace"""
+        market = self.markets.get(symbol)
+        if market is None:
+            raise ApiError(404, 404, f"Location {symbol} has no marketplace")
+        listing = []
+        for good, entry in market.items():
+            price, spread = self._prices(entry)
+            listing.append({"symbol": good, "volumePerUnit": entry['volume'], "pricePerUnit": price, "spread": spread,
+                            "purchasePricePerUnit": price + spread, "sellPricePerUnit": max(1, price - spread),
+                            "quantityAvailable": entry['stock']})
+        return listing
+
+    # Users & ships
+    def add_user(self, username, token=None, credits=0, ships=None, loans=None):
+        """Adds a user to the world
+
+        Args:
+            username (str): Username of the user
+            token (str, optional): Their token. Defaults to a new random token.
+            credits (int, optional): Starting credits. Defaults to 0.
+            ships (list, optional): Ships in the shape of users/{username}/ships. Ships without a location are docked at the first location. Defaults to None.
+            loans (list, optional): Loans in the shape of users/{username}/loans. Defaults to None.
+
+        Returns:
+            str: The token of the user
+        """
+        token = token or str(uuid.uuid4())
+        self.users[username] = {"username": username, "credits": credits, "ships": [], "loans": list(loans or [])}
+        self.tokens[token] = username
+        for ship in ships or []:
+            ship = dict(ship)
+            if 'location' not in ship:
+                first = next(iter(self.markets))
+                ship.update(location=first, x=self.locations[first]['x'], y=self.locations[first]['y'])
+            self._add_ship(username, ship)
+        return token
+
+    def seed(self, path, token=None):
+        """Seeds a user from a file of recorded API responses like tests/api_return_expected.json
+
+        Args:
+            path (str): The JSON file. Its 'user' entry is added as a user
+            token (str, optional): Token to give the user. Defaults to a new random token.
+
+        Returns:
+            str: The token of the user
+        """
+        with open(path) as infile:
+            recorded = json.load(infile)
+        user = recorded['user']['user']
+        return self.add_user(user['username'], token, user['credits'], user['ships'], user.get('loans'))
+
+    def _add_ship(self, username, ship):
+        ship.setdefault('cargo', [])
+        ship.setdefault('id', "ck" + uuid.uuid4().hex[:23])
+        ship['spaceAvailable'] = ship['maxCargo'] - sum(c['totalVolume'] for c in ship['cargo'])
+        self.ships[ship['id']] = username
+        self.users[username]['ships'].append(ship)
+        return ship
+
+    def user(self, token, username=None):
+        """Returns the user a token belongs to. Raises an ApiError if the token is invalid or is for someone else"""
+        name = self.tokens.get(token)
+        if name is None or (username is not None and name != username):
+            raise ApiError(401, 40101, "Token was invalid or missing from the request. Did you confirm sending the token as a query parameter or authorization header?")
+        self._land(name)
+        return self.users[name]
+
+    def ship(self, user, shipId, docked=True):
+        ship = next((s for s in user['ships'] if s['id'] == shipId), None)
+        if ship is None:
+            raise ApiError(404, 404, f"Ship {shipId} not found")
+        if docked and 'location' not in ship:
+            raise ApiError(400, 3001, "Ship is currently in-transit. Wait until it arrives at its destination.")
+        return ship
+
+    def new_user(self, username):
+        if username in self.users:
+            raise ApiError(409, 40901, "Username has already been claimed.")
+        token = self.add_user(username)
+        return {"token": token, "user": self.users[username]}
+
+    # Cargo
+    def _cargo(self, ship, good):
+        return next((c for c in ship['cargo'] if c['good'] == good), None)
+
+    def _load(self, ship, good, quantity, volume):
+        item = self._cargo(ship, good)
+        if item is None:
+            item = {"good": good, "quantity": 0, "totalVolume": 0}
+            ship['cargo'].append(item)
+        item['quantity'] += quantity
+        item['totalVolume'] += quantity * volume
+        ship['spaceAvailable'] -= quantity * volume
+        if item['quantity'] == 0:
+            ship['cargo'].remove(item)
+
+    # Orders
+    def _order(self, user, params, selling):
+        quantity = self._units(params)
+        if quantity > MAX_ORDER_UNITS:
+            raise ApiError(422, 42201, f"The payload was invalid. Quantity must be between 1 and {MAX_ORDER_UNITS}.")
+        ship = self.ship(user, params.get('shipId'))
+        good = params.get('good')
+        entry = self.markets.get(ship['location'], {}).get(good)
+        if entry is None:
+            raise ApiError(400, 2001, f"The good {good} is not traded at {ship['location']}.")
+        price, spread = self._prices(entry)
+        if selling:
+            unit = max(1, price - spread)
+            self._unload(ship, good, quantity)
+            entry['stock'] += quantity
+            user['credits'] += unit * quantity
+        else:
+            unit = price + spread
+            if quantity > entry['stock']:
+                raise ApiError(400, 2005, "Quantity exceeds available quantity in the marketplace.")
+            if quantity * entry['volume'] > ship['spaceAvailable']:
+                raise ApiError(400, 2003, "Quantity exceeds available cargo space on ship.")
+            if unit * quantity > user['credits']:
+                raise ApiError(400, 2004, "User has insufficient credits for transaction.")
+            self._load(ship, good, quantity, entry['volume'])
+            entry['stock'] -= quantity
+            user['credits'] -= unit * quantity
+        return {"credits": user['credits'], "order": {"good": good, "quantity": quantity, "pricePerUnit": unit, "total": unit * quantity},
+                "ship": ship}
+
+    def purchase(self, user, params):
+        return self._order(user, params, selling=False)
+
+    def sell(self, user, params):
+        return self._order(user, params, selling=True)
+
+    def buy_ship(self, user, params):
+        spec = next((s for s in SHIP_TYPES if s['type'] == params.get('type')), None)
+        location = self.locations.get(params.get('location'))
+        if spec is None or location is None or location['type'] == "WORMHOLE":
+            raise ApiError(422, 42201, "The payload was invalid.")
+        if spec['price'] > user['credits']:
+            raise ApiError(400, 2004, "User has insufficient credits for transaction.")
+        user['credits'] -= spec['price']
+        ship = {k: v for k, v in spec.items() if k != 'price'}
+        ship.update(location=location['symbol'], x=location['x'], y=location['y'])
+        return {"credits": user['credits'], "ship": self._add_ship(user['username'], ship)}
+
+    def available_ships(self, kind=None):
+        locations = [loc for loc in self.locations.values() if loc['type'] != "WORMHOLE"]
+        ships = []
+        for spec in SHIP_TYPES:
+            if kind is not None and spec['class'] != kind:
+                continue
+            listing = {k: v for k, v in spec.items() if k != 'price'}
+            listing['purchaseLocations'] = [{"system": loc['symbol'][:2], "location": loc['symbol'], "price": spec['price']} for loc in locations[:3]]
+            ships.append(listing)
+        return ships
+
+    def _units(self, params):
+        try:
+            quantity = int(params.get('quantity'))
+        except (TypeError, ValueError):
+            raise ApiError(422, 42201, "The payload was invalid.")
+        if quantity <= 0:
+            raise ApiError(422, 42201, "The payload was invalid.")
+        return quantity
+
+    def _unload(self, ship, good, quantity):
+        item = self._cargo(ship, good)
+        if item is None or item['quantity'] < quantity:
+            raise ApiError(400, 2006, "Ship does not have the goods requested.")
+        volume = item['totalVolume'] // item['quantity']
+        self._load(ship, good, -quantity, volume)
+        return volume
+
+    def jettison(self, user, shipId, params):
+        ship = self.ship(user, shipId, docked=False)
+        quantity = self._units(params)
+        self._unload(ship, params.get('good'), quantity)
+        item = self._cargo(ship, params.get('good'))
+        return {"good": params.get('good'), "quantityRemaining": item['quantity'] if item else 0, "shipId": shipId}
+
+    def transfer(self, user, shipId, params):
+        ship = self.ship(user, shipId)
+        other = self.ship(user, params.get('toShipId'))
+        if ship['location'] != other['location']:
+            raise ApiError(400, 3005, "Ships must be at the same location to transfer cargo.")
+        quantity = self._units(params)
+        volume = GOODS.get(params.get('good'), (1, 0))[0]
+        if quantity * volume > other['spaceAvailable']:
+            raise ApiError(400, 2003, "Quantity exceeds available cargo space on ship.")
+        volume = self._unload(ship, params.get('good'), quantity)
+        self._load(other, params.get('good'), quantity, volume)
+        return {"fromShip": ship, "toShip": other}
+
+    def scrap(self, user, shipId):
+        ship = self.ship(user, shipId)
+        spec = next((s for s in SHIP_TYPES if s['type'] == ship['type']), {"price": 0})
+        user['ships'].remove(ship)
+        self.ships.pop(shipId, None)
+        user['credits'] += spec['price'] // 4
+        return {"success": f"Ship scrapped. You received {spec['price'] // 4} credits."}
+
+    # Flights
+    def fly(self, user, params):
+        ship = self.ship(user, params.get('shipId'))
+        destination = self.locations.get(params.get('destination'))
+        if destination is None:
+            raise ApiError(404, 404, f"Location {params.get('destination')} not found")
+        departure = self.locations[ship['location']]
+        if departure['symbol'] == destination['symbol']:
+            raise ApiError(400, 3002, "Ship is already at the destination.")
+        if departure['symbol'][:2] != destination['symbol'][:2]:
+            raise ApiError(400, 3003, "Destination is in a different system. Travel through a wormhole.")
+        distance = round(math.hypot(destination['x'] - departure['x'], destination['y'] - departure['y']))
+        fuel = fuel_required(distance, ship['class'], departure['type'])
+        tank = self._cargo(ship, "FUEL")
+        if tank is None or tank['quantity'] < fuel:
+            raise ApiError(400, 3004, f"Ship has insufficient fuel for flight. {fuel} FUEL is required.")
+        self._load(ship, "FUEL", -fuel, GOODS["FUEL"][0])
+        remaining = tank['quantity'] if tank in ship['cargo'] else 0
+        duration = flight_seconds(distance, ship['speed']) / self.time_scale
+        now = self.clock()
+        flight = {"id": "ck" + uuid.uuid4().hex[:23], "shipId": ship['id'], "createdAt": iso(now), "arrivesAt": iso(now + duration),
+                  "destination": destination['symbol'], "departure": departure['symbol'], "distance": distance, "fuelConsumed": fuel,
+                  "fuelRemaining": remaining, "terminatedAt": None,
+                  "timeRemainingInSeconds": math.ceil(duration)}
+        self.flights[flight['id']] = {"plan": flight, "arrives": now + duration, "username": user['username'], "shipType": ship['type']}
+        for key in ('location', 'x', 'y'):
+            ship.pop(key)
+        return {"flightPlan": flight}
+
+    def flight(self, user, flightId):
+        flight = self.flights.get(flightId)
+        if flight is None or flight['username'] != user['username']:
+            raise ApiError(404, 404, f"Flight plan {flightId} not found")
+        plan = dict(flight['plan'])
+        plan['timeRemainingInSeconds'] = max(0, math.ceil(flight['arrives'] - self.clock()))
+        return {"flightPlan": plan}
+
+    def active_flights(self, system):
+        now = self.clock()
+        return {"flightPlans": [{**{k: f['plan'][k] for k in ('id', 'shipId', 'createdAt', 'arrivesAt', 'destination', 'departure')},
+                                 "username": f['username'], "shipType": f['shipType']}
+                                for f in self.flights.values() if f['arrives'] > now and f['plan']['departure'][:2] == system]}
+
+    def _land(self, username):
+        # Ships are moved to their destination when their owner next looks at them
+        now = self.clock()
+        for flight in self.flights.values():
+            if flight['username'] != username or flight['arrives'] > now or flight['plan']['terminatedAt']:
+                continue
+            flight['plan']['terminatedAt'] = iso(flight['arrives'])
+            ship = self.ship(self.users[username], flight['plan']['shipId'], docked=False)
+            destination = self.locations[flight['plan']['destination']]
+            ship.update(location=destination['symbol'], x=destination['x'], y=destination['y'])
+
+    # Loans
+    def take_loan(self, user, params):
+        loan_type = next((l for l in LOAN_TYPES if l['type'] == params.get('type')), None)
+        if loan_type is None:
+            raise ApiError(422, 42201, "The payload was invalid.")
+        if any(l['status'] == "CURRENT" for l in user['loans']):
+            raise ApiError(400, 40001, "User already has an outstanding loan.")
+        due = self.clock() + loan_type['termInDays'] * 24 * 60 * 60
+        loan = {"due": iso(due), "id": "ck" + uuid.uuid4().hex[:23], "repaymentAmount": round(loan_type['amount'] * (1 + loan_type['rate'] / 100)),
+                "status": "CURRENT", "type": loan_type['type']}
+        user['loans'].append(loan)
+        user['credits'] += loan_type['amount']
+        return {"credits": user['credits'], "loan": loan}
+
+    def pay_loan(self, user, loanId):
+        loan = next((l for l in user['loans'] if l['id'] == loanId), None)
+        if loan is None:
+            raise ApiError(404, 404, f"Loan {loanId} not found")
+        if loan['repaymentAmount'] > user['credits']:
+            raise ApiError(400, 2004, "User has insufficient credits for transaction.")
+        user['credits'] -= loan['repaymentAmount']
+        loan['status'] = "PAID"
+        return {"credits": user['credits'], "loans": user['loans']}
+
+    def location(self, symbol):
+        location = self.locations.get(symbol)
+        if location is None:
+            raise ApiError(404, 404, f"Location {symbol} not found")
+        return location
+
+    def ships_at(self, symbol):
+        return [{"shipId": s['id'], "username": u['username'], "shipType": s['type']}
+                for u in self.users.values() for s in u['ships'] if s.get('location') == symbol]
+
+    def route(self, method, path, params, token):
+        """Serves a request
+
+        Args:
+            method (str): HTTP method of the request
+            path (str): Path of the request without the leading /
+            params (dict): Query string params of the request
+            token (str): Token from the Authorization header or token param
+
+        Returns:
+            tuple: HTTP status & JSON body
+        """
+        for route_method, pattern, handler in ROUTES:
+            match = pattern.fullmatch(path)
+            if match and route_method == method:
+                with self.lock:
+                    return handler(self, token, params, *match.groups())
+        raise ApiError(404, 404, f"{method} {path} is not served by the stand-in server")
+
+def _authed(fn):
+    def handler(world, token, params, username=None, *args):
+        return fn(world, world.user(token, username), params, *args)
+    return handler
+
+ROUTES = [(method, re.compile(pattern), handler) for method, pattern, handler in [
+    ("GET", r"game/status", lambda w, t, p: (200, {"status": STATUS})),
+    ("GET", r"game/systems", lambda w, t, p: (200, {"systems": w.systems})),
+    ("GET", r"game/systems/([^/]+)/locations", lambda w, t, p, s: (200, {"locations": [l for l in w.locations.values() if l['symbol'][:2] == s]})),
+    ("GET", r"game/systems/([^/]+)/flight-plans", lambda w, t, p, s: (200, w.active_flights(s))),
+    ("GET", r"game/locations/([^/]+)", lambda w, t, p, s: (200, {"location": w.location(s)})),
+    ("GET", r"game/locations/([^/]+)/marketplace", lambda w, t, p, s: (200, {"location": {**w.location(s), "marketplace": w.marketplace(s)}})),
+    ("GET", r"game/locations/([^/]+)/ships", lambda w, t, p, s: (200, {"location": {**w.location(s), "ships": w.ships_at(s)}})),
+    ("GET", r"game/ships", lambda w, t, p: (200, {"ships": w.available_ships(p.get('class'))})),
+    ("GET", r"game/loans", lambda w, t, p: (200, {"loans": LOAN_TYPES})),
+    ("POST", r"users/([^/]+)/token", lambda w, t, p, u: (201, w.new_user(u))),
+    ("GET", r"users/([^/]+)", _authed(lambda w, u, p: (200, {"user": u}))),
+    ("GET", r"users/([^/]+)/ships", _authed(lambda w, u, p: (200, {"ships": u['ships']}))),
+    ("POST", r"users/([^/]+)/ships", _authed(lambda w, u, p: (201, w.buy_ship(u, p)))),
+    ("GET", r"users/([^/]+)/ships/([^/]+)", _authed(lambda w, u, p, s: (200, {"ship": w.ship(u, s, docked=False)}))),
+    ("DELETE", r"users/([^/]+)/ships/([^/]+)", _authed(lambda w, u, p, s: (200, w.scrap(u, s)))),
+    ("PUT", r"users/([^/]+)/ships/([^/]+)/jettison", _authed(lambda w, u, p, s: (200, w.jettison(u, s, p)))),
+    ("PUT", r"users/([^/]+)/ships/([^/]+)/transfer", _authed(lambda w, u, p, s: (200, w.transfer(u, s, p)))),
+    ("POST", r"users/([^/]+)/purchase-orders", _authed(lambda w, u, p: (201, w.purchase(u, p)))),
+    ("POST", r"users/([^/]+)/sell-orders", _authed(lambda w, u, p: (201, w.sell(u, p)))),
+    ("POST", r"users/([^/]+)/flight-plans", _authed(lambda w, u, p: (201, w.fly(u, p)))),
+    ("GET", r"users/([^/]+)/flight-plans/([^/]+)", _authed(lambda w, u, p, f: (200, w.flight(u, f)))),
+    ("GET", r"users/([^/]+)/loans", _authed(lambda w, u, p: (200, {"loans": u['loans']}))),
+    ("POST", r"users/([^/]+)/loans", _authed(lambda w, u, p: (201, w.take_loan(u, p)))),
+    ("PUT", r"users/([^/]+)/loans/([^/]+)", _authed(lambda w, u, p, l: (200, w.pay_loan(u, l)))),
+]]
+
+class Throttle ():
+    def __init__(self, rate=2, burst=2, clock=time.monotonic):
+        """The per token limit of the live API. Requests over the limit are rejected with error 42901"""
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.rejected = 0
+
+    def check(self, token):
+        """Takes a token from the caller's bucket
+
+        Returns:
+            float: 0 if the request is allowed, otherwise the seconds until it would be
+        """
+        with self.lock:
+            now = self.clock()
+            tokens, updated = self.buckets.get(token, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                self.buckets[token] = (tokens - 1, now)
+                return 0
+            self.buckets[token] = (tokens, now)
+            self.rejected += 1
+            return (1 - tokens) / self.rate
+
+class _Handler (BaseHTTPRequestHandler):
+    server_version = "SpaceTradersStandIn/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logging.debug("Stand-in server: " + format % args)
+
+    def _reply(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _serve(self):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = self.rfile.read(length)
+            try:
+                params.update(json.loads(body))
+            except ValueError:
+                params.update(parse_qsl(body.decode()))
+        auth = self.headers.get("Authorization", "")
+        token = auth[len("Bearer "):] if auth.startswith("Bearer ") else params.pop('token', None)
+        server = self.server.standin
+        server.requests += 1
+        if server.throttle is not None:
+            wait = server.throttle.check(token or self.client_address[0])
+            if wait > 0:
+                return self._reply(429, {"error": {"code": 42901, "message": "Throttle limit reached. Please try again."}},
+                                   {"Retry-After": f"{wait:.3f}"})
+        try:
+            status, body = server.world.route(self.command, url.path.strip("/"), params, token)
+        except ApiError as e:
+            status, body = e.status, {"error": {"code": e.code, "message": e.message}}
+        self._reply(status, body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _serve
+
+class StandInServer ():
+    def __init__(self, world=None, host="127.0.0.1", port=0, rate=2, burst=2, throttle=True):
+        """A local stand-in for the Space Traders API so fleets can be run and benchmarked offline.
+        Point a Transport, Api or AsyncApi at 'url' to use it.
+
+        Usage:
+            with StandInServer(SimulatedWorld(time_scale=60)) as server:
+                token = server.world.add_user("JimHawkins", credits=100000)
+                api = Api("JimHawkins", token, base_url=server.url)
+
+        Args:
+            world (SimulatedWorld, optional): The game state to serve. Defaults to a new world of the real systems.
+            host (str, optional): Address to listen on. Defaults to "127.0.0.1".
+            port (int, optional): Port to listen on. Defaults to 0 (any free port).
+            rate (float, optional): Requests per second allowed per token before 42901 is returned. Defaults to 2.
+            burst (int, optional): Requests that can be sent back to back per token. Defaults to 2.
+            throttle (bool, optional): Whether to enforce the rate limit at all. Defaults to True.
+        """
+        self.world = world if world is not None else SimulatedWorld()
+        self.throttle = Throttle(rate, burst) if throttle else None
+        self.requests = 0
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.standin = self
+        self.thread = None
+
+    @property
+    def url(self):
+        """The base URL to give a Transport"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        """Starts serving in a background thread"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stops serving and closes the socket"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs a local stand-in for the Space Traders API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--time-scale", type=float, default=1.0, help="How many times faster than the live game flights run")
+    parser.add_argument("--rate", type=float, default=2, help="Requests per second allowed per token")
+    parser.add_argument("--no-throttle", action="store_true", help="Never return 42901")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="SYSTEMS", help="Generate a world with this many systems instead of the real one")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--user", help="Seed a user from a file of recorded responses eg. tests/api_return_expected.json")
+    parser.add_argument("--token", help="Token to give the seeded user")
+    args = parser.parse_args()
+    systems = generate_systems(args.synthetic, seed=args.seed) if args.synthetic else None
+    world = SimulatedWorld(systems, seed=args.seed, time_scale=args.time_scale)
+    if args.user:
+        print(f"Seeded user with token: {world.seed(args.user, args.token)}")
+    server = StandInServer(world, args.host, args.port, rate=args.rate, throttle=not args.no_throttle)
+    print(f"Serving the stand-in Space Traders API at {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
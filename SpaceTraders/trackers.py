@@ -1,11 +1,10 @@
 # Use DBeaver to view db
 
-import pandas as pd
 import datetime
 import logging
 import time
 from SpaceTraders import core, db_handler
-from rich.progress import track
+from SpaceTraders.scheduler import priority, BACKGROUND
 
 logging.basicConfig(format='%(asctime)s - %(levelname)s - %(message)s', level=logging.INFO)
 
@@ -25,26 +24,29 @@ def write_marketplace_to_db(marketplace, location):
   # --- Load to DB ---
   db_handler.write_marketplace_to_db(marketplace)
 
-def get_trackers(ships):
-    tracker_ships = lambda x: x.manufacturer == "Jackshaw"
-    trackers=filter(tracker_ships, ships)
-    return trackers
+def get_trackers(fleet, fields=("id", "location")):
+    # Read from the fleet's cached snapshot - only the trackers & only the fields asked for
+    return fleet.snapshot(fields, filter_by=[("manufacturer", "Jackshaw")])
 
 def track_markets(repeat):
-  get_marketplace = lambda x: pd.DataFrame(core.Game().location(x).marketplace())
-  user = core.get_user("JimHawkins")
-  trackers = get_trackers(user.get_ships())
-  tracker_locations = [tracker.location for tracker in trackers]
-  for x in range(repeat):
-    for loc in tracker_locations:
-      print("Adding Market Records for: " + loc)
-      write_marketplace_to_db(get_marketplace(loc), loc)
-      logging.info("Premptive pause for throttle")
-      for n in track(range(5), description="Pausing..."):
+  # Imported on first use so importing the trackers doesn't pay for pandas or rich
+  import pandas as pd
+  from rich.progress import track
+  # Tracker polls give way to orders & flights in the shared rate budget
+  with priority(BACKGROUND):
+    get_marketplace = lambda x: pd.DataFrame(core.Game().location(x).marketplace())
+    user = core.get_user("JimHawkins")
+    tracker_locations = get_trackers(user.ships, fields=["location"])['location'].tolist()
+    for x in range(repeat):
+      for loc in tracker_locations:
+        print("Adding Market Records for: " + loc)
+        write_marketplace_to_db(get_marketplace(loc), loc)
+        logging.info("Premptive pause for throttle")
+        for n in track(range(5), description="Pausing..."):
+          time.sleep(1)
+      logging.info("Sleeping")
+      for n in track(range(60), description="Sleeping..."):
         time.sleep(1)
-    logging.info("Sleeping")
-    for n in track(range(60), description="Sleeping..."):
-      time.sleep(1)
     
 
 if __name__ == "__main__":
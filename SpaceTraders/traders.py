@@ -2,16 +2,140 @@ from SpaceTraders import core, trackers, db_handler
 import time
 import datetime
 import math
-import pandas as pd
 import logging
+import threading
 from .config.secrets import get_token
+from .markets import MAX_AGE as MARKET_MAX_AGE
+from .arbitrage import ArbitrageEngine
+from .assignment import FleetPlanner
+from .flights import FlightTimeModel
+from .impact import PriceImpactModel
 
 URL = "https://api.spacetraders.io/"
-TOKEN = get_token()
-GAME = core.Game(TOKEN)
 username = "JimHawkins"
 
-user = core.get_user(TOKEN, username)
+class TradingContext ():
+  def __init__(self, username, token=None, systems=None):
+    """Holds the token, game & user a trader works with. Each is only made the first time it's used
+    so importing the traders costs no calls to the API.
+
+    Args:
+        username (str): Username of the user trading
+        token (str, optional): The user's token. Defaults to the token in config.secrets.
+        systems (list, optional): The systems of the game eg. constants/systems.json. Defaults to fetching them through the cache.
+    """
+    self.username = username
+    self.systems = systems
+    self._token = token
+    self._game = None
+    self._user = None
+    self._flight_time = None
+    self._price_impact = None
+    # Worker threads can all reach for the game or user at once - only one of them makes it
+    self.lock = threading.Lock()
+    # Ships trading in worker threads, the trades planned for them & the trades they're carrying out
+    self.traders = set()
+    self.pending = {}
+    self.active = {}
+    self.plan_lock = threading.Lock()
+
+  @property
+  def token(self):
+    if self._token is None:
+      self._token = get_token()
+    return self._token
+
+  @property
+  def game(self):
+    if self._game is None:
+      with self.lock:
+        if self._game is None:
+          self._game = core.Game(self.token, self.systems)
+    return self._game
+
+  @property
+  def user(self):
+    if self._user is None:
+      with self.lock:
+        if self._user is None:
+          self._user = core.get_user(self.token, self.username)
+    return self._user
+
+  @property
+  def flight_time(self):
+    '''
+    How long flights tie ships up for - fitted to the flights in the database the first time it's used
+    '''
+    if self._flight_time is None:
+      with self.lock:
+        if self._flight_time is None:
+          try:
+            self._flight_time = FlightTimeModel.from_history()
+          except Exception:
+            logging.warning("Couldn't read the flight history - using the default flight times")
+            self._flight_time = FlightTimeModel()
+    return self._flight_time
+
+  @property
+  def price_impact(self):
+    '''
+    How prices move as goods are bought & sold - fitted to the market readings in the database the first time it's used
+    '''
+    if self._price_impact is None:
+      with self.lock:
+        if self._price_impact is None:
+          try:
+            self._price_impact = PriceImpactModel.from_history()
+          except Exception:
+            logging.warning("Couldn't read the market history - using the default price impact")
+            self._price_impact = PriceImpactModel()
+    return self._price_impact
+
+  def market(self):
+    '''
+    Returns a Market using the flight times & price impact fitted to this trader's history
+    '''
+    return core.Market(self.game, self.flight_time, self.price_impact)
+
+  def assignment(self, ship):
+    '''
+    Returns the trade planned for the ship or None if it has no profitable trade. A ship without a plan has every trading ship
+    without one planned with it in one go, around the trades the other ships have already been given, so ships don't collide
+    in the same markets.
+
+    :param ship : Ship - a trading ship docked at a market
+    :return JSON : the trade in the shape of Market.what_should_I_buy
+    '''
+    with self.plan_lock:
+      # A ship asking for another trade has finished its last one
+      self.active.pop(ship.id, None)
+      trade = self.pending.pop(ship.id, None)
+      if trade is None or trade['from'] != ship.location:
+        # The ship buys at its own market so that one's always fetched - the rest come from the market store
+        self.game.locations[ship.location].marketplace()
+        ships = [s for s in (self.user.get_ship(i) for i in self.traders | {ship.id}) if s is not None and s.id not in self.active and s.id not in self.pending]
+        reserved = list(self.active.values()) + list(self.pending.values())
+        planned = plan_fleet(self, ships, reserved, self.user.credits - sum(t['total_cost'] for t in self.pending.values()))
+        trade = planned.pop(ship.id, None)
+        self.pending.update({i: t for i, t in planned.items() if t is not None})
+      if trade is not None:
+        self.active[ship.id] = trade
+      return trade
+
+  def __repr__(self):
+    return f"<TradingContext Object> Username: {self.username}, Game Loaded: {self._game is not None}, User Loaded: {self._user is not None}"
+
+CONTEXT = TradingContext(username)
+
+# TOKEN, GAME & user used to be made on import - they're still readable here but only made when first read
+def __getattr__(name):
+  if name == "TOKEN":
+    return CONTEXT.token
+  if name == "GAME":
+    return CONTEXT.game
+  if name == "user":
+    return CONTEXT.user
+  raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Colours
 R  = '\033[31m' # red
@@ -21,50 +145,67 @@ W  = '\033[0m'  # white (normal)
 def trading_run(ship, destination):
     print(R+"Making a trading run with {}. Flying to {}".format(ship.id, destination)+W)
     # Fill up
-    if ship.get_fuel_level() < 20:
+    fuel = ship.get_fuel_level()
+    if fuel < 20:
       print(G+"Filling up Fuel"+W)
-      user.new_order(ship.id, "FUEL", 20 - ship.get_fuel_level())
-      ship = user.get_ship(ship.id)
+      CONTEXT.user.new_order(ship.id, "FUEL", 20 - fuel)
+      ship = CONTEXT.user.get_ship(ship.id)
     
     # Buy Best Good
-    what_to_buy = core.Market(GAME).what_should_I_buy(ship, destination)
+    what_to_buy = CONTEXT.market().what_should_I_buy(ship, destination)
     print(G+"Buying {} units of {} for {} with an expected profit of {}".\
       format(what_to_buy['units'], what_to_buy['symbol'], what_to_buy['total_cost'], what_to_buy['expected_profit'])+W)
-    user.new_order(ship.id, what_to_buy['symbol'], what_to_buy['units'])
-    ship = user.get_ship(ship.id)
+    CONTEXT.user.new_order(ship.id, what_to_buy['symbol'], what_to_buy['units'])
+    ship = CONTEXT.user.get_ship(ship.id)
     
     # Fly to destination
-    user.fly(ship.id, destination, track=False)
-    ship = user.get_ship(ship.id)
+    CONTEXT.user.fly(ship.id, destination, track=False, game=CONTEXT.game)
+    ship = CONTEXT.user.get_ship(ship.id)
 
     # Sell goods
-    order = user.sell_order(ship.id, what_to_buy['symbol'], what_to_buy['units'])
+    order = CONTEXT.user.sell_order(ship.id, what_to_buy['symbol'], what_to_buy['units'])
     print(G+"Sold {} units of {} at {} with a profit of {}".\
       format(what_to_buy['units'], what_to_buy['symbol'], order['order']['total'], order['order']['total']-what_to_buy['total_cost'])+W)
-    ship = user.get_ship(ship.id)
+    ship = CONTEXT.user.get_ship(ship.id)
     
     # Return the profit of the run
     return order['order']['total'] - what_to_buy['total_cost']
 
 def find_optimum_trade_route(ship):
     # Get tracked markets and remove the current market
-    all_tracker_locs = [ship.location for ship in user.get_ships(filter_by=[('manufacturer', 'Jackshaw')])]
+    all_tracker_locs = trackers.get_trackers(CONTEXT.user.ships, fields=['location'])['location'].tolist()
     # remove current market of ship
     all_tracker_locs.remove(ship.location)
 
-    # Get marketplace of ships current location - lessons calls to API
-    ship_marketplace = GAME.locations[ship.location].marketplace()
-
     # Work out the best trade
-    potential_trades = [core.Market(GAME).what_should_I_buy(ship, loc, ship_marketplace) for loc in all_tracker_locs]
-    # Pair up loc with best trade
-    pt_loc = list(zip(all_tracker_locs, potential_trades))
-    # Return trade with Max expected profit
-    return max(pt_loc, key=lambda d: d[1]['expected_profit']) 
+    potential_trades = find_trades(ship, all_tracker_locs)
+    # Return trade with Max expected profit paired with its loc
+    best_trade = max(potential_trades, key=lambda d: d['expected_profit'])
+    return best_trade['to'], best_trade
+
+def find_trades(ship, locations, max_age=MARKET_MAX_AGE):
+    # The ship's own market is where it buys so it's always fetched. Destinations are read from the market store
+    # when seen in the last max_age seconds, then every destination is compared in one go
+    markets = {ship.location: CONTEXT.game.locations[ship.location].marketplace()}
+    markets.update({loc: CONTEXT.game.locations[loc].marketplace(max_age) for loc in locations})
+    return CONTEXT.market().what_should_I_buy_everywhere(ship, markets)
+
+def plan_fleet(context, ships, reserved=(), credits=None, max_age=MARKET_MAX_AGE):
+    # Every tracked market & where the ships are - read from the market store when seen in the last max_age seconds
+    locations = set(trackers.get_trackers(context.user.ships, fields=['location'])['location'].tolist())
+    locations |= {ship.location for ship in ships}
+    # Trackers in transit aren't at a market & wormholes have none
+    locations = [loc for loc in sorted(locations) if loc in context.game.locations and context.game.locations[loc].type != "WORMHOLE"]
+    markets = {loc: context.game.locations[loc].marketplace(max_age) for loc in locations}
+    # Ranked by profit per second of the ship's time so a far trade only wins when it pays for the flight
+    planner = FleetPlanner(ArbitrageEngine(markets), context.game.world, flight_time=context.flight_time, price_impact=context.price_impact)
+    for trade in reserved:
+      planner.reserve(trade)
+    return planner.assign(ships, credits)
 
 def find_optimum_trade_routes(ship):
     # Get tracked markets and remove the current market
-    all_tracker_locs = [ship.location for ship in user.get_ships(filter_by=[('manufacturer', 'Jackshaw')])]
+    all_tracker_locs = trackers.get_trackers(CONTEXT.user.ships, fields=['location'])['location'].tolist()
     # remove current market of ship & the warp locations as they have no markets
     all_tracker_locs.remove(ship.location)
     if 'XV-OE-2-91' in all_tracker_locs:
@@ -72,54 +213,41 @@ def find_optimum_trade_routes(ship):
     if 'OE-XV-91-2' in all_tracker_locs:
       all_tracker_locs.remove('OE-XV-91-2')
 
-    # Get marketplace of ships current location - lessons calls to API
-    ship_marketplace = GAME.locations[ship.location].marketplace()
-
     # Work out the best trades
-    return [core.Market(GAME).what_should_I_buy(ship, loc, ship_marketplace) for loc in all_tracker_locs]
+    return find_trades(ship, all_tracker_locs)
+
+def relocation(ship):
+  # Flight to the closest location with a market - wormholes have none. None if there's nowhere to go
+  closet_location = ship.get_closest_location(CONTEXT.game, exclude_types="WORMHOLE")
+  if closet_location is None:
+    return None
+  return {"to": closet_location[0].symbol, "fuel_required": ship.calculate_fuel_usage(CONTEXT.game.locations[ship.location], distance=closet_location[1])}
 
 def any_dest_trading_run(ship):
+  # Imported on first use so importing the traders doesn't pay for pandas
+  import pandas as pd
   print(ship.location)
   # First sell any existing cargo
-  if len(ship.cargo) > 0:
-    if any(x['good'] != "FUEL" for x in ship.cargo):
-      print(f"{R}Goods still left on ship that require selling{W}")
-      cargo_to_sell = next(good for good in ship.cargo if good['good'] != "FUEL")
-      if cargo_to_sell['quantity'] > 300:
-        # Rounding up - how many order to make
-        count = math.ceil(cargo_to_sell['quantity'] / 300)
-        temp_units = cargo_to_sell['quantity']
-        # Do buy order as many times as requried
-        for i in range(count):
-            if temp_units / 300 > 1:
-                sell_order = user.sell_order(ship.id, cargo_to_sell['good'], 300)
-                temp_units = temp_units - 300
-            else:
-                sell_order = user.sell_order(ship.id, cargo_to_sell['good'], temp_units)
-      else:
-        sell_order = user.sell_order(ship.id, cargo_to_sell['good'], cargo_to_sell['quantity'])
-      print(f"{G}Sold {cargo_to_sell['quantity']} units of {cargo_to_sell['good']} for {sell_order['order']['total']}{W}")
-      ship.update_cargo(sell_order['ship']['cargo'], sell_order['ship']['spaceAvailable'])
+  goods_left = ship.get_cargo_to_sell()
+  if goods_left:
+    print(f"{R}Goods still left on ship that require selling{W}")
+    cargo_to_sell = goods_left[0]
+    sell_order = CONTEXT.user.bulk_sell(ship.id, cargo_to_sell['good'], cargo_to_sell['quantity'])
+    print(f"{G}Sold {cargo_to_sell['quantity']} units of {cargo_to_sell['good']} for {sell_order['order']['total']}{W}")
 
   did_buy_goods = False
-  # Get the optimum trade routes - USES 9 API Calls
-  trade_routes = find_optimum_trade_routes(ship)
-  # Drop non-profitable trades
-  trade_routes_profit = list(filter(lambda x: x['profit'] > 0, trade_routes))
+  # The trade planned for this ship with the rest of the fleet - one planning call covers every waiting ship
+  trade = CONTEXT.assignment(ship)
   
   # Handle not profitable trades
-  if len(trade_routes_profit) == 0:
+  if trade is None:
     print("No Profitable Trades")
-    # Calculate distance to closest location
-    closet_location = ship.get_closest_location()
-    flight_path = {"to": closet_location[0].symbol, "fuel_required": ship.calculate_fuel_usage(GAME.locations[ship.location], distance=closet_location[1])}
+    flight_path = relocation(ship)
   else:
-    flight_path = max(trade_routes_profit, key=lambda tr: tr['expected_profit'])
-    if flight_path['total_cost'] > user.credits:
+    flight_path = trade
+    if flight_path['total_cost'] > CONTEXT.user.credits:
       print("Not enough money to do trade")
-      # Calculate distance to closest location
-      closet_location = ship.get_closest_location()
-      flight_path = {"to": closet_location[0].symbol, "fuel_required": ship.calculate_fuel_usage(GAME.locations[ship.location], distance=closet_location[1])}
+      flight_path = relocation(ship)
     else: 
       # Buy Good
       print(G+"Buying {} units of {} for {} with an expected profit of {}".\
@@ -128,20 +256,8 @@ def any_dest_trading_run(ship):
                 flight_path['total_cost'], 
                 flight_path['expected_profit'])+W)
       
-      # Handle cases where Grav III is buying more than 300 units - throws a server error otherwise
-      if flight_path['units'] > 300:
-        # Rounding up - how many order to make
-        count = math.ceil(flight_path['units'] / 300)
-        temp_units = flight_path['units']
-        # Do buy order as many times as requried
-        for i in range(count):
-            if temp_units / 300 > 1:
-                buy_order = user.new_order(ship.id, flight_path['symbol'], 300)
-                temp_units = temp_units - 300
-            else:
-                buy_order = user.new_order(ship.id, flight_path['symbol'], temp_units)
-      else:
-        buy_order = user.new_order(ship.id, flight_path['symbol'], flight_path['units'])
+      # Grav III's can hold more than the 300 units allowed per order - bulk_buy splits it up
+      buy_order = CONTEXT.user.bulk_buy(ship.id, flight_path['symbol'], flight_path['units'])
 
       # Collate Data to Upload to Datebase
       data = [[datetime.datetime.now(), ship.location, flight_path['symbol'],
@@ -151,52 +267,40 @@ def any_dest_trading_run(ship):
       columns = ['time', 'location', 'symbol', 'units', 'cost', 'total_cost', 'profit',
                 'profit_per_volume', 'expected_profit', 'sell_location']
       db_handler.write_buy_order_to_db(pd.DataFrame(data, columns=columns))
-      # Update Ship
-      ship.update_cargo(buy_order['ship']['cargo'], buy_order['ship']['spaceAvailable'])
       did_buy_goods = True
   
+  # Nowhere with a market to move on to
+  if flight_path is None:
+    print(f"{R}No location to relocate {ship.id} to from {ship.location}{W}")
+    return 0
+
   # Buy Fuel
   # Check if fuel order is required
-  if flight_path['fuel_required'] - ship.get_fuel_level() > 0:
-    fuel_order = user.new_order(ship.id, "FUEL", flight_path['fuel_required'] - ship.get_fuel_level())
-    # Update Ship
-    ship.update_cargo(fuel_order['ship']['cargo'], fuel_order['ship']['spaceAvailable'])
+  fuel_short = flight_path['fuel_required'] - ship.get_fuel_level()
+  if fuel_short > 0:
+    CONTEXT.user.new_order(ship.id, "FUEL", fuel_short)
 
-  # Fly
-  flight = user.fly(ship.id, flight_path['to'], track=False)
+  # Fly - the ship has landed once fly returns so note what it's carrying first
+  departure, totalVolume = ship.location, ship.cargo_volume()
+  flight = CONTEXT.user.fly(ship.id, flight_path['to'], track=False, game=CONTEXT.game)
   # Collate Data to Upload to Datebase
-  to = GAME.locations[flight_path['to']]
+  to = CONTEXT.game.locations[flight_path['to']]
   flightReason = "Trade" if did_buy_goods else "Relocating"
   try:
-    data = [[datetime.datetime.now(), ship.location, flight_path['to'],
+    data = [[datetime.datetime.now(), departure, flight_path['to'],
           flight['distance'], flight_path['fuel_required'], flight['fuelConsumed'], 
           flight['timeRemainingInSeconds'], ship.manufacturer, ship.type, ship.speed, 
-          ship.maxCargo - ship.spaceAvailable, ship.plating, ship.weapons, flightReason]]
+          totalVolume, ship.plating, ship.weapons, flightReason]]
   except Exception:
     logging.exception(f"Something went wrong flight: {str(flight)}, to: {to}, flight_path: {str(flight_path)}, ship: {ship}")
   columns = ['time', 'from_loc', 'to_loc', 'distance', 'estimated_fuel_required', 'actual_fuel_required',
               'time_taken', 'ship_manufactorer', 'ship_type', 'speed', 'totalVolume', 'plating', 'weapons', 
               'flight_reason']
   db_handler.write_flight_path_to_db(pd.DataFrame(data, columns=columns))
-  # Update Ship
-  ship.update_location(GAME.location(flight_path['to']).x, GAME.location(flight_path['to']).y, flight_path['to'])
 
   if did_buy_goods:
-    # Sell Order
-    # Handle cases where Grav III is buying more than 300 units - throws a server error otherwise
-    if flight_path['units'] > 300:
-      # Rounding up - how many order to make
-      count = math.ceil(flight_path['units'] / 300)
-      temp_units = flight_path['units']
-      # Do buy order as many times as requried
-      for i in range(count):
-          if temp_units / 300 > 1:
-              sell_order = user.sell_order(ship.id, flight_path['symbol'], 300)
-              temp_units = temp_units - 300
-          else:
-              sell_order = user.sell_order(ship.id, flight_path['symbol'], temp_units)
-    else:
-      sell_order = user.sell_order(ship.id, flight_path['symbol'], flight_path['units'])
+    # Sell Order - split into orders of at most 300 units by bulk_sell
+    sell_order = CONTEXT.user.bulk_sell(ship.id, flight_path['symbol'], flight_path['units'])
     print(G+"Sold {} units of {} for {} with a profit of {}".\
         format(flight_path['units'], 
                flight_path['symbol'], 
@@ -204,25 +308,27 @@ def any_dest_trading_run(ship):
                sell_order['order']['total'] - buy_order['order']['total'])+W)
     # Collate Data to Upload to Datebase
     data = [[datetime.datetime.now(), ship.location, flight_path['symbol'],
-            flight_path['units'], flight_path['cost'], flight_path['total_cost'], 
+            sell_order['order']['quantity'], sell_order['order']['pricePerUnit'], sell_order['order']['total'], 
             flight_path['expected_profit'], flight_path['from']]]
     columns = ['time', 'location', 'symbol', 'units', 'sell_price', 'total_sell_amount',
                'expected_profit', 'buy_location']
     db_handler.write_sell_order_to_db(pd.DataFrame(data, columns=columns))
-    # Update Ship
-    ship.update_cargo(sell_order['ship']['cargo'], sell_order['ship']['spaceAvailable'])
     return sell_order['order']['total'] - buy_order['order']['total']
   else:
     return 0
 
 def do_trading_run(shipId, times):
-  ship = user.get_ship(shipId)
+  ship = CONTEXT.user.get_ship(shipId)
+  # Planned together with the other ships trading
+  CONTEXT.traders.add(shipId)
   start = datetime.datetime.now()
   profit = []
 
   # Perform the trading runs
   for x in range(times):
     profit.append(any_dest_trading_run(ship))
+    # Orders & flights keep the user up to date - this only calls the API every so often to catch any drift
+    CONTEXT.user.check_drift()
     print(R+"Total money made so far: " + str(sum(profit))+W)
     now = datetime.datetime.now() - start
     print(R+"Time taken so far: " + str(now)+W)
@@ -0,0 +1,177 @@
+import requests
+import logging
+import time
+import threading
+from concurrent.futures import Future
+from requests.adapters import HTTPAdapter
+from .ratelimit import DEFAULT_LIMITER
+from .retry import DEFAULT_RETRY, THROTTLE_CODE, error_code
+from .scheduler import DEFAULT_SCHEDULER, PriorityScheduler, current_priority
+from .metrics import DEFAULT_METRICS, body_size, request_size
+
+
+URL = "https://api.spacetraders.io/"
+
+def request_key(endpoint, headers=None, params=None):
+    """Builds the key that identifies identical requests - the endpoint, params and token
+
+    Args:
+        endpoint (str): The API endpoint
+        headers (dict, optional): the request headers holding the Auth. Defaults to None.
+        params (dict, optional): parameters of the request. Defaults to None.
+
+    Returns:
+        tuple: A hashable key
+    """
+    token = headers.get('Authorization') if headers else None
+    params = tuple(sorted((k, str(v)) for k, v in params.items() if v is not None)) if params else ()
+    return (endpoint.strip("/"), params, token)
+
+class SingleFlight ():
+    def __init__(self):
+        """Coalesces identical calls that are in flight at the same time.
+        The first caller (the leader) makes the call and every caller that arrives before it finishes shares its result.
+        """
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.shared = 0
+
+    def do(self, key, fn):
+        """Calls fn unless an identical call is already in flight, in which case waits for and returns its result
+
+        Args:
+            key (hashable): Identifies identical calls
+            fn (callable): Makes the call
+
+        Returns:
+            Any: The result of fn. Raises the same exception if fn raised
+        """
+        with self.lock:
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                future = self.calls[key] = Future()
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self.lock:
+                del self.calls[key]
+        return future.result()
+
+class Transport ():
+    def __init__(self, base_url=URL, session=None, pool_connections=4, pool_maxsize=16, limiter=None, retry=None, coalesce=True, scheduler=None, metrics=None):
+        """The Transport owns the HTTP connection pool used to talk to the Space Traders API.
+        A single Transport is shared by every Client of an Api so they all reuse the same keep-alive connections.
+
+        Args:
+            base_url (str, optional): Root URL of the API. Point this at a local stand-in server for offline use. Defaults to URL.
+            session (requests.Session, optional): An existing session to use. Defaults to a new pooled session.
+            pool_connections (int, optional): Number of host pools to cache. Defaults to 4.
+            pool_maxsize (int, optional): Max connections kept alive per host. Defaults to 16.
+            limiter (RateLimiter, optional): Paces the requests before they are sent. Defaults to the process wide DEFAULT_LIMITER.
+            retry (RetryPolicy, optional): Decides when failed requests are sent again. Defaults to the process wide DEFAULT_RETRY.
+            coalesce (bool, optional): Share one network call between identical GETs that are in flight at the same time. Defaults to True.
+            scheduler (PriorityScheduler, optional): Decides which waiting request gets the next token from the limiter. 
+                Defaults to the process wide DEFAULT_SCHEDULER, or a new one if a limiter is given.
+            metrics (Metrics, optional): Records the latency, size, retries & waits of every request. Defaults to the process wide DEFAULT_METRICS.
+        """
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.retry = retry if retry is not None else DEFAULT_RETRY
+        if scheduler is None:
+            limiter = limiter if limiter is not None else DEFAULT_LIMITER
+            scheduler = DEFAULT_SCHEDULER if limiter is DEFAULT_LIMITER else PriorityScheduler(limiter)
+        self.scheduler = scheduler
+        self.limiter = scheduler.limiter
+        self.metrics = metrics if metrics is not None else DEFAULT_METRICS
+        self.flights = SingleFlight() if coalesce else None
+        self.session = session if session is not None else requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Only the requested verb is ever sent - these are looked up, not called
+        self.methods = {
+            "POST": self.session.post,
+            "GET": self.session.get,
+            "PUT": self.session.put,
+            "DELETE": self.session.delete
+        }
+
+    def url(self, endpoint):
+        """Builds the full URL for an endpoint
+
+        Args:
+            endpoint (str): The API endpoint eg. game/status
+
+        Returns:
+            str: The full URL
+        """
+        return self.base_url + endpoint.lstrip("/")
+
+    def request(self, method, endpoint, headers=None, params=None):
+        """Sends a request to the Space Traders API over the pooled session.
+        Requests wait their turn in the priority scheduler - see scheduler.priority to set the class of a request.
+        Throttling and server errors are retried in a loop according to the retry policy. 
+        The number of attempts made is stored on the response as 'attempts'.
+        Identical GETs made at the same time (same endpoint, params and token) share one network call and one response - 
+        each caller still decodes its own copy of the JSON so they can't change each other's data.
+
+        Args:
+            method (str): The HTTP method to use. GET, POST, PUT or DELETE
+            endpoint (str): The API endpoint
+            headers (dict, optional): the request headers holding the Auth. Defaults to None.
+            params (dict, optional): parameters of the request. Defaults to None.
+
+        Returns:
+            Response: The final response returned by the API
+
+        Exceptions:
+            KeyError: Invalid method - must be GET, POST, PUT or DELETE
+        """
+        if method not in self.methods:
+            logging.exception(f'Invalid method provided: {method}')
+        level = current_priority(method)
+        if method == "GET" and self.flights is not None:
+            key = request_key(endpoint, headers, params)
+            return self.flights.do(key, lambda: self._send(method, endpoint, headers, params, level))
+        return self._send(method, endpoint, headers, params, level)
+
+    def _send(self, method, endpoint, headers, params, level):
+        send = self.methods[method]
+        url = self.url(endpoint)
+        started = self.retry.clock()
+        attempt = throttled = sent_bytes = received = 0
+        latency = sleep = 0.0
+        while True:
+            attempt += 1
+            sleep += self.scheduler.acquire(level)
+            sent = time.perf_counter()
+            r = send(url, headers=headers, params=params)
+            latency += time.perf_counter() - sent
+            sent_bytes += request_size(r)
+            received += body_size(getattr(r, 'content', None))
+            code = error_code(r)
+            delay = self.retry.next_delay(code, attempt, started, r.headers)
+            if delay is None:
+                self.retry.record(attempt, code)
+                self.metrics.observe(method, endpoint, latency, bytes_sent=sent_bytes, bytes_received=received, attempts=attempt,
+                                     throttled=throttled + (code == THROTTLE_CODE), sleep=sleep, error=code is not None)
+                r.attempts = attempt
+                return r
+            logging.warning(f"Error {code} from {method} {endpoint}. Attempt {attempt} failed, retrying in {delay:.2f} seconds")
+            # A throttle applies to everyone sharing the token so hold back every caller of the limiter
+            if code == THROTTLE_CODE:
+                throttled += 1
+                self.limiter.pause(delay)
+            else:
+                sleep += delay
+                self.retry.sleep(delay)
+
+    def close(self):
+        """Closes all the pooled connections"""
+        self.session.close()
@@ -0,0 +1,152 @@
+import threading
+import numpy as np
+
+
+# Extra fuel burnt leaving a planet by class of ship - the fuel matrices and Ship.calculate_fuel_usage both read it
+FUEL_PENALTIES = {
+    "MK-I": 2,
+    "MK-II": 3,
+    "MK-III": 4
+}
+
+def systems_key(systems):
+    """Returns a hashable key for the locations in the systems - equal systems have equal keys"""
+    return tuple((loc['symbol'], loc['type'], loc['x'], loc['y']) for system in systems for loc in system['locations'])
+
+def _frozen(array):
+    array.flags.writeable = False
+    return array
+
+class World ():
+    # The tables a World works out from its systems besides the distance & fuel tables - a snapshot stores them all
+    TABLES = ("systems", "types", "xy", "same_system", "planet")
+
+    def __init__(self, systems, distance=None, fuel_matrices=None, tables=None):
+        """The static map of the game with every distance and fuel cost worked out up front.
+        A World never changes once built so one instance is shared by every thread - see get_world.
+
+        Args:
+            systems (list): The systems as returned by game/systems (Game.systems)
+            distance (np.ndarray, optional): The distance table if already worked out eg. read from a snapshot
+            fuel_matrices (dict, optional): Class of ship -> fuel table if already worked out eg. read from a snapshot
+            tables (dict, optional): Any of TABLES if already worked out eg. read from a snapshot
+        """
+        tables = tables or {}
+        self.source = systems
+        self.key = systems_key(systems)
+        locations = [(system['symbol'], loc) for system in systems for loc in system['locations']]
+        self.symbols = tuple(loc['symbol'] for _, loc in locations)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        table = lambda name, build: _frozen(tables[name] if name in tables else build())
+        self.systems = table("systems", lambda: np.array([system for system, _ in locations]))
+        self.types = table("types", lambda: np.array([loc['type'] for _, loc in locations]))
+        self.xy = table("xy", lambda: np.array([(loc['x'], loc['y']) for _, loc in locations], dtype=float).reshape(-1, 2))
+        if distance is None:
+            delta = self.xy[:, None, :] - self.xy[None, :, :]
+            # np.rint rounds halves to even like round() does in Ship.calculate_distance
+            distance = np.rint(np.hypot(delta[..., 0], delta[..., 1])).astype(np.int64)
+        self.distance = _frozen(distance)
+        self.same_system = table("same_system", lambda: self.systems[:, None] == self.systems[None, :])
+        self.planet = table("planet", lambda: self.types == "PLANET")
+        self.lock = threading.Lock()
+        self.fuel_matrices = {kind: _frozen(matrix) for kind, matrix in (fuel_matrices or {}).items()}
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __repr__(self):
+        return f"<World Object> Locations: {len(self)}, Systems: {len(set(self.systems.tolist()))}"
+
+    def fuel_matrix(self, kind):
+        """Returns the fuel needed to fly between every pair of locations for a class of ship.
+        Worked out the first time each class is asked for.
+
+        Args:
+            kind (str): The class of ship eg. MK-II
+
+        Returns:
+            np.ndarray: Fuel from row location to column location (read only)
+        """
+        matrix = self.fuel_matrices.get(kind)
+        if matrix is None:
+            with self.lock:
+                matrix = self.fuel_matrices.get(kind)
+                if matrix is None:
+                    # Leaving a planet costs the penalty - it depends on where the ship is flying from only
+                    penalty = np.where(self.planet, FUEL_PENALTIES[kind], 0)[:, None]
+                    matrix = self.fuel_matrices[kind] = _frozen(np.rint(self.distance / 4 + 1 + penalty).astype(np.int64))
+        return matrix
+
+    def distance_from(self, symbol):
+        """Returns the distance from a location to every location, in the order of 'symbols'"""
+        return self.distance[self.index[symbol]]
+
+    def fuel_from(self, symbol, kind):
+        """Returns the fuel needed to fly from a location to every location, in the order of 'symbols'
+
+        Args:
+            symbol (str): Symbol of the location flying from
+            kind (str): The class of ship eg. MK-II
+
+        Returns:
+            np.ndarray: The fuel to each location
+        """
+        return self.fuel_matrix(kind)[self.index[symbol]]
+
+    def fuel(self, origin, destination, kind):
+        """Returns the fuel needed to fly from one location to another
+
+        Args:
+            origin (str): Symbol of the location flying from
+            destination (str): Symbol of the location flying to
+            kind (str): The class of ship eg. MK-II
+
+        Returns:
+            int: The fuel required
+        """
+        return int(self.fuel_matrix(kind)[self.index[origin], self.index[destination]])
+
+    def distances_to(self, x, y):
+        """Returns the distance from any point (eg. a ship's x & y) to every location, in the order of 'symbols'"""
+        return np.rint(np.hypot(self.xy[:, 0] - x, self.xy[:, 1] - y)).astype(np.int64)
+
+    def in_system(self, system):
+        """Returns a mask of the locations in a system eg. OE"""
+        return self.systems == system
+
+    def reachable_from(self, symbol):
+        """Returns a mask of the locations a ship can fly to directly - every other location in the same system"""
+        i = self.index[symbol]
+        mask = self.same_system[i].copy()
+        mask[i] = False
+        return mask
+
+_worlds = {}
+_worlds_lock = threading.Lock()
+
+def share_world(world):
+    """Makes a world already built (eg. loaded from a snapshot) the one get_world returns for its systems
+
+    Returns:
+        World: The shared world - the one given unless one was already shared for the same systems
+    """
+    with _worlds_lock:
+        return _worlds.setdefault(world.key, world)
+
+def get_world(systems):
+    """Returns the process wide World for the systems given, building it the first time
+
+    Args:
+        systems (list): The systems as returned by game/systems (Game.systems)
+
+    Returns:
+        World: The shared world
+    """
+    key = systems_key(systems)
+    world = _worlds.get(key)
+    if world is None:
+        with _worlds_lock:
+            world = _worlds.get(key)
+            if world is None:
+                world = _worlds[key] = World(systems)
+    return world
@@ -0,0 +1,79 @@
+"""Construction time and memory of 10k ships and locations - the old __dict__ objects vs the slotted models.
+The time is the best of many runs as a single run swings by a third on a busy machine
+
+Usage:
+    python -m benchmarks.bench_models [count]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+from SpaceTraders.core import Ship, Location
+
+TOKEN = "0930cc36-7dc7-4cb1-8823-d8e72594d91e"
+
+SHIP = {"id": "cknoj34cd6480541ds6mlnvsxh2", "manufacturer": "Gravager", "class": "MK-I", "type": "GR-MK-I",
+        "location": "OE-PM", "x": 20, "y": -25, "speed": 1, "plating": 10, "weapons": 5, "maxCargo": 100,
+        "spaceAvailable": 5, "cargo": [{"good": "FUEL", "quantity": 95, "totalVolume": 95}]}
+
+LOCATION = {"symbol": "OE-PM", "type": "PLANET", "name": "Prime", "x": 20, "y": -25, "allowsConstruction": False, "structures": []}
+
+class DictShip(object):
+    # How Ship was built before the slotted models
+    def __init__(self, token, *initial_data, **kwargs):
+        self.token = token
+        self.cargo = initial_data[0]['cargo']
+        self.location = initial_data[0]['location'] if 'location' in initial_data[0] else "IN-TRANSIT"
+        self.x = initial_data[0]['x'] if 'location' in initial_data[0] else None
+        self.y = initial_data[0]['y'] if 'location' in initial_data[0] else None
+        self.kind = initial_data[0]['class']
+        for dictionary in initial_data:
+            for key in dictionary:
+                setattr(self, key, dictionary[key])
+        for key in kwargs:
+            setattr(self, key, kwargs[key])
+
+class DictLocation:
+    # How Location was built before the slotted models
+    def __init__(self, token, *args, **kwargs):
+        if isinstance(token, str):
+            self.token = token
+        else:
+            raise TypeError("Incorrect data type for token")
+        self.symbol = args[0]['symbol']
+        self.type = args[0]['type']
+        self.name = args[0]['name']
+        self.x = args[0]['x']
+        self.y = args[0]['y']
+        self.allowsConstruction = args[0]['allowsConstruction']
+        self.structures = args[0]['structures']
+
+def measure(cls, data, count, repeat=25):
+    # Each object gets its own copy of the JSON like it would coming from the API
+    payloads = [dict(data) for _ in range(count)]
+    gc.disable()
+    try:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            objects = [cls(TOKEN, payload) for payload in payloads]
+            best = min(best, time.perf_counter() - start)
+            del objects
+    finally:
+        gc.enable()
+    tracemalloc.start()
+    objects = [cls(TOKEN, payload) for payload in payloads]
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, memory / count
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print(f"{'model':<12}{'ms per ' + str(count):>16}{'bytes each':>14}")
+    for name, cls, data in [("DictShip", DictShip, SHIP), ("Ship", Ship, SHIP),
+                            ("DictLocation", DictLocation, LOCATION), ("Location", Location, LOCATION)]:
+        elapsed, memory = measure(cls, data, count)
+        print(f"{name:<12}{elapsed * 1000:>16.2f}{memory:>14.0f}")
+
+if __name__ == "__main__":
+    main()
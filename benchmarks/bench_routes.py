@@ -0,0 +1,37 @@
+"""Time to plan the best trade cycle through a synthetic system of 20 markets, by most legs in the cycle
+
+Usage:
+    python -m benchmarks.bench_routes [repeat]
+"""
+import sys
+import time
+from SpaceTraders.arbitrage import ArbitrageEngine
+from SpaceTraders.routes import RoutePlanner
+from SpaceTraders.standin import SimulatedWorld, generate_systems
+from SpaceTraders.world import World
+from SpaceTraders.core import Ship
+
+TOKEN = "0930cc36-7dc7-4cb1-8823-d8e72594d91e"
+
+SHIP = {"id": "cknoj34cd6480541ds6mlnvsxh2", "manufacturer": "Gravager", "class": "MK-I", "type": "GR-MK-I",
+        "x": 20, "y": -25, "speed": 1, "plating": 10, "weapons": 5, "maxCargo": 100,
+        "spaceAvailable": 100, "cargo": []}
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    systems = generate_systems(systems=1, locations=20)
+    simulated = SimulatedWorld(systems)
+    markets = {symbol: simulated.marketplace(symbol) for symbol in simulated.markets}
+    world = World(systems)
+    ship = Ship(TOKEN, {**SHIP, "location": next(iter(markets))})
+    print(f"{'legs':<6}{'best ms':>10}{'worst ms':>10}{'profit/hour':>14}")
+    for legs in [2, 3, 4, 5, 6]:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            cycle = RoutePlanner(ArbitrageEngine(markets), world).plan(ship, 50000, max_legs=legs)
+            times.append(time.perf_counter() - start)
+        print(f"{legs:<6}{min(times) * 1000:>10.2f}{max(times) * 1000:>10.2f}{cycle['profit_per_hour'] if cycle else 0:>14.0f}")
+
+if __name__ == "__main__":
+    main()
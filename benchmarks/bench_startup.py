@@ -0,0 +1,67 @@
+"""Start up time of a single ship worker, each run in a fresh interpreter against a local stand-in server
+
+Usage:
+    python -m benchmarks.bench_startup [repeat]
+"""
+import os
+import sys
+import tempfile
+import subprocess
+from SpaceTraders.standin import StandInServer, SimulatedWorld
+
+TOKEN = "0930cc36-7dc7-4cb1-8823-d8e72594d91e"
+USERNAME = "JimHawkins"
+RECORDED = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "api_return_expected.json")
+
+# Each scenario prints how long it took in seconds - timed inside the child so interpreter start up isn't counted
+IMPORT = """
+import time
+start = time.perf_counter()
+import SpaceTraders.traders
+print(time.perf_counter() - start)
+"""
+
+# What importing used to cost before pandas & rich were deferred - network calls on import aren't counted
+EAGER_IMPORT = """
+import time
+start = time.perf_counter()
+import pandas, rich.progress
+import SpaceTraders.traders
+print(time.perf_counter() - start)
+"""
+
+WORKER = """
+import time
+start = time.perf_counter()
+from SpaceTraders import traders, core
+from SpaceTraders.transport import Transport
+core.TRANSPORT = Transport({url!r})
+context = traders.TradingContext({username!r}, {token!r})
+ship = context.user.ships[0]
+context.game.world.fuel_from(context.game.world.symbols[0], ship.kind)
+print(time.perf_counter() - start)
+"""
+
+def run(code, cache_dir):
+    env = dict(os.environ, SPACETRADERS_CACHE_DIR=cache_dir)
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with StandInServer(SimulatedWorld(), throttle=False) as server:
+        server.world.seed(RECORDED, TOKEN)
+        worker = WORKER.format(url=server.url, username=USERNAME, token=TOKEN)
+        print(f"{'scenario':<28}{'best ms':>10}{'worst ms':>10}")
+        for name, code, warm in [("import traders", IMPORT, False), ("import (eager pandas & rich)", EAGER_IMPORT, False),
+                                 ("worker, empty cache", worker, False), ("worker, warm cache", worker, True)]:
+            times = []
+            with tempfile.TemporaryDirectory() as cache_dir:
+                if warm:
+                    run(code, cache_dir)
+                for _ in range(repeat):
+                    times.append(run(code, cache_dir if warm else tempfile.mkdtemp(dir=cache_dir)))
+            print(f"{name:<28}{min(times) * 1000:>10.0f}{max(times) * 1000:>10.0f}")
+
+if __name__ == "__main__":
+    main()
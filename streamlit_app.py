@@ -66,12 +66,8 @@ plt.legend()
 sl.pyplot(fig)
 
 # Ships
-ships = user.full_json['user']['ships']
-ships_df = pd.DataFrame(ships)
-
 """
 ## Traders
 """
-traders_mask = ships_df.manufacturer == "Gravager"
-ships_df.loc[traders_mask,['id', 'location', 'class']]
+user.get_ships(as_df=True, fields=['id', 'location', 'class'], filter_by=[('manufacturer', 'Gravager')])
 
@@ -304,7 +304,40 @@ class TestShipMethods(unittest.TestCase):
         self.assertEqual(self.ship.spaceAvailable, NEW_SPACE_AVAILABLE, "Space Available did not update correctly")
         # Check the cargo list is now 3
         self.assertEqual(len(self.ship.cargo), 3, "Cargo did not update correctly - length of list is not correct")
-    
+        self.assertEqual(self.ship.cargo_quantity("RESEARCH"), 1, "Cargo index did not pick up the new good")
+        # Dropping a good removes it from the index
+        self.ship.update_cargo(NEW_CARGO[1:], NEW_SPACE_AVAILABLE)
+        self.assertEqual(self.ship.cargo_quantity("SHIP_PLATING"), 0, "Cargo index kept a good no longer on board")
+
+    # Tests the cargo index queries
+    def test_cargo_index(self):
+        self.assertEqual(self.ship.cargo_quantity("SHIP_PLATING"), 47)
+        self.assertEqual(self.ship.cargo_volume("SHIP_PLATING"), 94)
+        self.assertEqual(self.ship.cargo_quantity("RESEARCH"), 0, "A good not on board should have no units")
+        self.assertEqual((self.ship.cargo_volume(), self.ship.free_space()), (95, 5))
+        self.assertEqual(self.ship.get_fuel_level(), 1)
+
+    # Tests the 'apply_order' method
+    def test_apply_order(self):
+        sold = {"credits": 100, "order": {"good": "SHIP_PLATING", "quantity": 47, "pricePerUnit": 2, "total": 94},
+                "ship": {**DOCKED_SHIP, "cargo": [DOCKED_SHIP['cargo'][1]], "spaceAvailable": 99}}
+        self.ship.apply_order(sold)
+        self.assertEqual(self.ship.cargo_quantity("SHIP_PLATING"), 0, "Sold good left in the cargo index")
+        self.assertEqual((self.ship.get_fuel_level(), self.ship.free_space()), (1, 99))
+        self.assertEqual(self.ship.cargo, [DOCKED_SHIP['cargo'][1]], "Cargo list not updated")
+
+    def test_apply_order_index_matches_cargo(self):
+        # The fuel wasn't ordered but its entry in the response is a new dict - the index should hold it not the old one
+        self.ship.get_fuel_level()
+        cargo = [{**entry} for entry in DOCKED_SHIP['cargo']]
+        cargo[0] = {**cargo[0], "quantity": 48, "totalVolume": 96}
+        self.ship.apply_order({"credits": 100, "order": {"good": "SHIP_PLATING", "quantity": 1, "pricePerUnit": 2, "total": 2},
+                               "ship": {**DOCKED_SHIP, "cargo": cargo, "spaceAvailable": 3}})
+        for entry in self.ship.cargo:
+            self.assertIs(self.ship.cargo_index[entry['good']], entry, "Cargo index out of step with the cargo list")
+        self.ship.cargo[1]['quantity'] = 5
+        self.assertEqual(self.ship.get_fuel_level(), 5)
+
      # Tests the 'update_location' method
     def test_update_location(self):
         # Update the cargo
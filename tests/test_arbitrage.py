@@ -0,0 +1,73 @@
+import json
+import unittest
+import numpy as np
+import pandas as pd
+from SpaceTraders.arbitrage import ArbitrageEngine
+from SpaceTraders.core import Game, Market, Ship
+from tests.test_Core import DOCKED_SHIP
+
+TOKEN = "4c9f072a-4e95-48d6-bccd-54f1569bd3c5"
+
+def good(symbol, volume, purchase, sell, quantity=100):
+    return {"symbol": symbol, "volumePerUnit": volume, "pricePerUnit": purchase, "spread": purchase - sell,
+            "purchasePricePerUnit": purchase, "sellPricePerUnit": sell, "quantityAvailable": quantity}
+
+MARKETS = {
+    "OE-PM-TR": [good("METALS", 1, 10, 8), good("FUEL", 1, 2, 1), good("CHEMICALS", 2, 20, 18)],
+    "OE-PM": [good("METALS", 1, 15, 14), good("CHEMICALS", 2, 40, 36), good("DRONES", 3, 60, 55)],
+    "OE-CR": [good("FUEL", 1, 5, 4), good("DRONES", 3, 30, 28)],
+    "OE-UC": [good("FOOD", 1, 3, 2)],
+}
+
+class TestArbitrageEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = ArbitrageEngine(MARKETS)
+        with open('./SpaceTraders/constants/systems.json', 'r') as infile:
+            self.game = Game(TOKEN, json.load(infile))
+
+    def test_matches_market_compare(self):
+        market = Market(self.game)
+        for origin in MARKETS:
+            for destination in MARKETS:
+                if origin == destination:
+                    continue
+                compared = market.market_compare(pd.DataFrame(MARKETS[origin]), pd.DataFrame(MARKETS[destination]))
+                f, t = self.engine.location_index[origin], self.engine.location_index[destination]
+                for _, row in compared.iterrows():
+                    g = self.engine.good_index[row['symbol']]
+                    self.assertEqual(self.engine.profit[f, t, g], row['profit'], f"Profit of {row['symbol']} from {origin} to {destination}")
+                    self.assertAlmostEqual(self.engine.profit_per_volume[f, t, g], row['profit_per_volume'])
+                traded = np.flatnonzero(~np.isnan(self.engine.profit[f, t]))
+                self.assertEqual(len(traded), len(compared), "Goods not traded by both markets should have no profit")
+
+    def test_best_buys_match_best_buy(self):
+        market = Market(self.game)
+        buys = self.engine.best_buys("OE-PM-TR")
+        self.assertNotIn("OE-UC", buys, "Destination sharing no goods should be left out")
+        for destination in ["OE-PM", "OE-CR"]:
+            expected = market.best_buy(pd.DataFrame(MARKETS["OE-PM-TR"]), pd.DataFrame(MARKETS[destination]))
+            self.assertEqual(buys[destination]['symbol'], expected['symbol'])
+            self.assertEqual(buys[destination]['profit'], expected['profit'])
+            self.assertAlmostEqual(buys[destination]['profit_per_volume'], expected['profit_per_volume'])
+
+    def test_top(self):
+        top = self.engine.top(3)
+        self.assertEqual([(t['from'], t['to'], t['symbol']) for t in top],
+                         [("OE-CR", "OE-PM", "DRONES"), ("OE-PM-TR", "OE-PM", "CHEMICALS"), ("OE-PM-TR", "OE-PM", "METALS")])
+        self.assertEqual(top[0]['profit'], 25)
+        self.assertEqual(self.engine.top(1, by="profit")[0]['symbol'], "DRONES")
+        self.assertTrue(all(t['from'] == "OE-PM-TR" for t in self.engine.top(10, origin="OE-PM-TR")))
+        self.assertEqual(len(self.engine.top(100)), int(np.isfinite(self.engine.profit).sum()) - sum(map(len, MARKETS.values())), "Trades to the same location should be left out")
+        self.assertEqual(self.engine.top(5, origin="OE-UC", destinations=["OE-PM"]), [])
+
+    def test_what_should_I_buy_everywhere(self):
+        ship = Ship(TOKEN, {**DOCKED_SHIP, "location": "OE-PM-TR"})
+        market = Market(self.game)
+        trades = market.what_should_I_buy_everywhere(ship, MARKETS)
+        self.assertEqual([t['to'] for t in trades], ["OE-PM", "OE-CR"])
+        for trade in trades:
+            best_good = market.best_buy(pd.DataFrame(MARKETS["OE-PM-TR"]), pd.DataFrame(MARKETS[trade['to']]))
+            self.assertEqual(trade, market.trade_details(ship, trade['to'], best_good))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import json
+import unittest
+from SpaceTraders.arbitrage import ArbitrageEngine
+from SpaceTraders.assignment import FleetPlanner
+from SpaceTraders.impact import PriceImpactModel
+from SpaceTraders.world import World
+from SpaceTraders.core import Ship
+from tests.test_Core import DOCKED_SHIP
+from tests.test_arbitrage import good
+
+TOKEN = "4c9f072a-4e95-48d6-bccd-54f1569bd3c5"
+
+# Metals to OE-PM pays best but OE-PM-TR only has enough for one ship
+MARKETS = {
+    "OE-PM-TR": [good("METALS", 1, 10, 8, quantity=60), good("CHEMICALS", 1, 20, 18, quantity=5000)],
+    "OE-PM": [good("METALS", 1, 60, 55, quantity=5000)],
+    "OE-CR": [good("CHEMICALS", 1, 40, 36, quantity=5000)],
+}
+
+def make_ship(id, **kwargs):
+    return Ship(TOKEN, {**DOCKED_SHIP, "id": id, "location": "OE-PM-TR", "cargo": [], "spaceAvailable": DOCKED_SHIP['maxCargo'], **kwargs})
+
+class TestFleetPlanner(unittest.TestCase):
+    def setUp(self):
+        with open('./SpaceTraders/constants/systems.json', 'r') as infile:
+            self.world = World(json.load(infile))
+        self.engine = ArbitrageEngine(MARKETS)
+
+    def test_ships_dont_collide(self):
+        ships = [make_ship("first"), make_ship("second")]
+        plan = FleetPlanner(self.engine, self.world).assign(ships)
+        trades = sorted(plan.values(), key=lambda t: t['symbol'])
+        self.assertEqual([t['symbol'] for t in trades], ["CHEMICALS", "METALS"], "Both ships sent after the same good")
+        self.assertEqual(trades[1]['units'], 60, "Bought more than the market has")
+        self.assertEqual(trades[1]['to'], "OE-PM")
+
+    def test_prices_move_with_trades(self):
+        planner = FleetPlanner(self.engine, self.world)
+        before = planner.purchase.copy()
+        planner.reserve({"from": "OE-PM-TR", "to": "OE-CR", "symbol": "CHEMICALS", "units": 500})
+        f, t, g = self.engine.location_index["OE-PM-TR"], self.engine.location_index["OE-CR"], self.engine.good_index["CHEMICALS"]
+        self.assertAlmostEqual(planner.purchase[f, g], before[f, g] * 1.05, msg="Buying 10% of the stock should raise the price 5%")
+        self.assertAlmostEqual(planner.sell[t, g], 36 * 0.95)
+        self.assertEqual(planner.quantity[f, g], 4500)
+
+    def test_per_good_impact(self):
+        planner = FleetPlanner(self.engine, self.world, price_impact=PriceImpactModel({"CHEMICALS": 1.0}, default=0))
+        before = planner.purchase.copy()
+        planner.reserve({"from": "OE-PM-TR", "to": "OE-CR", "symbol": "CHEMICALS", "units": 500})
+        f, g = self.engine.location_index["OE-PM-TR"], self.engine.good_index["CHEMICALS"]
+        self.assertAlmostEqual(planner.purchase[f, g], before[f, g] * 1.1, msg="Good's own impact not used")
+        planner.reserve({"from": "OE-PM-TR", "to": "OE-PM", "symbol": "METALS", "units": 30})
+        self.assertEqual(planner.purchase[f, self.engine.good_index["METALS"]], 10, "Default impact not used")
+
+    def test_orders_sized_by_impact(self):
+        # Past 300 units the price has moved too far for another order to make money
+        engine = ArbitrageEngine({"OE-PM-TR": [good("METALS", 1, 10, 9, quantity=1000)], "OE-PM": [good("METALS", 1, 13, 12, quantity=1000)]})
+        ship = make_ship("big", maxCargo=2000, spaceAvailable=2000)
+        trade = FleetPlanner(engine, self.world).assign([ship])["big"]
+        self.assertEqual((trade['units'], trade['total_cost'], trade['expected_profit']), (300, 3000, 600), "Orders not sized by the price impact")
+        trade = FleetPlanner(engine, self.world, price_impact=PriceImpactModel(default=0)).assign([ship])["big"]
+        self.assertEqual(trade['units'], 1000)
+
+    def test_credits_are_shared(self):
+        ships = [make_ship("first"), make_ship("second")]
+        plan = FleetPlanner(self.engine, self.world).assign(ships, credits=600)
+        self.assertLessEqual(sum(t['total_cost'] for t in plan.values() if t), 600, "Fleet spent more than it has")
+        self.assertIn(None, plan.values(), "Second ship given a trade the fleet can't pay for")
+
+    def test_cargo_on_board(self):
+        full = make_ship("full", cargo=[{"good": "SHIP_PLATING", "quantity": 50, "totalVolume": 95}], spaceAvailable=5)
+        in_transit = make_ship("flying", location="IN-TRANSIT")
+        plan = FleetPlanner(self.engine, self.world).assign([full, in_transit])
+        self.assertIsNone(plan["flying"], "Ship in transit given a trade")
+        self.assertTrue(plan["full"] is None or plan["full"]['total_volume'] + plan["full"]['fuel_required'] <= 5, "Trade doesn't fit the room left")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import logging
+import asyncio
+import httpx
+from SpaceTraders.async_client import AsyncApi, AsyncTransport, AsyncShips
+from SpaceTraders.ratelimit import RateLimiter
+from SpaceTraders.retry import RetryPolicy
+
+TOKEN = "0930cc36-7dc7-4cb1-8823-d8e72594d91e"
+USERNAME = "JimHawkins"
+
+def make_api(handler):
+    session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    transport = AsyncTransport("http://stand-in", session=session, limiter=RateLimiter(rate=1000, burst=1000),
+                               retry=RetryPolicy(base_delay=0))
+    return AsyncApi(USERNAME, TOKEN, transport=transport)
+
+class TestAsyncApi(unittest.TestCase):
+    def setUp(self):
+        logging.disable()
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_sub_clients_share_transport(self):
+        api = make_api(lambda request: httpx.Response(200, json={}))
+        self.assertIsInstance(api.ships, AsyncShips)
+        self.assertIs(api.ships.transport, api.marketplace.transport, "Sub clients don't share the transport")
+
+    def test_base_initializer_runs(self):
+        api = make_api(lambda request: httpx.Response(200, json={}))
+        self.assertEqual(api.ships.username, USERNAME, "Username not set by Client.__init__")
+        self.assertEqual(api.ships.token, TOKEN, "Token not set by Client.__init__")
+        self.assertIsInstance(AsyncShips(USERNAME).transport, AsyncTransport, "Async clients should default to an AsyncTransport")
+
+    def test_concurrent_calls(self):
+        seen = []
+        def handler(request):
+            seen.append(request.url.path)
+            return httpx.Response(200, json={"location": {"symbol": request.url.path.split("/")[3]}})
+        async def run():
+            async with make_api(handler) as api:
+                return await asyncio.gather(*(api.marketplace.get_marketplace(s) for s in ["OE-PM", "OE-CR", "OE-KO"]))
+        results = asyncio.run(run())
+        self.assertEqual([r['location']['symbol'] for r in results], ["OE-PM", "OE-CR", "OE-KO"])
+        self.assertEqual(len(seen), 3)
+
+    def test_identical_gets_coalesced(self):
+        seen = []
+        def handler(request):
+            seen.append(request.url.path)
+            return httpx.Response(200, json={"location": {"symbol": "OE-PM"}})
+        async def run():
+            async with make_api(handler) as api:
+                return await asyncio.gather(*(api.marketplace.get_marketplace("OE-PM") for _ in range(5)))
+        results = asyncio.run(run())
+        self.assertEqual(len(seen), 1, "Identical in-flight GETs were not coalesced")
+        self.assertEqual(len(results), 5, "Not every caller received the result")
+
+    def test_throttle_is_retried(self):
+        responses = [httpx.Response(429, json={"error": {"code": 42901, "message": "Throttle"}}),
+                     httpx.Response(200, json={"status": "up"})]
+        api = make_api(lambda request: responses.pop(0))
+        self.assertEqual(asyncio.run(api.game.get_game_status()), {"status": "up"}, "Throttled call was not retried")
+
+    def test_fatal_error_returns_false(self):
+        api = make_api(lambda request: httpx.Response(404, json={"error": {"code": 404, "message": "Not found"}}))
+        self.assertEqual(asyncio.run(api.ships.get_ship("1234")), False, "API call didn't fail when expected to")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import logging
+import json
+import tempfile
+from SpaceTraders import core
+from SpaceTraders.cache import StaticCache, cache_key
+
+TOKEN = "4c9f072a-4e95-48d6-bccd-54f1569bd3c5"
+
+class FakeClock():
+    def __init__(self):
+        self.now = 1000.0
+    def __call__(self):
+        return self.now
+
+class TestStaticCache(unittest.TestCase):
+    def setUp(self):
+        logging.disable()
+        self.dir = tempfile.TemporaryDirectory()
+        self.clock = FakeClock()
+        self.cache = StaticCache(self.dir.name, ttl=60, clock=self.clock)
+
+    def tearDown(self):
+        self.dir.cleanup()
+        logging.disable(logging.NOTSET)
+
+    def test_set_and_get(self):
+        self.cache.set("game/systems", {"systems": []})
+        self.assertEqual(self.cache.get("game/systems"), {"systems": []})
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_survives_restart(self):
+        self.cache.set("game/systems", {"systems": [1, 2]})
+        fresh = StaticCache(self.dir.name, ttl=60, clock=self.clock)
+        self.assertEqual(fresh.get("game/systems"), {"systems": [1, 2]}, "Entry was not read back from disk")
+
+    def test_ttl(self):
+        self.cache.set("game/systems", {"systems": []})
+        self.clock.now += 61
+        self.assertIsNone(self.cache.get("game/systems"), "Expired entry was returned")
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_version(self):
+        self.cache.set("game/systems", {"systems": []})
+        newer = StaticCache(self.dir.name, ttl=60, version=2, clock=self.clock)
+        self.assertIsNone(newer.get("game/systems"), "Entry from an older version was returned")
+
+    def test_invalidate(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.invalidate("a")
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.get("b"), 2)
+        self.cache.invalidate()
+        self.assertIsNone(StaticCache(self.dir.name, clock=self.clock).get("b"), "Entry left on disk after invalidating everything")
+
+    def test_get_or_fetch(self):
+        calls = []
+        fetch = lambda: calls.append(1) or {"ships": []}
+        self.cache.get_or_fetch("game/ships", fetch)
+        self.cache.get_or_fetch("game/ships", fetch)
+        self.assertEqual(len(calls), 1, "Fetched again on a cache hit")
+        self.cache.get_or_fetch("failed", lambda: False)
+        self.assertIsNone(self.cache.get("failed"), "A failed call was cached")
+
+    def test_cache_key(self):
+        self.assertEqual(cache_key("game/ships", {"class": "MK-I"}), "game/ships?class=MK-I")
+        self.assertEqual(cache_key("game/ships", {"class": None}), "game/ships")
+
+class TestGameReadsThroughCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.default = core.DEFAULT_CACHE
+        core.DEFAULT_CACHE = StaticCache(self.dir.name)
+        with open('./SpaceTraders/constants/systems.json', 'r') as infile:
+            core.DEFAULT_CACHE.set("game/systems", {"systems": json.load(infile)})
+
+    def tearDown(self):
+        core.DEFAULT_CACHE = self.default
+        self.dir.cleanup()
+
+    def test_game_without_systems(self):
+        # No systems passed and no network - must come from the cache
+        game = core.Game(TOKEN)
+        self.assertIn('OE-PM', game.locations, "Game didn't load the systems from the cache")
+        self.assertEqual(core.DEFAULT_CACHE.stats()['hits'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -273,4 +273,46 @@ class TestGetUserToken(unittest.TestCase):
     def test_get_user_token(self):
         self.assertIsNone(get_user_token("JimHawkins"), "Failed to handle a username that already exists")
 
- 
\ No newline at end of file
+ 
+class RecordingSession():
+    """Stands in for a requests.Session and records which verbs were sent"""
+    def __init__(self):
+        self.sent = []
+    def mount(self, prefix, adapter):
+        pass
+    def _send(self, method):
+        def send(url, headers=None, params=None):
+            self.sent.append((method, url))
+            res = requests.Response()
+            res.status_code = 200
+            return res
+        return send
+    def __getattr__(self, name):
+        return self._send(name.upper())
+
+class TestTransport(unittest.TestCase):
+    def setUp(self):
+        logging.disable()
+        self.session = RecordingSession()
+        self.transport = Transport("http://localhost:8000", session=self.session)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_only_requested_verb_sent(self):
+        self.transport.request("GET", "game/status")
+        self.assertEqual(self.session.sent, [("GET", "http://localhost:8000/game/status")], "More than the requested verb was sent")
+
+    def test_bad_method(self):
+        self.assertRaises(KeyError, self.transport.request, "BLAH", "game/status")
+        self.assertEqual(self.session.sent, [], "A request was sent for an invalid method")
+
+    def test_api_shares_transport(self):
+        api = Api(USERNAME, TOKEN, transport=self.transport)
+        clients = [api.flightplans, api.game, api.loans, api.locations, api.marketplace, api.purchaseOrders,
+                   api.sellOrders, api.ships, api.structures, api.systems, api.users]
+        self.assertTrue(all(c.transport is self.transport for c in clients), "Not all clients share the Api's transport")
+
+    def test_api_base_url(self):
+        api = Api(USERNAME, TOKEN, base_url="http://127.0.0.1:9999")
+        self.assertEqual(api.ships.transport.url("game/ships"), "http://127.0.0.1:9999/game/ships")
@@ -0,0 +1,89 @@
+import pickle
+import numpy as np
+import pandas as pd
+import unittest
+from SpaceTraders.fleet import Fleet
+from SpaceTraders.core import User, Ship
+from SpaceTraders.models import ShipModel
+from tests.test_Core import USER, DOCKED_SHIP
+
+TOKEN = "4c9f072a-4e95-48d6-bccd-54f1569bd3c5"
+
+class TestFleet(unittest.TestCase):
+    def setUp(self):
+        self.user = User(TOKEN, USER)
+        self.fleet = self.user.ships
+
+    def test_reads_like_a_list(self):
+        self.assertIsInstance(self.fleet, Fleet)
+        self.assertEqual(len(self.fleet), 6)
+        self.assertEqual([ship.id for ship in self.fleet], [ship['id'] for ship in USER['ships']], "Order of the ships not kept")
+        self.assertEqual(self.fleet[0].id, USER['ships'][0]['id'])
+
+    def test_indexed_queries(self):
+        self.assertEqual(len(self.fleet.where(manufacturer="Gravager")), 3)
+        ships = self.fleet.where(manufacturer="Gravager").where(("class", "MK-II")).all()
+        self.assertEqual([ship.id for ship in ships], ["cknppgtu510080651bs6hc90sb4s"], "Queries didn't compose")
+        self.assertEqual(self.fleet.where(location="IN-TRANSIT").count(), 3)
+        self.assertEqual(self.fleet.where(manufacturer="Gravager", speed=2).count(), len([s for s in self.fleet if s.manufacturer == "Gravager" and s.speed == 2]),
+                         "Unindexed attributes should still filter")
+        self.assertEqual(self.fleet.where(manufacturer="Nobody").all(), [])
+
+    def test_sort_doesnt_mutate(self):
+        before = [ship.id for ship in self.fleet]
+        ships = self.user.get_ships(sort_by=['manufacturer'])
+        self.assertEqual([ship.manufacturer for ship in ships], sorted(ship.manufacturer for ship in self.fleet))
+        self.assertEqual([ship.id for ship in self.fleet], before, "Sorting changed the user's ships")
+
+    def test_stays_in_sync(self):
+        ship = self.fleet.get("cknoj8i776706221ds6cs4n42m0")
+        version = self.fleet.version
+        ship.update_location(0, 0, "OE-UC")
+        self.assertIs(self.fleet.where(location="OE-UC").first(), ship, "Moved ship not re-indexed")
+        self.assertNotIn(ship, self.fleet.where(location="OE-PM").all(), "Moved ship left in its old location")
+        self.assertGreater(self.fleet.version, version)
+        new = Ship(TOKEN, {**DOCKED_SHIP, "id": "bought"})
+        self.fleet.add(new)
+        self.assertIs(self.user.get_ship("bought"), new)
+        self.assertIs(self.fleet.remove("bought"), new)
+        self.assertIsNone(self.user.get_ship("bought"), "Scrapped ship still in the fleet")
+        self.assertIsNone(new.fleet, "Scrapped ship still points at the fleet")
+
+    def test_plain_models(self):
+        models = [ShipModel.from_json(ship) for ship in USER['ships']]
+        fleet = Fleet(models)
+        self.assertEqual(fleet.where(location="IN-TRANSIT").count(), 3)
+        models[0].location = "OE-UC"
+        fleet.refresh(models[0])
+        self.assertIs(fleet.where(location="OE-UC").first(), models[0], "Refreshed model not re-indexed")
+        self.assertIs(fleet.remove(models[0].id), models[0])
+        self.assertEqual(len(fleet), 5)
+
+    def test_snapshot(self):
+        snapshot = self.fleet.snapshot(["id", "class"], filter_by=[("manufacturer", "Jackshaw")])
+        self.assertEqual(snapshot.dtype.names, ("id", "class"), "Fields not projected")
+        self.assertEqual(snapshot['id'].tolist(), [s.id for s in self.fleet if s.manufacturer == "Jackshaw"], "Ships not filtered")
+        self.assertIs(self.fleet.snapshot(["id", "class"], filter_by=[("manufacturer", "Jackshaw")]), snapshot, "Snapshot not cached")
+        with self.assertRaises(ValueError, msg="Cached snapshot should be read only"):
+            snapshot['id'][0] = "changed"
+        full = self.fleet.snapshot()
+        self.assertTrue(np.isnan(full['x'][1]), "Ship in transit should have no x")
+        self.fleet[0].update_location(1, 2, "OE-UC")
+        self.assertIsNot(self.fleet.snapshot(["id", "class"], filter_by=[("manufacturer", "Jackshaw")]), snapshot, "Snapshot outlived a change")
+        self.assertEqual(self.fleet.snapshot(["location"])['location'][0], "OE-UC")
+
+    def test_get_ships_df(self):
+        df = self.user.get_ships(as_df=True, fields=['id', 'location'], filter_by=[('manufacturer', 'Gravager')])
+        expected = pd.DataFrame([ship.as_dict() for ship in self.fleet if ship.manufacturer == 'Gravager']).loc[:, ['id', 'location']]
+        pd.testing.assert_frame_equal(df, expected)
+        pd.testing.assert_frame_equal(self.user.get_ships(as_df=True), pd.DataFrame([ship.as_dict() for ship in self.fleet]))
+
+    def test_pickle(self):
+        user = pickle.loads(pickle.dumps(self.user))
+        ship = user.get_ship("cknoj8i776706221ds6cs4n42m0")
+        self.assertIs(ship.fleet, user.ships, "Copied ship doesn't point at the copied fleet")
+        ship.update_location(0, 0, "OE-UC")
+        self.assertEqual(user.ships.where(location="OE-UC").count(), 1)
+
+if __name__ == '__main__':
+    unittest.main()
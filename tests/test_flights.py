@@ -0,0 +1,73 @@
+import json
+import random
+import unittest
+import numpy as np
+import pandas as pd
+from SpaceTraders.flights import FlightTimeModel, DOCKING_OVERHEAD, FLIGHT_FIXED_SECONDS
+from SpaceTraders.arbitrage import ArbitrageEngine
+from SpaceTraders.routes import RoutePlanner
+from SpaceTraders.assignment import FleetPlanner
+from SpaceTraders import standin
+from SpaceTraders.core import Game, Market, Ship
+from tests.test_Core import DOCKED_SHIP
+
+TOKEN = "4c9f072a-4e95-48d6-bccd-54f1569bd3c5"
+
+def flight_history(count=200, seed=0):
+    rand = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        distance, speed = rand.randint(1, 200), rand.choice([1, 2, 3, 4])
+        rows.append({"distance": distance, "speed": speed, "time_taken": standin.flight_seconds(distance, speed) + rand.randint(-2, 2)})
+    return pd.DataFrame(rows)
+
+class TestFlightTimeModel(unittest.TestCase):
+    def test_fit(self):
+        model = FlightTimeModel.fit([10, 20, 40, 80] * 5, [1, 2, 2, 4] * 5, [110, 110, 190, 190] * 5)
+        self.assertAlmostEqual(model.per_distance, 8)
+        self.assertAlmostEqual(model.fixed, 30)
+        self.assertEqual(model.flights, 20)
+
+    def test_from_history(self):
+        history = flight_history()
+        # Flights that can't be used are skipped rather than breaking the fit
+        history.loc[0, 'speed'] = 0
+        history.loc[1, 'time_taken'] = np.nan
+        model = FlightTimeModel.from_history(history)
+        self.assertEqual(model.flights, len(history) - 2)
+        # The stand-in's flights are the truth the fit should recover
+        self.assertAlmostEqual(model.per_distance, standin.SECONDS_PER_DISTANCE, delta=0.1)
+        self.assertAlmostEqual(model.fixed, standin.FLIGHT_FIXED_SECONDS, delta=1)
+
+    def test_too_few_flights(self):
+        model = FlightTimeModel.fit([10, 20], [1, 1], [200, 300])
+        self.assertEqual((model.per_distance, model.fixed), (FlightTimeModel().per_distance, FlightTimeModel().fixed), "Fitted to too few flights")
+
+    def test_vectorized(self):
+        model = FlightTimeModel(8, 30)
+        np.testing.assert_allclose(model(np.array([0, 10, 40]), 2), [30 + DOCKING_OVERHEAD, 70 + DOCKING_OVERHEAD, 190 + DOCKING_OVERHEAD])
+        self.assertEqual(model.flight_seconds(10, 1), 110)
+
+    def test_one_default(self):
+        with open('./SpaceTraders/constants/systems.json', 'r') as infile:
+            game = Game(TOKEN, json.load(infile))
+        engine = ArbitrageEngine({"OE-PM": [], "OE-CR": []})
+        planners = [RoutePlanner(engine, game.world), FleetPlanner(engine, game.world), Market(game)]
+        for planner in planners:
+            self.assertIsInstance(planner.flight_time, FlightTimeModel)
+            self.assertEqual(planner.flight_time(0, 1), FLIGHT_FIXED_SECONDS + DOCKING_OVERHEAD, f"{planner} leaves out the docking overhead")
+
+class TestRankByTime(unittest.TestCase):
+    def test_far_trade_loses(self):
+        with open('./SpaceTraders/constants/systems.json', 'r') as infile:
+            game = Game(TOKEN, json.load(infile))
+        ship = Ship(TOKEN, {**DOCKED_SHIP, "location": "OE-PM-TR"})
+        trades = [{"to": "OE-UC", "expected_profit": 1200}, {"to": "OE-PM", "expected_profit": 1000}, {"to": "OE-CR", "expected_profit": 1100}]
+        ranked = Market(game, FlightTimeModel(8, 30)).rank_by_time(ship, trades)
+        self.assertEqual([trade['to'] for trade in ranked], ["OE-PM", "OE-CR", "OE-UC"], "Far trade ranked above a near one paying almost as much")
+        self.assertAlmostEqual(ranked[0]['seconds'], 8 * 4 + 30 + DOCKING_OVERHEAD)
+        self.assertAlmostEqual(ranked[0]['profit_per_second'], 1000 / ranked[0]['seconds'])
+        self.assertEqual(Market(game).rank_by_time(ship, []), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import json
+import random
+import unittest
+import numpy as np
+import pandas as pd
+from SpaceTraders.impact import PriceImpactModel, PRICE_IMPACT
+from SpaceTraders.core import Game, Market, Ship
+from SpaceTraders import standin
+from tests.test_Core import DOCKED_SHIP
+from tests.test_arbitrage import good
+
+TOKEN = "4c9f072a-4e95-48d6-bccd-54f1569bd3c5"
+
+def market_history(impact, readings=200, seed=0):
+    # Readings of a market priced like the stand-in server - stock moves around its reference and the price follows it
+    rand = random.Random(seed)
+    rows, reference = [], 10000
+    for location in ["OE-PM", "OE-CR"]:
+        for time in range(readings):
+            stock = reference + rand.randint(-500, 500)
+            price = 100 * (1 + impact * (reference - stock) / reference)
+            rows.append({"location": location, "symbol": "METALS", "time": time, "pricePerUnit": price, "quantityAvailable": stock})
+    rows.append({"location": "OE-PM", "symbol": "DRONES", "time": 0, "pricePerUnit": 50, "quantityAvailable": 100})
+    return pd.DataFrame(rows)
+
+class TestPriceImpactModel(unittest.TestCase):
+    def test_fit(self):
+        model = PriceImpactModel.from_history(market_history(0.3))
+        self.assertAlmostEqual(model.impacts["METALS"], 0.3, delta=0.05)
+        self.assertNotIn("DRONES", model.impacts, "Fitted a good with a single reading")
+        np.testing.assert_allclose(model.impact(["METALS", "DRONES"]), [model.impacts["METALS"], PRICE_IMPACT])
+
+    def test_recovers_stand_in_impact(self):
+        # Readings of the stand-in's markets as their stock moves - the fit should find the rule the simulated world prices by
+        world = standin.SimulatedWorld(standin.generate_systems(1, 5, seed=1), seed=1)
+        rand, rows = random.Random(0), []
+        for time in range(50):
+            for location, market in world.markets.items():
+                for entry in market.values():
+                    entry['stock'] = entry['reference'] + rand.randint(-entry['reference'] // 5, entry['reference'] // 5)
+                rows += [{"location": location, "symbol": g['symbol'], "time": time, "pricePerUnit": g['pricePerUnit'],
+                          "quantityAvailable": g['quantityAvailable']} for g in world.marketplace(location)]
+        model = PriceImpactModel.from_history(pd.DataFrame(rows))
+        self.assertTrue(model.impacts, "No goods fitted")
+        for symbol, impact in model.impacts.items():
+            self.assertAlmostEqual(impact, standin.PRICE_IMPACT, delta=0.05, msg=f"Impact of {symbol} not recovered")
+
+    def test_stops_when_orders_lose_money(self):
+        model = PriceImpactModel(default=0.5)
+        sized = model.size(["METALS", "METALS"], [10, 10], [12, 12], [1000, 1000000], [1000, 1000000], [900, 900])
+        self.assertEqual(sized['units'].tolist(), [300, 900], "Should stop buying once a chunk loses money")
+        self.assertAlmostEqual(sized['profit'][0], 600)
+        marginal = sized['curves']['marginal'][0]
+        self.assertTrue(np.all(np.diff(marginal) < 0), "Marginal profit should fall chunk by chunk")
+        self.assertAlmostEqual(marginal[1], 12 * 0.85 - 10 * 1.15)
+        self.assertEqual(sized['curves']['units'][0].tolist(), [300, 300, 300])
+
+    def test_no_impact(self):
+        sized = PriceImpactModel(default=0).size(["METALS"], [10], [12], [1000], [1000], [700])
+        self.assertEqual(sized['units'].tolist(), [700])
+        self.assertAlmostEqual(sized['total_cost'][0], 7000)
+
+    def test_credits(self):
+        model = PriceImpactModel(default=0.5)
+        # The second order of the second trade pays 11.5 a unit so the 2000 credits left buy 173 more
+        sized = model.size(["METALS", "METALS"], [10, 10], [20, 20], [1000, 1000], [1000, 1000], [600, 600], credits=[2505, 5000])
+        self.assertEqual(sized['units'].tolist(), [250, 300 + 173], "Bought more than the credits cover")
+        self.assertTrue(np.all(sized['total_cost'] <= [2505, 5000]))
+
+class TestTradeSizing(unittest.TestCase):
+    def test_what_should_I_buy_sizes_orders(self):
+        with open('./SpaceTraders/constants/systems.json', 'r') as infile:
+            game = Game(TOKEN, json.load(infile))
+        ship = Ship(TOKEN, {**DOCKED_SHIP, "location": "OE-PM-TR", "maxCargo": 1000})
+        markets = {"OE-PM-TR": [good("METALS", 1, 10, 9, quantity=2000), good("DRONES", 1, 10, 9, quantity=50)],
+                   "OE-PM": [good("METALS", 1, 13, 12, quantity=2000)],
+                   "OE-CR": [good("DRONES", 1, 20, 19, quantity=2000)]}
+        trades = {trade['to']: trade for trade in Market(game).what_should_I_buy_everywhere(ship, markets)}
+        self.assertEqual(trades["OE-CR"]['units'], 50, "Bought more than the market has")
+        self.assertLess(trades["OE-PM"]['units'], 1000 - trades["OE-PM"]['fuel_required'], "Bought chunks that lose money")
+        self.assertEqual(trades["OE-PM"]['units'] % 300, 0)
+        curve = trades["OE-PM"]['profit_curve']
+        self.assertAlmostEqual(trades["OE-PM"]['expected_profit'], max(curve['profit']))
+        no_impact = Market(game, price_impact=PriceImpactModel(default=0)).what_should_I_buy_everywhere(ship, markets)
+        self.assertEqual(next(t for t in no_impact if t['to'] == "OE-PM")['units'], 1000 - trades["OE-PM"]['fuel_required'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import json
+import unittest
+from SpaceTraders import core
+from SpaceTraders.markets import MarketStore, MARKETS
+from tests.test_arbitrage import MARKETS as MARKETPLACES
+from tests.test_transport import FakeClock
+
+TOKEN = "4c9f072a-4e95-48d6-bccd-54f1569bd3c5"
+
+class TestMarketStore(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.store = MarketStore(clock=self.clock)
+
+    def test_max_age(self):
+        self.store.put("OE-PM", MARKETPLACES["OE-PM"])
+        self.clock.sleep(30)
+        self.assertEqual(self.store.get("OE-PM", max_age=60), MARKETPLACES["OE-PM"])
+        self.assertIsNone(self.store.get("OE-PM", max_age=10), "Marketplace older than max_age returned")
+        self.assertEqual(self.store.age("OE-PM"), 30)
+        self.assertIsNone(self.store.get("OE-CR"))
+        self.assertEqual(list(self.store.markets(["OE-PM", "OE-CR"])), ["OE-PM"])
+
+    def test_older_read_doesnt_replace_newer(self):
+        self.store.put("OE-PM", MARKETPLACES["OE-PM"], fetched=10)
+        self.store.put("OE-PM", MARKETPLACES["OE-CR"], fetched=5)
+        self.assertEqual(self.store.get("OE-PM"), MARKETPLACES["OE-PM"])
+
+    def test_get_or_fetch(self):
+        calls = []
+        fetch = lambda: calls.append(1) or MARKETPLACES["OE-PM"]
+        self.store.get_or_fetch("OE-PM", fetch)
+        self.store.get_or_fetch("OE-PM", fetch)
+        self.assertEqual(len(calls), 1, "Fresh marketplace fetched again")
+        self.store.get_or_fetch("OE-PM", fetch, max_age=0)
+        self.assertEqual(len(calls), 2, "max_age of 0 should always fetch")
+
+    def test_apply_order(self):
+        self.store.put("OE-PM", MARKETPLACES["OE-PM"])
+        order = {"credits": 100, "order": {"good": "METALS", "quantity": 40, "pricePerUnit": 16, "total": 640}, "ship": {"location": "OE-PM"}}
+        self.store.apply_order(order, buying=True)
+        metals = next(good for good in self.store.get("OE-PM") if good['symbol'] == "METALS")
+        self.assertEqual((metals['quantityAvailable'], metals['purchasePricePerUnit']), (60, 16))
+        self.assertEqual(MARKETPLACES["OE-PM"][0]['quantityAvailable'], 100, "Stored marketplace changed in place")
+        self.store.apply_order({**order, "order": {**order['order'], "pricePerUnit": 13}}, buying=False)
+        metals = next(good for good in self.store.get("OE-PM") if good['symbol'] == "METALS")
+        self.assertEqual((metals['quantityAvailable'], metals['sellPricePerUnit']), (100, 13))
+        self.store.apply_order({**order, "ship": {"location": "OE-UC"}}, buying=True)
+        self.assertNotIn("OE-UC", self.store, "Order at an unseen market shouldn't add it")
+
+class TestMarketplaceReads(unittest.TestCase):
+    def setUp(self):
+        with open('./SpaceTraders/constants/systems.json', 'r') as infile:
+            self.game = core.Game(TOKEN, json.load(infile))
+        self.calls = []
+        self.original = core.generic_get_call
+        core.generic_get_call = lambda endpoint, params=None, token=None: self.calls.append(endpoint) or \
+            {"location": {"marketplace": MARKETPLACES[endpoint.split("/")[2]]}}
+        MARKETS.clear()
+
+    def tearDown(self):
+        core.generic_get_call = self.original
+        MARKETS.clear()
+
+    def test_planning_reads_the_store(self):
+        for symbol in MARKETPLACES:
+            self.game.locations[symbol].marketplace()
+        self.assertEqual(len(self.calls), len(MARKETPLACES), "Polls should always call the API")
+        best = core.Market(self.game).best_buy("OE-PM-TR", "OE-PM")
+        self.assertEqual(best['symbol'], "CHEMICALS")
+        self.assertEqual(len(self.calls), len(MARKETPLACES), "Planning called the API for markets already in the store")
+        core.Market(self.game).best_buy("OE-PM-TR", "OE-PM", max_age=0)
+        self.assertEqual(len(self.calls), len(MARKETPLACES) + 2)
+
+if __name__ == '__main__':
+    unittest.main()
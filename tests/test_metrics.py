@@ -0,0 +1,82 @@
+import unittest
+import logging
+import json
+from SpaceTraders.metrics import Metrics, endpoint_template
+from SpaceTraders.ratelimit import RateLimiter
+from SpaceTraders.retry import RetryPolicy
+from SpaceTraders.transport import Transport
+from tests.test_transport import FakeClock, ScriptedSession, THROTTLED, SERVER_ERROR, NOT_FOUND, OK
+
+class TestEndpointTemplate(unittest.TestCase):
+    def test_ids_replaced(self):
+        cases = {
+            "users/JimHawkins/purchase-orders": "users/{u}/purchase-orders",
+            "users/JimHawkins/ships/ckn123/jettison": "users/{u}/ships/{ship}/jettison",
+            "users/JimHawkins/ships/ckn123/": "users/{u}/ships/{ship}",
+            "users/JimHawkins/flight-plans/fp1": "users/{u}/flight-plans/{flight}",
+            "game/locations/OE-PM/marketplace": "game/locations/{location}/marketplace",
+            "game/systems/OE/flight-plans": "game/systems/{system}/flight-plans",
+        }
+        for endpoint, template in cases.items():
+            self.assertEqual(endpoint_template(endpoint), template, f"Wrong template for {endpoint}")
+
+    def test_collections_kept(self):
+        self.assertEqual(endpoint_template("game/ships"), "game/ships")
+        self.assertEqual(endpoint_template("users/JimHawkins/ships"), "users/{u}/ships")
+        self.assertEqual(endpoint_template("game/status"), "game/status")
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        logging.disable()
+        self.clock = FakeClock()
+        self.metrics = Metrics()
+        limiter = RateLimiter(rate=1000, burst=1000, clock=self.clock, sleep=self.clock.sleep)
+        policy = RetryPolicy(max_attempts=3, rand=lambda: 0.5, clock=self.clock, sleep=self.clock.sleep)
+        self.transport = lambda responses: Transport("http://stand-in", session=ScriptedSession(responses), limiter=limiter,
+                                                     retry=policy, metrics=self.metrics)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_grouped_by_template(self):
+        transport = self.transport([OK(), OK(), OK()])
+        transport.request("GET", "game/locations/OE-PM/marketplace")
+        transport.request("GET", "game/locations/OE-CR/marketplace")
+        transport.request("POST", "users/JimHawkins/purchase-orders")
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot["GET game/locations/{location}/marketplace"]["requests"], 2, "Calls not grouped by endpoint template")
+        self.assertEqual(snapshot["POST users/{u}/purchase-orders"]["requests"], 1)
+
+    def test_retries_and_throttles(self):
+        self.transport([SERVER_ERROR(), THROTTLED({"Retry-After": "2"}), OK()]).request("GET", "game/status")
+        stats = self.metrics.snapshot()["GET game/status"]
+        self.assertEqual(stats["requests"], 1, "Retries should count as one request")
+        self.assertEqual(stats["retries"], 2)
+        self.assertEqual(stats["throttled"], 1, "42901 hit not counted")
+        self.assertGreaterEqual(stats["sleep"], 2, "Time waiting on the throttle not counted")
+        self.assertEqual(sum(stats["latency"]["buckets"].values()), 1, "Latency not recorded in the histogram")
+
+    def test_errors_counted(self):
+        self.transport([NOT_FOUND()]).request("GET", "game/status")
+        self.assertEqual(self.metrics.snapshot()["GET game/status"]["errors"], 1)
+
+    def test_latency_histogram(self):
+        self.metrics.observe("GET", "game/status", 0.07)
+        self.metrics.observe("GET", "game/status", 30)
+        buckets = self.metrics.snapshot()["GET game/status"]["latency"]["buckets"]
+        self.assertEqual(buckets["0.1"], 1, "Latency not put in the right bucket")
+        self.assertEqual(buckets["+Inf"], 1, "Slow request not put in the overflow bucket")
+
+    def test_exports(self):
+        self.metrics.observe("POST", "users/JimHawkins/sell-orders", 0.2, bytes_sent=100, bytes_received=500, attempts=2, throttled=1)
+        data = json.loads(self.metrics.to_json())
+        self.assertEqual(data["POST users/{u}/sell-orders"]["bytes_received"], 500)
+        text = self.metrics.to_prometheus()
+        self.assertIn('spacetraders_throttled_total{method="POST",endpoint="users/{u}/sell-orders"} 1', text)
+        self.assertIn('spacetraders_request_latency_seconds_bucket{method="POST",endpoint="users/{u}/sell-orders",le="0.25"} 1', text)
+        self.assertIn('spacetraders_request_latency_seconds_count{method="POST",endpoint="users/{u}/sell-orders"} 1', text)
+        self.metrics.reset()
+        self.assertEqual(self.metrics.snapshot(), {}, "Metrics not cleared")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import pickle
+from SpaceTraders.models import Model, ShipModel, LocationModel, UserModel
+from SpaceTraders.core import Ship, Location, User
+from tests.test_Core import DOCKED_SHIP, TRANSIT_SHIP
+
+TOKEN = "4c9f072a-4e95-48d6-bccd-54f1569bd3c5"
+
+LOCATION = {"symbol": "OE-PM", "type": "PLANET", "name": "Prime", "x": 20, "y": -25, "allowsConstruction": False, "structures": []}
+
+class TestModels(unittest.TestCase):
+    def test_ship_from_json(self):
+        ship = ShipModel.from_json(DOCKED_SHIP)
+        self.assertEqual(ship.as_dict(), DOCKED_SHIP, "as_dict doesn't round trip the API JSON")
+        self.assertEqual(getattr(ship, 'class'), "MK-I", "class not readable by its API name")
+        self.assertIsNone(ship.extra, "No unknown keys should mean no extra dict")
+
+    def test_ship_in_transit(self):
+        data = {k: v for k, v in DOCKED_SHIP.items() if k not in ('location', 'x', 'y')}
+        data['flightPlanId'] = "ckntps2t04056451cs636r6w96l"
+        ship = ShipModel.from_json(data)
+        self.assertEqual((ship.location, ship.x, ship.y), ("IN-TRANSIT", None, None), "Ship in transit not handled")
+        self.assertEqual(ship.get('flightPlanId'), "ckntps2t04056451cs636r6w96l", "Unknown key was dropped")
+
+    def test_unknown_key_kept_when_a_key_is_missing(self):
+        # 13 keys like a full ship - one known key swapped for an unknown one
+        data = {k: v for k, v in DOCKED_SHIP.items() if k != 'weapons'}
+        data['flightPlanId'] = "ckntps2t04056451cs636r6w96l"
+        self.assertEqual(ShipModel.from_json(data).get('flightPlanId'), "ckntps2t04056451cs636r6w96l", "Unknown key hidden by the key count")
+        location = {k: v for k, v in LOCATION.items() if k != 'structures'}
+        location['ships'] = []
+        self.assertEqual(LocationModel.from_json(location).get('ships'), [])
+        user = UserModel.from_json({"username": "JimHawkins", "credits": 10, "ships": [], "gold": 1})
+        self.assertEqual(user.get('gold'), 1)
+
+    def test_model_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Model()
+
+    def test_slotted(self):
+        for model in (Ship(TOKEN, DOCKED_SHIP), Location(TOKEN, LOCATION), User(TOKEN, {"username": "JimHawkins", "credits": 0, "ships": [], "loans": []})):
+            self.assertFalse(hasattr(model, '__dict__'), f"{type(model).__name__} has a __dict__")
+
+    def test_location(self):
+        location = LocationModel.from_json({**LOCATION, "ships": []})
+        self.assertEqual(location.as_dict(), LOCATION)
+        self.assertEqual(location.get('ships'), [], "Unknown key was dropped")
+        partial = LocationModel.from_json({"symbol": "OE-PM", "type": "PLANET", "name": "Prime", "x": 20, "y": -25})
+        self.assertEqual((partial.allowsConstruction, partial.structures), (False, []), "Missing fields not defaulted")
+
+    def test_user_builds_ships(self):
+        user = User(TOKEN, {"username": "JimHawkins", "credits": 10, "ships": [DOCKED_SHIP, TRANSIT_SHIP], "loans": []})
+        self.assertTrue(all(isinstance(ship, Ship) for ship in user.ships), "User ships are not Ship objects")
+        self.assertEqual(user.ships[0].token, TOKEN, "Ships were not given the user's token")
+        self.assertEqual(UserModel.from_json({"username": "JimHawkins", "credits": 10, "ships": [DOCKED_SHIP], "loans": []}).as_dict()['ships'],
+                         [DOCKED_SHIP])
+
+    def test_core_kwargs(self):
+        ship = Ship(TOKEN, DOCKED_SHIP, spaceAvailable=0)
+        self.assertEqual(ship.spaceAvailable, 0, "kwargs should override the JSON")
+        location = Location(TOKEN, symbol="OE-PM", x=1, y=2)
+        self.assertEqual((location.symbol, location.x), ("OE-PM", 1))
+
+    def test_pickle(self):
+        ship = Ship(TOKEN, DOCKED_SHIP)
+        copy = pickle.loads(pickle.dumps(ship))
+        self.assertEqual((copy.as_dict(), copy.token), (ship.as_dict(), TOKEN), "Slotted ship didn't survive pickling")
+
+if __name__ == '__main__':
+    unittest.main()
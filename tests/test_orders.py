@@ -0,0 +1,95 @@
+import unittest
+import logging
+import asyncio
+import httpx
+from SpaceTraders.orders import split_quantity, merge_orders, bulk_order, async_bulk_order
+from SpaceTraders.async_client import AsyncApi, AsyncTransport
+from SpaceTraders.ratelimit import RateLimiter
+from SpaceTraders.retry import RetryPolicy
+
+TOKEN = "0930cc36-7dc7-4cb1-8823-d8e72594d91e"
+USERNAME = "JimHawkins"
+
+def fake_order(shipId, good, quantity, price=10, credits=1000):
+    return {
+        "credits": credits,
+        "order": {"good": good, "quantity": quantity, "pricePerUnit": price, "total": quantity * price},
+        "ship": {"id": shipId, "cargo": [{"good": good, "quantity": quantity, "totalVolume": quantity}], "spaceAvailable": 0}
+    }
+
+class FakeMarket ():
+    def __init__(self, fail_after=None):
+        self.calls = []
+        self.credits = 100000
+        self.fail_after = fail_after
+
+    def place_order(self, shipId, good, quantity):
+        if self.fail_after is not None and len(self.calls) >= self.fail_after:
+            return None
+        self.calls.append(quantity)
+        self.credits -= quantity * 10
+        return fake_order(shipId, good, quantity, credits=self.credits)
+
+class TestOrders(unittest.TestCase):
+    def setUp(self):
+        logging.disable()
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_split_quantity(self):
+        self.assertEqual(split_quantity(650), [300, 300, 50], "Quantity not split into 300 unit chunks")
+        self.assertEqual(split_quantity(600), [300, 300], "Exact multiple has a trailing empty chunk")
+        self.assertEqual(split_quantity(20), [20], "Small quantity was split")
+        self.assertEqual(split_quantity(0), [], "Zero units should make no orders")
+
+    def test_merge_orders(self):
+        merged = merge_orders([fake_order("ship", "METALS", 300, price=10, credits=700),
+                               fake_order("ship", "METALS", 100, price=14, credits=100)])
+        self.assertEqual(merged['order']['quantity'], 400, "Units not totalled")
+        self.assertEqual(merged['order']['total'], 4400, "Cost not totalled across chunks")
+        self.assertEqual(merged['order']['pricePerUnit'], 11, "Price per unit isn't the average")
+        self.assertEqual(merged['credits'], 100, "Credits should be from the last chunk")
+        self.assertEqual(len(merged['orders']), 2, "Chunk orders not kept")
+
+    def test_bulk_order(self):
+        market = FakeMarket()
+        merged = bulk_order(market.place_order, "ship", "METALS", 700)
+        self.assertEqual(market.calls, [300, 300, 100], "Chunks not placed back to back")
+        self.assertEqual(merged['order']['total'], 7000, "Merged order under-reports the cost")
+        self.assertEqual(merged['credits'], market.credits, "Credits aren't the final state")
+
+    def test_bulk_order_stops_on_failure(self):
+        market = FakeMarket(fail_after=1)
+        merged = bulk_order(market.place_order, "ship", "METALS", 700)
+        self.assertEqual(market.calls, [300], "Kept ordering after a chunk failed")
+        self.assertEqual(merged['order']['quantity'], 300, "Merged order should only hold what was ordered")
+        self.assertIsNone(bulk_order(FakeMarket(fail_after=0).place_order, "ship", "METALS", 700),
+                          "A failed first chunk should return the failure")
+
+    def test_bulk_order_no_units(self):
+        market = FakeMarket()
+        self.assertIsNone(bulk_order(market.place_order, "ship", "FUEL", 0), "Ordering nothing should return None")
+        async def place_order(shipId, good, quantity):
+            return market.place_order(shipId, good, quantity)
+        self.assertIsNone(asyncio.run(async_bulk_order(place_order, "ship", "FUEL", 0)))
+        self.assertEqual(market.calls, [], "Ordered zero units")
+
+    def test_async_bulk_purchase_order(self):
+        quantities = []
+        def handler(request):
+            quantity = int(request.url.params['quantity'])
+            quantities.append(quantity)
+            return httpx.Response(201, json=fake_order(request.url.params['shipId'], request.url.params['good'], quantity))
+        session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        transport = AsyncTransport("http://stand-in", session=session, limiter=RateLimiter(rate=1000, burst=1000),
+                                   retry=RetryPolicy(base_delay=0))
+        async def run():
+            async with AsyncApi(USERNAME, TOKEN, transport=transport) as api:
+                return await api.purchaseOrders.new_bulk_purchase_order("ship", "METALS", 650)
+        merged = asyncio.run(run())
+        self.assertEqual(quantities, [300, 300, 50], "Async bulk order not chunked")
+        self.assertEqual(merged['order']['total'], 6500, "Async merged order under-reports the cost")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import copy
+import json
+import logging
+import unittest
+from SpaceTraders import reconcile, core
+from SpaceTraders.core import User, Location
+from tests.test_Core import USER, DOCKED_SHIP
+from tests.test_transport import FakeClock
+
+TOKEN = "4c9f072a-4e95-48d6-bccd-54f1569bd3c5"
+SHIP_ID = "cknoj8i776706221ds6cs4n42m0"
+
+class TestReconcile(unittest.TestCase):
+    def setUp(self):
+        logging.disable()
+        self.user = User(TOKEN, copy.deepcopy(USER))
+        self.ship = self.user.get_ship(SHIP_ID)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_order(self):
+        order = {"credits": 1000, "order": {"good": "FUEL", "quantity": 1, "pricePerUnit": 2, "total": 2},
+                 "ship": {**self.ship.as_dict(), "cargo": [{"good": "FUEL", "quantity": 50, "totalVolume": 50}], "spaceAvailable": 0}}
+        reconcile.apply_order(self.user, order)
+        self.assertEqual(self.user.credits, 1000, "Credits not taken from the order")
+        self.assertEqual((self.ship.get_fuel_level(), self.ship.spaceAvailable), (50, 0), "Ship not taken from the order")
+
+    def test_flight(self):
+        flight = {"id": "flight", "shipId": SHIP_ID, "fuelConsumed": 9, "fuelRemaining": 40, "timeRemainingInSeconds": 60,
+                  "destination": "OE-UC", "departure": "OE-PM", "distance": 30}
+        reconcile.apply_departure(self.user, flight)
+        self.assertEqual((self.ship.location, self.ship.x), ("IN-TRANSIT", None), "Ship not in transit")
+        self.assertEqual((self.ship.get_fuel_level(), self.ship.spaceAvailable), (40, 10), "Fuel not burnt")
+        reconcile.apply_arrival(self.user, flight, Location(TOKEN, symbol="OE-UC", x=-18, y=-35))
+        self.assertEqual((self.ship.location, self.ship.x, self.ship.y), ("OE-UC", -18, -35), "Ship didn't land")
+        self.assertIs(self.user.ships.where(location="OE-UC").first(), self.ship, "Fleet not re-indexed on landing")
+
+    def test_ship_purchase_and_loans(self):
+        reconcile.apply_ship_purchase(self.user, {"credits": 5, "ship": {**DOCKED_SHIP, "id": "bought"}})
+        self.assertEqual((self.user.credits, self.user.get_ship("bought").id), (5, "bought"))
+        loan = {"id": "loan", "due": "2021-05-21T11:41:34.403Z", "repaymentAmount": 280000, "status": "CURRENT", "type": "STARTUP"}
+        reconcile.apply_loan(self.user, {"credits": 200005, "loan": loan})
+        self.assertEqual((self.user.credits, self.user.loans[-1]), (200005, loan), "Loan not added")
+        reconcile.apply_loan(self.user, {"credits": 5, "loans": []})
+        self.assertEqual((self.user.credits, self.user.loans), (5, []), "Paid loan not removed")
+
+    def test_paid_loan_user_wrapper(self):
+        loan = {"id": "loan", "due": "2021-05-21T11:41:34.403Z", "repaymentAmount": 280000, "status": "PAID", "type": "STARTUP"}
+        reconcile.apply_loan(self.user, {"user": {"username": USER['username'], "credits": 7, "ships": USER['ships'], "loans": [loan]}})
+        self.assertEqual((self.user.credits, self.user.loans), (7, [loan]), "Credits & loans nested under user not applied")
+
+    def test_land_without_fetching(self):
+        flight = {"id": "flight", "shipId": SHIP_ID, "destination": "OE-UC", "departure": "OE-PM"}
+        original = core.load_systems
+        core.load_systems = lambda token: self.fail("Landing fetched the systems")
+        try:
+            with open('./SpaceTraders/constants/systems.json', 'r') as infile:
+                game = core.Game(TOKEN, json.load(infile))
+            self.user.land(flight, game)
+            self.assertEqual((self.ship.location, self.ship.x, self.ship.y), ("OE-UC", game.locations["OE-UC"].x, game.locations["OE-UC"].y))
+            self.user.land({**flight, "destination": "NOT-A-PLACE"})
+            self.assertEqual((self.ship.location, self.ship.x), ("NOT-A-PLACE", None), "Unknown location should leave x & y unknown")
+        finally:
+            core.load_systems = original
+
+    def test_drift(self):
+        clock = FakeClock()
+        check = reconcile.DriftCheck(interval=60, clock=clock)
+        self.assertFalse(check.due())
+        clock.sleep(60)
+        self.assertTrue(check.due(), "Check not due after the interval")
+        self.assertEqual(check.check(self.user, copy.deepcopy(USER)), [], "Matching state reported as drift")
+        self.assertFalse(check.due(), "Checking didn't restart the interval")
+        fetched = copy.deepcopy(USER)
+        fetched['credits'] += 1
+        fetched['ships'][0]['cargo'] = []
+        fetched['ships'][0]['spaceAvailable'] = 50
+        fetched['ships'].pop()
+        drift = check.check(self.user, fetched)
+        self.assertEqual(len(drift), 3, f"Not every drift was found: {drift}")
+        self.assertEqual((self.user.credits, len(self.user.ships)), (fetched['credits'], 5), "Drift not repaired")
+        self.assertEqual(self.ship.get_fuel_level(), 0, "Drifted ship not reloaded")
+        self.assertEqual(check.check(self.user, fetched), [], "Repair didn't bring the user in line")
+
+if __name__ == '__main__':
+    unittest.main()
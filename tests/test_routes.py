@@ -0,0 +1,80 @@
+import math
+import unittest
+import itertools
+from SpaceTraders.arbitrage import ArbitrageEngine
+from SpaceTraders.routes import RoutePlanner
+from SpaceTraders.flights import FlightTimeModel
+from SpaceTraders.standin import SimulatedWorld, generate_systems
+from SpaceTraders.world import World
+from SpaceTraders.core import Ship
+from tests.test_Core import DOCKED_SHIP
+
+TOKEN = "4c9f072a-4e95-48d6-bccd-54f1569bd3c5"
+
+def best_leg(engine, world, ship, credits, i, j):
+    # The best trade flying from i to j worked out one good at a time
+    fuel = int(world.fuel_matrix(ship.kind)[world.index[i], world.index[j]])
+    fuel_price = engine.purchase[engine.location_index[i], engine.good_index["FUEL"]] if "FUEL" in engine.good_index else math.nan
+    fuel_cost = 0 if math.isnan(fuel_price) else fuel * fuel_price
+    if ship.maxCargo - fuel <= 0 or credits - fuel_cost < 0:
+        return None
+    gain = 0
+    for g, symbol in enumerate(engine.goods):
+        f, t = engine.location_index[i], engine.location_index[j]
+        if math.isnan(engine.profit[f, t, g]):
+            continue
+        units = min((ship.maxCargo - fuel) // engine.volume[f, g], (credits - fuel_cost) // engine.purchase[f, g], engine.quantity[f, g])
+        gain = max(gain, max(units, 0) * engine.profit[f, t, g])
+    return gain - fuel_cost
+
+def brute_force(engine, world, ship, credits, max_legs):
+    start, best = ship.location, 0.0
+    others = [s for s in engine.locations if s != start and world.systems[world.index[s]] == world.systems[world.index[start]]]
+    for legs in range(2, max_legs + 1):
+        for middle in itertools.permutations(others, legs - 1):
+            path, money, profit, seconds = (start, *middle, start), credits, 0.0, 0.0
+            for i, j in zip(path, path[1:]):
+                net = best_leg(engine, world, ship, money, i, j)
+                if net is None:
+                    break
+                money, profit = money + net, profit + net
+                seconds += float(FlightTimeModel()(world.distance[world.index[i], world.index[j]], ship.speed))
+            else:
+                best = max(best, profit / (seconds / 3600))
+    return best
+
+class TestRoutePlanner(unittest.TestCase):
+    def setUp(self):
+        systems = generate_systems(systems=1, locations=7, seed=3)
+        self.world = World(systems)
+        simulated = SimulatedWorld(systems, seed=3)
+        self.markets = {symbol: simulated.marketplace(symbol) for symbol in simulated.markets}
+        self.engine = ArbitrageEngine(self.markets)
+        start = next(iter(self.markets))
+        self.ship = Ship(TOKEN, {**DOCKED_SHIP, "location": start})
+
+    def test_matches_brute_force(self):
+        planner = RoutePlanner(self.engine, self.world)
+        for credits, legs in [(None, 3), (5000, 3), (50000, 4)]:
+            cycle = planner.plan(self.ship, credits, max_legs=legs, beam_width=10000)
+            expected = brute_force(self.engine, self.world, self.ship, 1e18 if credits is None else credits, legs)
+            self.assertAlmostEqual(cycle['profit_per_hour'], expected, places=6, msg=f"Not the best cycle with {credits} credits over {legs} legs")
+
+    def test_cycle(self):
+        cycle = RoutePlanner(self.engine, self.world).plan(self.ship, 20000)
+        self.assertEqual(cycle['locations'][0], self.ship.location)
+        self.assertEqual(cycle['locations'][-1], self.ship.location, "Cycle doesn't return home")
+        self.assertEqual(len(set(cycle['locations'][1:-1])), len(cycle['locations']) - 2, "Cycle visits a location twice")
+        self.assertAlmostEqual(sum(leg['profit'] for leg in cycle['legs']), cycle['profit'])
+        self.assertAlmostEqual(cycle['profit_per_hour'], cycle['profit'] / (cycle['seconds'] / 3600))
+        for leg in cycle['legs']:
+            if leg['symbol'] is not None:
+                volume = next(good['volumePerUnit'] for good in self.markets[leg['from']] if good['symbol'] == leg['symbol'])
+                self.assertLessEqual(leg['units'] * volume + leg['fuel_required'], self.ship.maxCargo, "Cargo over the ship's max")
+
+    def test_credits_limit_trades(self):
+        cycle = RoutePlanner(self.engine, self.world).plan(self.ship, 0)
+        self.assertTrue(cycle is None or all(leg['units'] == 0 for leg in cycle['legs'][:1]), "Bought goods with no credits")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import json
+import mmap
+import tempfile
+import unittest
+import numpy as np
+from SpaceTraders.snapshot import write_snapshot, load_snapshot, SNAPSHOT_VERSION, _PREAMBLE, MAGIC
+from SpaceTraders.world import World, get_world
+from SpaceTraders.standin import generate_systems
+from SpaceTraders.core import Game
+
+TOKEN = "4c9f072a-4e95-48d6-bccd-54f1569bd3c5"
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "world.snapshot")
+        # Systems no other test has shared a world for
+        self.systems = generate_systems(2, 9, seed=19)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        written = write_snapshot(self.path, self.systems)
+        loaded = load_snapshot(self.path)
+        self.assertEqual(loaded.symbols, written.symbols)
+        np.testing.assert_array_equal(loaded.distance, written.distance)
+        for kind in ("MK-I", "MK-II", "MK-III"):
+            np.testing.assert_array_equal(loaded.fuel_matrix(kind), World(self.systems).fuel_matrix(kind))
+        for name in World.TABLES + ("distance",):
+            np.testing.assert_array_equal(getattr(loaded, name), getattr(written, name))
+            base = getattr(loaded, name)
+            while isinstance(base, np.ndarray):
+                base = base.base
+            self.assertIsInstance(getattr(base, 'obj', base), mmap.mmap, f"{name} table was worked out again rather than mapped")
+            self.assertFalse(getattr(loaded, name).flags.writeable)
+        self.assertIs(get_world(self.systems), loaded, "Loaded world not shared")
+        self.assertEqual(os.listdir(self.directory.name), ["world.snapshot"], "Temporary file left behind")
+
+    def test_refuses_other_versions(self):
+        write_snapshot(self.path, self.systems)
+        with open(self.path, 'r+b') as outfile:
+            outfile.write(_PREAMBLE.pack(MAGIC, SNAPSHOT_VERSION + 1, 0))
+        with self.assertRaises(ValueError):
+            load_snapshot(self.path)
+        with open(self.path, 'wb') as outfile:
+            outfile.write(b"not a snapshot")
+        with self.assertRaises(ValueError):
+            load_snapshot(self.path)
+
+    def test_game_from_snapshot(self):
+        with open('./SpaceTraders/constants/systems.json', 'r') as infile:
+            systems = json.load(infile)
+        write_snapshot(self.path, systems)
+        game = Game.from_snapshot(TOKEN, self.path)
+        self.assertEqual(set(game.locations), {loc['symbol'] for system in systems for loc in system['locations']})
+        self.assertEqual(game.world.fuel("OE-PM", "OE-PM-TR", "MK-I"), World(systems).fuel("OE-PM", "OE-PM-TR", "MK-I"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import math
+import random
+import unittest
+from SpaceTraders.spatial import SpatialIndex, get_spatial_index, system_of
+from SpaceTraders.standin import generate_systems
+from SpaceTraders.models import LocationModel
+from SpaceTraders.core import Game, Ship, Location
+from tests.test_Core import DOCKED_SHIP
+
+TOKEN = "4c9f072a-4e95-48d6-bccd-54f1569bd3c5"
+
+def brute_force(locations, x, y, system, exclude=(), exclude_types=()):
+    """Every location in the system closest first - what the index should agree with"""
+    found = [loc for loc in locations if system_of(loc.symbol) == system and loc.symbol not in exclude and loc.type not in exclude_types]
+    return sorted(found, key=lambda loc: (math.hypot(loc.x - x, loc.y - y), loc.symbol))
+
+class TestSpatialIndex(unittest.TestCase):
+    def setUp(self):
+        self.locations = [LocationModel.from_json(loc) for system in generate_systems(3, 40, seed=4) for loc in system['locations']]
+        self.index = SpatialIndex(self.locations)
+        self.random = random.Random(7)
+
+    def test_matches_brute_force(self):
+        for _ in range(200):
+            loc = self.random.choice(self.locations)
+            x, y = loc.x + self.random.randint(-60, 60), loc.y + self.random.randint(-60, 60)
+            system = system_of(loc.symbol)
+            expected = brute_force(self.locations, x, y, system, exclude=(loc.symbol,))
+            k = self.random.randint(1, 10)
+            found = self.index.k_nearest(x, y, system, k, exclude=loc.symbol)
+            self.assertEqual([l.symbol for l, _ in found], [l.symbol for l in expected[:k]], "k nearest doesn't match a linear scan")
+            self.assertEqual(found[0], self.index.nearest(x, y, system, exclude=loc.symbol))
+            radius = self.random.randint(0, 80)
+            within = self.index.within(x, y, system, radius, exclude=loc.symbol)
+            self.assertEqual([l.symbol for l, _ in within], [l.symbol for l in expected if math.hypot(l.x - x, l.y - y) <= radius],
+                             "Within radius doesn't match a linear scan")
+
+    def test_type_filters(self):
+        loc = self.locations[0]
+        found = self.index.k_nearest(loc.x, loc.y, system_of(loc.symbol), len(self.locations), exclude_types="WORMHOLE")
+        self.assertTrue(found and all(l.type != "WORMHOLE" for l, _ in found), "Wormholes were not excluded")
+        found = self.index.k_nearest(loc.x, loc.y, system_of(loc.symbol), len(self.locations), types=["WORMHOLE"])
+        self.assertEqual(len(found), 2, "Only the system's wormholes should be returned")
+
+    def test_unknown_system(self):
+        self.assertIsNone(self.index.nearest(0, 0, "ZZ"), "A system with no locations has no nearest")
+
+class TestClosestLocation(unittest.TestCase):
+    def setUp(self):
+        with open('./SpaceTraders/constants/systems.json', 'r') as infile:
+            self.systems = json.load(infile)
+        self.game = Game(TOKEN, self.systems)
+        self.ship = Ship(TOKEN, DOCKED_SHIP)
+
+    def test_closest_location(self):
+        closest, distance = self.ship.get_closest_location(self.game)
+        self.assertIsInstance(closest, Location)
+        self.assertNotEqual(closest.symbol, self.ship.location, "Returned the location the ship is already at")
+        others = [loc for s, loc in self.game.locations.items() if s != self.ship.location and system_of(s) == system_of(self.ship.location)]
+        self.assertEqual(distance, min(self.ship.calculate_distance(loc.x, loc.y) for loc in others))
+
+    def test_excludes_wormholes(self):
+        found = self.game.spatial.k_nearest(self.ship.x, self.ship.y, "OE", 100, exclude_types="WORMHOLE")
+        self.assertNotIn("WORMHOLE", [loc.type for loc, _ in found])
+        self.assertIs(get_spatial_index(self.systems), get_spatial_index(self.systems), "Shared index rebuilt")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import unittest
+import logging
+from SpaceTraders.standin import StandInServer, SimulatedWorld, ApiError, generate_systems, flight_seconds
+from SpaceTraders.client import Api
+from SpaceTraders.transport import Transport
+from SpaceTraders.ratelimit import RateLimiter
+from SpaceTraders.retry import RetryPolicy
+from SpaceTraders.metrics import Metrics
+from tests.test_transport import FakeClock
+
+TOKEN = "0930cc36-7dc7-4cb1-8823-d8e72594d91e"
+USERNAME = "JimHawkins"
+RECORDED = os.path.join(os.path.dirname(__file__), "api_return_expected.json")
+
+class TestSimulatedWorld(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.world = SimulatedWorld(generate_systems(2, 6, seed=1), seed=1, clock=self.clock)
+        self.token = self.world.add_user(USERNAME, TOKEN, credits=1000000)
+        self.user = self.world.user(TOKEN)
+        self.location = next(s for s, loc in self.world.locations.items() if loc['type'] != "WORMHOLE")
+        self.ship = self.world.buy_ship(self.user, {"type": "GR-MK-III", "location": self.location})['ship']
+
+    def test_generated_world(self):
+        systems = generate_systems(3, 5, seed=2)
+        self.assertEqual(len(systems), 3)
+        self.assertEqual(systems, generate_systems(3, 5, seed=2), "Generator isn't reproducible")
+        for system in systems:
+            self.assertTrue(all(loc['symbol'][:2] == system['symbol'] for loc in system['locations']), "Location not in its system")
+            self.assertEqual(sum(loc['type'] == "WORMHOLE" for loc in system['locations']), 2, "Systems not joined by wormholes")
+
+    def test_order_limit(self):
+        with self.assertRaises(ApiError) as error:
+            self.world.purchase(self.user, {"shipId": self.ship['id'], "good": "FUEL", "quantity": 301})
+        self.assertEqual(error.exception.code, 42201, "Orders over 300 units should be rejected")
+
+    def test_cargo_and_credits(self):
+        credits = self.user['credits']
+        order = self.world.purchase(self.user, {"shipId": self.ship['id'], "good": "FUEL", "quantity": 300})
+        self.assertEqual(order['ship']['spaceAvailable'], 700, "Cargo space not taken")
+        self.assertEqual(order['credits'], credits - order['order']['total'], "Credits not charged")
+        sold = self.world.sell(self.user, {"shipId": self.ship['id'], "good": "FUEL", "quantity": 100})
+        self.assertEqual(sold['ship']['cargo'][0]['quantity'], 200, "Cargo not offloaded")
+        with self.assertRaises(ApiError):
+            self.world.sell(self.user, {"shipId": self.ship['id'], "good": "FUEL", "quantity": 201})
+
+    def test_buying_moves_the_price(self):
+        before = {m['symbol']: m['purchasePricePerUnit'] for m in self.world.marketplace(self.location)}
+        for _ in range(3):
+            self.world.purchase(self.user, {"shipId": self.ship['id'], "good": "FUEL", "quantity": 300})
+        after = {m['symbol']: m['purchasePricePerUnit'] for m in self.world.marketplace(self.location)}
+        self.assertGreaterEqual(after["FUEL"], before["FUEL"], "Buying stock should not lower the price")
+
+    def test_flight(self):
+        destination = next(s for s, loc in self.world.locations.items() if s[:2] == self.location[:2] and s != self.location)
+        with self.assertRaises(ApiError, msg="Flew without fuel"):
+            self.world.fly(self.user, {"shipId": self.ship['id'], "destination": destination})
+        self.world.purchase(self.user, {"shipId": self.ship['id'], "good": "FUEL", "quantity": 100})
+        plan = self.world.fly(self.user, {"shipId": self.ship['id'], "destination": destination})['flightPlan']
+        self.assertLess(self.world._cargo(self.ship, "FUEL")['quantity'], 100, "Fuel not burnt")
+        self.assertEqual(plan['timeRemainingInSeconds'], flight_seconds(plan['distance'], self.ship['speed']))
+        self.assertNotIn('location', self.world.user(TOKEN)['ships'][0], "Ship should be in transit")
+        self.clock.sleep(plan['timeRemainingInSeconds'])
+        self.assertEqual(self.world.user(TOKEN)['ships'][0]['location'], destination, "Ship did not arrive")
+
+    def test_time_scale(self):
+        self.world.time_scale = 10
+        destination = next(s for s, loc in self.world.locations.items() if s[:2] == self.location[:2] and s != self.location)
+        self.world.purchase(self.user, {"shipId": self.ship['id'], "good": "FUEL", "quantity": 100})
+        plan = self.world.fly(self.user, {"shipId": self.ship['id'], "destination": destination})['flightPlan']
+        self.assertLessEqual(plan['timeRemainingInSeconds'], flight_seconds(plan['distance'], self.ship['speed']) / 10 + 1, "Flight not scaled")
+
+    def test_bad_token(self):
+        with self.assertRaises(ApiError) as error:
+            self.world.user("not-a-token")
+        self.assertEqual(error.exception.status, 401)
+
+class TestStandInServer(unittest.TestCase):
+    def setUp(self):
+        logging.disable()
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_api_against_server(self):
+        with StandInServer(SimulatedWorld(time_scale=1000), throttle=False) as server:
+            server.world.seed(RECORDED, TOKEN)
+            transport = Transport(server.url, limiter=RateLimiter(rate=1000, burst=1000))
+            api = Api(USERNAME, TOKEN, transport=transport)
+            self.assertIn('status', api.game.get_game_status())
+            user = api.users.get_your_info()['user']
+            self.assertEqual(user['username'], USERNAME, "Recorded user not seeded")
+            ship = next(s for s in user['ships'] if 'location' in s)
+            market = api.marketplace.get_marketplace(ship['location'])['location']['marketplace']
+            self.assertTrue(any(m['symbol'] == "FUEL" for m in market), "Marketplace not served")
+            order = api.sellOrders.new_sell_order(ship['id'], "FUEL", 1)
+            self.assertEqual(order['order']['quantity'], 1)
+            self.assertFalse(api.purchaseOrders.new_purchase_order(ship['id'], "FUEL", 301), "Over sized order was accepted")
+            transport.close()
+
+    def test_throttle(self):
+        metrics = Metrics()
+        with StandInServer(SimulatedWorld(generate_systems(1, 3)), rate=2, burst=2) as server:
+            transport = Transport(server.url, limiter=RateLimiter(rate=1000, burst=1000), retry=RetryPolicy(max_attempts=10), metrics=metrics)
+            for _ in range(4):
+                self.assertTrue(transport.request("GET", "game/status").ok, "Throttled request was not retried")
+            transport.close()
+        self.assertGreater(server.throttle.rejected, 0, "Server never throttled")
+        self.assertEqual(metrics.snapshot()["GET game/status"]["throttled"], server.throttle.rejected, "42901 hits not recorded")
+
+if __name__ == '__main__':
+    unittest.main()
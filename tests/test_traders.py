@@ -0,0 +1,114 @@
+import sys
+import copy
+import json
+import unittest
+import subprocess
+from SpaceTraders import traders, core
+from SpaceTraders.flights import FlightTimeModel
+from SpaceTraders.impact import PriceImpactModel
+from SpaceTraders.markets import MARKETS as MARKET_STORE
+from tests.test_Core import USER, DOCKED_SHIP
+from tests.test_arbitrage import MARKETS
+
+TOKEN = "4c9f072a-4e95-48d6-bccd-54f1569bd3c5"
+
+class TestTradingContext(unittest.TestCase):
+    def setUp(self):
+        with open('./SpaceTraders/constants/systems.json', 'r') as infile:
+            self.systems = json.load(infile)
+
+    def test_import_is_cheap(self):
+        code = "import sys, SpaceTraders.traders; print(sorted(m for m in ('pandas', 'rich', 'sqlalchemy') if m in sys.modules))"
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), "[]", "Importing the traders pulled in heavy modules")
+        self.assertIsNone(traders.CONTEXT._game, "Importing the traders made the game")
+        self.assertIsNone(traders.CONTEXT._user, "Importing the traders fetched the user")
+
+    def test_lazy_game(self):
+        context = traders.TradingContext("JimHawkins", TOKEN, self.systems)
+        self.assertIsNone(context._game)
+        game = context.game
+        self.assertIsInstance(game, core.Game)
+        self.assertIs(context.game, game, "Game made more than once")
+        self.assertEqual(context.token, TOKEN)
+
+    def test_user_made_once(self):
+        context = traders.TradingContext("JimHawkins", TOKEN)
+        calls = []
+        original = core.get_user
+        core.get_user = lambda token, username: calls.append(username) or core.User(token, USER)
+        try:
+            self.assertIs(context.user, context.user, "User fetched more than once")
+        finally:
+            core.get_user = original
+        self.assertEqual(calls, ["JimHawkins"])
+
+    def test_fleet_planned_in_one_call(self):
+        context = traders.TradingContext("JimHawkins", TOKEN, self.systems)
+        context._user = core.User(TOKEN, USER)
+        docked = [ship for ship in context.user.ships if ship.location != "IN-TRANSIT"][:2]
+        context.traders.update(ship.id for ship in docked)
+        calls = []
+        def plan_fleet(context, ships, reserved=(), credits=None):
+            calls.append([ship.id for ship in ships])
+            return {ship.id: {"from": ship.location, "to": "OE-PM", "symbol": "METALS", "units": 1, "total_cost": 1} for ship in ships}
+        original_plan, original_get = traders.plan_fleet, core.generic_get_call
+        traders.plan_fleet = plan_fleet
+        core.generic_get_call = lambda endpoint, params=None, token=None: {"location": {"marketplace": []}}
+        try:
+            trades = [context.assignment(ship) for ship in docked]
+        finally:
+            traders.plan_fleet, core.generic_get_call = original_plan, original_get
+        self.assertEqual(len(calls), 1, "Each ship planned on its own")
+        self.assertEqual(sorted(calls[0]), sorted(ship.id for ship in docked))
+        self.assertEqual([trade['from'] for trade in trades], [ship.location for ship in docked])
+        self.assertEqual(set(context.active), {ship.id for ship in docked})
+
+    def test_plan_fleet_uses_its_context(self):
+        context = traders.TradingContext("JimHawkins", TOKEN, self.systems)
+        context._user = core.User(TOKEN, copy.deepcopy(USER))
+        context._flight_time = FlightTimeModel(8, 30, overhead=600)
+        context._price_impact = PriceImpactModel({"METALS": 0.2})
+        ship = context.user.get_ship("cknppm8el10590111bs6dmm0o7z8")
+        planners = []
+        def fleet_planner(*args, **kwargs):
+            planners.append(original_planner(*args, **kwargs))
+            return planners[-1]
+        def get_call(endpoint, params=None, token=None):
+            return {"location": {"marketplace": MARKETS.get(endpoint.split("/")[2], [])}}
+        original_context, original_get, original_planner = traders.CONTEXT, core.generic_get_call, traders.FleetPlanner
+        # The global context is broken so any use of it fails the test
+        traders.CONTEXT, core.generic_get_call, traders.FleetPlanner = None, get_call, fleet_planner
+        MARKET_STORE.clear()
+        try:
+            trade = traders.plan_fleet(context, [ship])[ship.id]
+        finally:
+            traders.CONTEXT, core.generic_get_call, traders.FleetPlanner = original_context, original_get, original_planner
+            MARKET_STORE.clear()
+        self.assertEqual((trade['from'], trade['to']), ("OE-PM-TR", "OE-PM"))
+        world = context.game.world
+        distance = world.distance[world.index["OE-PM-TR"], world.index["OE-PM"]]
+        self.assertAlmostEqual(trade['seconds'], context.flight_time(distance, ship.speed), msg="Not timed by the context's flight time")
+        self.assertIs(planners[0].price_impact, context.price_impact, "Not sized by the context's price impact")
+
+    def test_relocation_skips_wormholes(self):
+        # A wormhole right next to the ship and a planet further off - the ship should head for the planet
+        here = {"symbol": "OE-PM", "type": "PLANET", "name": "Prime", "x": 20, "y": -25}
+        wormhole = {"symbol": "OE-W-XV", "type": "WORMHOLE", "name": "Wormhole", "x": 21, "y": -25}
+        planet = {"symbol": "OE-CR", "type": "PLANET", "name": "Carth", "x": 30, "y": -25}
+        ship = core.Ship(TOKEN, DOCKED_SHIP)
+        original = traders.CONTEXT
+        try:
+            traders.CONTEXT = traders.TradingContext("JimHawkins", TOKEN, [{"symbol": "OE", "name": "Omicron Eridani", "locations": [here, wormhole, planet]}])
+            self.assertEqual(traders.relocation(ship)['to'], "OE-CR", "Sent the ship to a wormhole")
+            traders.CONTEXT = traders.TradingContext("JimHawkins", TOKEN, [{"symbol": "OE", "name": "Omicron Eridani", "locations": [here, wormhole]}])
+            self.assertIsNone(traders.relocation(ship), "Only a wormhole to go to")
+        finally:
+            traders.CONTEXT = original
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            traders.not_a_thing
+
+if __name__ == '__main__':
+    unittest.main()
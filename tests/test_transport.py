@@ -0,0 +1,278 @@
+import time
+import unittest
+import logging
+import threading
+from SpaceTraders.ratelimit import RateLimiter
+from SpaceTraders.retry import RetryPolicy, retry_after
+from SpaceTraders.transport import Transport, request_key
+from SpaceTraders.scheduler import PriorityScheduler, priority, current_priority, CRITICAL, NORMAL, BACKGROUND
+
+class FakeClock():
+    """A clock that only moves when something sleeps on it"""
+    def __init__(self):
+        self.now = 0.0
+        self.lock = threading.Lock()
+    def __call__(self):
+        return self.now
+    def sleep(self, seconds):
+        with self.lock:
+            self.now += seconds
+
+def wait_until(test, condition, message, timeout=5):
+    """Waits for another thread to make condition true - fails the test rather than hanging if it never does"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            test.fail(message)
+        time.sleep(0.001)
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        logging.disable()
+        self.clock = FakeClock()
+        self.limiter = RateLimiter(rate=2, burst=2, clock=self.clock, sleep=self.clock.sleep)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_burst_is_free(self):
+        self.assertEqual(self.limiter.acquire(), 0, "First request in the burst should not wait")
+        self.assertEqual(self.limiter.acquire(), 0, "Second request in the burst should not wait")
+
+    def test_paces_after_burst(self):
+        waits = [self.limiter.reserve() for _ in range(4)]
+        self.assertEqual(waits, [0, 0, 0.5, 1.0], "Requests after the burst were not spaced at the configured rate")
+
+    def test_refills_over_time(self):
+        self.limiter.acquire()
+        self.limiter.acquire()
+        self.clock.sleep(1)
+        self.assertEqual(self.limiter.acquire(), 0, "Bucket did not refill over time")
+
+    def test_wait_metrics(self):
+        for _ in range(4):
+            self.limiter.acquire()
+        stats = self.limiter.stats()
+        self.assertEqual(stats['requests'], 4)
+        self.assertEqual(stats['waits'], 2)
+        self.assertAlmostEqual(stats['total_wait'], 1.0)
+
+    def test_configure(self):
+        self.limiter.configure(rate=10, burst=1)
+        self.limiter.reserve()
+        self.assertAlmostEqual(self.limiter.reserve(), 0.1, msg="New rate was not applied")
+
+    def test_shared_between_threads(self):
+        waits = []
+        threads = [threading.Thread(target=lambda: waits.append(self.limiter.reserve())) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sorted(waits), [0, 0, 0.5, 1.0, 1.5, 2.0], "Threads did not share the one bucket")
+
+class FakeResponse():
+    def __init__(self, status_code, body, headers=None):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.body = body
+        self.headers = headers or {}
+    def json(self):
+        return self.body
+
+THROTTLED = lambda headers=None: FakeResponse(429, {"error": {"code": 42901, "message": "Throttle"}}, headers)
+SERVER_ERROR = lambda: FakeResponse(500, {"error": {"code": 500, "message": "Server error"}})
+NOT_FOUND = lambda: FakeResponse(404, {"error": {"code": 404, "message": "Not found"}})
+OK = lambda: FakeResponse(200, {"status": "up"})
+
+class ScriptedSession():
+    """Stands in for a requests.Session and replies with the responses given, in order"""
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent = 0
+    def mount(self, prefix, adapter):
+        pass
+    def _send(self, url, headers=None, params=None):
+        self.sent += 1
+        return self.responses.pop(0)
+    def __getattr__(self, name):
+        return self._send
+
+class TestRetryPolicy(unittest.TestCase):
+    def setUp(self):
+        logging.disable()
+        self.clock = FakeClock()
+        self.policy = RetryPolicy(max_attempts=4, deadline=30, base_delay=1, max_delay=5, rand=lambda: 1.0, clock=self.clock, sleep=self.clock.sleep)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_classification(self):
+        for code in (42901, 409, 500):
+            self.assertTrue(self.policy.is_retryable(code), f"{code} should be retried")
+        self.assertFalse(self.policy.is_retryable(404), "404 should be fatal")
+        self.assertIsNone(self.policy.next_delay(404, 1, 0), "Fatal errors should not be retried")
+        self.assertIsNone(self.policy.next_delay(None, 1, 0), "Successful calls should not be retried")
+
+    def test_exponential_backoff_is_capped(self):
+        self.assertEqual([self.policy.backoff(a) for a in range(1, 6)], [1, 2, 4, 5, 5])
+
+    def test_full_jitter(self):
+        policy = RetryPolicy(base_delay=1, rand=lambda: 0.25)
+        self.assertEqual(policy.backoff(3), 1.0, "Jitter wasn't applied over the whole backoff window")
+
+    def test_max_attempts(self):
+        self.assertIsNotNone(self.policy.next_delay(500, 3, 0))
+        self.assertIsNone(self.policy.next_delay(500, 4, 0), "Retried past max_attempts")
+
+    def test_deadline(self):
+        self.clock.sleep(29.5)
+        self.assertIsNone(self.policy.next_delay(500, 1, 0), "Retried past the deadline")
+
+    def test_retry_after_header(self):
+        self.assertEqual(self.policy.next_delay(42901, 1, 0, {"Retry-After": "3"}), 3, "Retry-After header was ignored")
+        self.assertEqual(retry_after({"X-RateLimit-Reset": "1000000010"}, now=lambda: 1000000000), 10)
+        self.assertIsNone(retry_after({}))
+
+class TestTransportRetries(unittest.TestCase):
+    def setUp(self):
+        logging.disable()
+        self.clock = FakeClock()
+        self.limiter = RateLimiter(rate=1000, burst=1000, clock=self.clock, sleep=self.clock.sleep)
+        self.policy = RetryPolicy(max_attempts=3, rand=lambda: 0.5, clock=self.clock, sleep=self.clock.sleep)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def transport(self, responses):
+        self.session = ScriptedSession(responses)
+        return Transport("http://stand-in", session=self.session, limiter=self.limiter, retry=self.policy)
+
+    def test_retries_until_success(self):
+        r = self.transport([SERVER_ERROR(), THROTTLED(), OK()]).request("GET", "game/status")
+        self.assertTrue(r.ok, "Request was not retried until it succeeded")
+        self.assertEqual(r.attempts, 3, "Attempt count not reported on the response")
+        self.assertEqual(self.policy.stats()['retries'], 2)
+
+    def test_gives_up(self):
+        r = self.transport([SERVER_ERROR(), SERVER_ERROR(), SERVER_ERROR(), OK()]).request("GET", "game/status")
+        self.assertEqual(r.status_code, 500, "Retried past max_attempts")
+        self.assertEqual(self.session.sent, 3)
+        self.assertEqual(self.policy.stats()['gave_up'], 1)
+
+    def test_fatal_not_retried(self):
+        r = self.transport([NOT_FOUND(), OK()]).request("GET", "game/status")
+        self.assertEqual((r.status_code, r.attempts), (404, 1), "A fatal error was retried")
+
+    def test_throttle_pauses_shared_limiter(self):
+        transport = self.transport([THROTTLED({"Retry-After": "2"}), OK()])
+        transport.request("GET", "game/status")
+        self.assertGreaterEqual(self.clock.now, 2, "Retry-After was not honoured")
+        self.assertGreaterEqual(transport.scheduler.stats()['normal']['max_wait'], 2, "The throttle pause was not applied to the shared limiter")
+
+class BlockingSession():
+    """Stands in for a requests.Session and holds every request until released"""
+    def __init__(self):
+        self.release = threading.Event()
+        self.sent = 0
+    def mount(self, prefix, adapter):
+        pass
+    def _send(self, url, headers=None, params=None):
+        self.sent += 1
+        self.release.wait(5)
+        return OK()
+    def __getattr__(self, name):
+        return self._send
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.session = BlockingSession()
+        self.transport = Transport("http://stand-in", session=self.session, limiter=RateLimiter(rate=1000, burst=1000))
+        self.headers = {'Authorization': 'Bearer 1234'}
+
+    def run_threads(self, calls):
+        results = []
+        threads = [threading.Thread(target=lambda c=c: results.append(self.transport.request(*c))) for c in calls]
+        for t in threads:
+            t.start()
+        # Wait for every follower to join the leader's flight before letting the response through
+        wait_until(self, lambda: self.transport.flights.shared + self.session.sent >= len(calls), "Callers never joined a flight")
+        self.session.release.set()
+        for t in threads:
+            t.join()
+        return results
+
+    def test_identical_gets_share_one_call(self):
+        results = self.run_threads([("GET", "game/locations/OE-PM/marketplace", self.headers)] * 5)
+        self.assertEqual(self.session.sent, 1, "Identical in-flight GETs were not coalesced")
+        self.assertEqual(len(results), 5, "Not every caller received the result")
+        self.assertTrue(all(r is results[0] for r in results), "Callers received different results")
+
+    def test_different_tokens_not_shared(self):
+        self.run_threads([("GET", "game/status", {'Authorization': 'Bearer 1'}), ("GET", "game/status", {'Authorization': 'Bearer 2'})])
+        self.assertEqual(self.session.sent, 2, "Requests for different tokens were coalesced")
+
+    def test_posts_not_shared(self):
+        self.run_threads([("POST", "users/JimHawkins/purchase-orders", self.headers)] * 2)
+        self.assertEqual(self.session.sent, 2, "POST requests were coalesced")
+
+    def test_request_key_ignores_param_order(self):
+        self.assertEqual(request_key("game/ships", None, {"a": 1, "b": 2}), request_key("/game/ships", None, {"b": 2, "a": 1}))
+
+class GatedClock(FakeClock):
+    """A fake clock whose sleeps block until the test opens the gate"""
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+        self.sleepers = 0
+    def sleep(self, seconds):
+        with self.lock:
+            self.sleepers += 1
+        self.gate.wait(5)
+        super().sleep(seconds)
+
+class TestPriorityScheduler(unittest.TestCase):
+    def test_default_priorities(self):
+        self.assertEqual(current_priority("POST"), CRITICAL, "Orders & flights should be critical")
+        self.assertEqual(current_priority("GET"), NORMAL)
+        with priority(BACKGROUND):
+            self.assertEqual(current_priority("GET"), BACKGROUND, "priority block was ignored")
+        self.assertEqual(current_priority("GET"), NORMAL, "priority block leaked")
+
+    def test_critical_goes_first(self):
+        clock = GatedClock()
+        limiter = RateLimiter(rate=1, burst=1, clock=clock, sleep=clock.sleep)
+        scheduler = PriorityScheduler(limiter)
+        limiter.try_acquire()
+        served = []
+        def run(level):
+            scheduler.acquire(level)
+            served.append(level)
+        background = threading.Thread(target=run, args=(BACKGROUND,))
+        background.start()
+        wait_until(self, lambda: clock.sleepers >= 1, "Background request never waited on the limiter")
+        critical = threading.Thread(target=run, args=(CRITICAL,))
+        critical.start()
+        wait_until(self, lambda: scheduler.stats()['critical']['depth'] >= 1, "Critical request never queued")
+        clock.gate.set()
+        background.join()
+        critical.join()
+        self.assertEqual(served, [CRITICAL, BACKGROUND], "Critical request didn't jump the queue")
+        stats = scheduler.stats()
+        self.assertEqual(stats['background']['max_depth'], 1)
+        self.assertGreater(stats['background']['max_wait'], stats['critical']['max_wait'])
+
+    def test_aging_prevents_starvation(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rate=1, burst=1, clock=clock, sleep=clock.sleep)
+        scheduler = PriorityScheduler(limiter, aging=5)
+        limiter.try_acquire()
+        with scheduler.cond:
+            old = scheduler._enqueue(BACKGROUND)
+            clock.sleep(20)
+            new = scheduler._enqueue(CRITICAL)
+            self.assertEqual(scheduler._try(new), (1.0, False), "An old background request was starved")
+            self.assertEqual(scheduler._try(old), (0, True), "The aged request wasn't served")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import json
+import unittest
+import numpy as np
+from SpaceTraders.world import World, get_world, FUEL_PENALTIES
+from SpaceTraders.core import Game, Ship
+from tests.test_Core import DOCKED_SHIP
+
+TOKEN = "4c9f072a-4e95-48d6-bccd-54f1569bd3c5"
+
+class TestWorld(unittest.TestCase):
+    def setUp(self):
+        with open('./SpaceTraders/constants/systems.json', 'r') as infile:
+            self.systems = json.load(infile)
+        self.game = Game(TOKEN, self.systems)
+        self.world = World(self.systems)
+
+    def test_matches_ship_maths(self):
+        for kind in FUEL_PENALTIES:
+            ship = Ship(TOKEN, DOCKED_SHIP, **{"class": kind})
+            for origin in self.world.symbols:
+                from_loc = self.game.locations[origin]
+                ship.x, ship.y = from_loc.x, from_loc.y
+                expected = [ship.calculate_fuel_usage(from_loc, to_loc=self.game.locations[s]) for s in self.world.symbols]
+                self.assertEqual(self.world.fuel_from(origin, kind).tolist(), expected, f"Fuel from {origin} for {kind} doesn't match the ship")
+                self.assertEqual(self.world.distance_from(origin).tolist(),
+                                 [ship.calculate_distance(self.game.locations[s].x, self.game.locations[s].y) for s in self.world.symbols])
+
+    def test_one_source_of_penalties(self):
+        ship = Ship(TOKEN, DOCKED_SHIP)
+        planet = self.game.locations["OE-PM"]
+        before = ship.calculate_fuel_usage(planet, distance=20)
+        FUEL_PENALTIES[ship.kind] += 10
+        try:
+            self.assertEqual(ship.calculate_fuel_usage(planet, distance=20), before + 10, "Ship doesn't read FUEL_PENALTIES")
+        finally:
+            FUEL_PENALTIES[ship.kind] -= 10
+
+    def test_read_only(self):
+        with self.assertRaises(ValueError, msg="Shared matrices should not be writable"):
+            self.world.fuel_matrix("MK-I")[0, 0] = 5
+        self.assertIs(self.world.fuel_matrix("MK-I"), self.world.fuel_matrix("MK-I"), "Fuel matrix rebuilt")
+
+    def test_masks(self):
+        origin = self.world.symbols[0]
+        reachable = self.world.reachable_from(origin)
+        self.assertFalse(reachable[self.world.index[origin]], "A location can't be flown to from itself")
+        self.assertTrue(np.all(self.world.systems[reachable] == origin[:2]), "Reachable locations outside the system")
+        self.assertEqual(self.world.in_system(origin[:2]).sum(), reachable.sum() + 1)
+        loc = self.game.locations[origin]
+        self.assertEqual(self.world.distances_to(loc.x, loc.y).tolist(), self.world.distance_from(origin).tolist())
+
+    def test_shared(self):
+        self.assertIs(get_world(self.systems), get_world(json.loads(json.dumps(self.systems))), "Equal systems should share a world")
+        self.assertIs(self.game.world, get_world(self.systems), "Game isn't using the shared world")
+
+if __name__ == '__main__':
+    unittest.main()